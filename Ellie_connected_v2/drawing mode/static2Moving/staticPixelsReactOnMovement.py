@@ -4,6 +4,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import cv2
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "modeSelection"))
+from effects import quantize_colors  # vectorized quantizer shared with the modes
 
 # Create a figure and axis to display the image
 fig, ax = plt.subplots()
@@ -28,19 +32,6 @@ def enhance_contrast(image):
     final = cv2.cvtColor(limg, cv2.COLOR_LAB2BGR)
     return final
 
-# Function to quantize colors to the nearest primary RGB values with intensity
-def quantize_colors(image):
-    quantized = image.copy()
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            pixel = image[i, j]
-            r, g, b = pixel[0], pixel[1], pixel[2]
-            r = 255 if r > 127 else 0
-            g = 255 if g > 127 else 0
-            b = 255 if b > 127 else 0
-            quantized[i, j] = [r, g, b]
-    return quantized
-
 # Initialize pixel positions for floating effect
 pixel_positions = [(j, i) for i in range(20) for j in range(20)]
 pixel_velocities = [(0, 0) for _ in range(400)]
@@ -95,7 +86,7 @@ while True:
     pixelated = cv2.resize(frame, (20, 20), interpolation=cv2.INTER_LINEAR)
 
     # Quantize the colors to primary RGB values
-    pixelated = quantize_colors(pixelated)
+    quantize_colors(pixelated, out=pixelated)
 
     # Apply floating effect
     apply_floating_effect(pixel_positions, pixel_velocities)
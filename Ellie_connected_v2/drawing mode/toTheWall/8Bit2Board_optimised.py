@@ -3,6 +3,11 @@ import numpy as np
 import random
 import sys
 from contourwall import ContourWall
+from wall_output import ContourWallOutput, pixel_poster
+from virtual_contourwall import VirtualContourWall
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "modeSelection"))
+from effects import quantize_colors  # vectorized quantizer shared with the modes
 
 # Define the dimensions for the pixelated image
 pixelated_width, pixelated_height = 20, 20
@@ -31,19 +36,6 @@ def enhance_contrast(image):
     final = cv2.cvtColor(limg, cv2.COLOR_LAB2BGR)
     return final
 
-# Function to quantize colors to the nearest primary RGB values with intensity
-def quantize_colors(image):
-    quantized = image.copy()
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            pixel = image[i, j]
-            r, g, b = pixel[0], pixel[1], pixel[2]
-            r = 255 if r > 127 else 0
-            g = 255 if g > 127 else 0
-            b = 255 if b > 127 else 0
-            quantized[i, j] = [r, g, b]
-    return quantized
-
 # Initialize pixel positions for floating effect
 pixel_positions = [(j, i) for i in range(pixelated_height) for j in range(pixelated_width)]
 
@@ -64,13 +56,9 @@ def apply_floating_effect(positions):
             positions[index] = (x, y)
 
 # Function to send pixel data to ContourWall
-def send_to_contour_wall(cw, pixelated):
-    for i in range(pixelated_height):
-        for j in range(pixelated_width):
-            color = pixelated[i, j]
-            # Assuming cw.pixels is a 2D array-like structure where colors can be assigned directly
-            cw.pixels[i, j] = color
-    cw.show()
+def send_to_contour_wall(output, pixelated):
+    # Hand the frame to the output thread, the loop doesn't wait for the serial port
+    output.submit(pixelated)
 
 # Function to create the waterfall effect
 def create_waterfall_effect(long_exposure_frame, pixelated):
@@ -81,8 +69,13 @@ def create_waterfall_effect(long_exposure_frame, pixelated):
     return long_exposure_frame
 
 if __name__ == "__main__":
-    cw = ContourWall()
+    # --virtual runs without the wall and logs the frames to frames.log
+    cw = VirtualContourWall(frame_log="frames.log") if "--virtual" in sys.argv else ContourWall()
     cw.single_new_with_port("COM4")
+    # --mirror also sends every frame to the Flask server's LED simulator stream
+    mirror = pixel_poster() if "--mirror" in sys.argv else None
+    output = ContourWallOutput(cw, target_fps=30, mirror=mirror)
+    output.start()
 
     # Initialize the long exposure frame
     long_exposure_frame = np.zeros((pixelated_height, pixelated_width, 3), dtype=np.uint8)
@@ -132,7 +125,7 @@ if __name__ == "__main__":
         pixelated = cv2.resize(frame, (pixelated_width, pixelated_height), interpolation=cv2.INTER_LINEAR)
 
         # Quantize the colors to primary RGB values
-        pixelated = quantize_colors(pixelated)
+        quantize_colors(pixelated, out=pixelated)
 
         # Apply the floating effect
         apply_floating_effect(pixel_positions)
@@ -141,7 +134,7 @@ if __name__ == "__main__":
         long_exposure_frame = create_waterfall_effect(long_exposure_frame, pixelated)
 
         # Send the pixelated data to ContourWall
-        send_to_contour_wall(cw, long_exposure_frame)
+        send_to_contour_wall(output, long_exposure_frame)
 
         # Break the loop on 'q' key press
         if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -151,6 +144,9 @@ if __name__ == "__main__":
     cap.release()
     # Destroy all the windows
     cv2.destroyAllWindows()
+    # Stop the output thread before using the wall directly
+    print(f"[DEBUG] Wall output: {output.stats()}")
+    output.stop()
     # Clear ContourWall pixels
     cw.fill_solid(0, 0, 0)
     cw.show()
@@ -18,11 +18,8 @@ overlay = np.zeros((pixelated_height, pixelated_width, 3), dtype=np.uint8)
 
 # Function to send the pixelated data to ContourWall
 def send_to_contour_wall(cw, pixelated):
-    for i in range(pixelated_height):
-        for j in range(pixelated_width):
-            # Convert BGR to RGB for ContourWall
-            color = pixelated[i, j][::-1]
-            cw.pixels[i, j] = color
+    # Convert BGR to RGB for ContourWall straight into the wall buffer
+    np.copyto(cw.pixels, pixelated[..., ::-1], casting='unsafe')
     cw.show()
 
 # Track last frame to detect movement
@@ -13,11 +13,8 @@ cw = ContourWall()
 cw.single_new_with_port("COM4")
 
 def send_to_contour_wall(cw, pixelated):
-    for i in range(pixelated_height):
-        for j in range(pixelated_width):
-            color = pixelated[i, j]
-            cw.pixels[i, j] = color
-    cw.show()
+    # The frame buffer is passed to the wall as is, no per-pixel copy
+    cw.show(frame=pixelated)
 
 while True:
     # Capture frame-by-frame
@@ -1,10 +1,14 @@
 import numpy as np
 import serial.tools.list_ports
 import ctypes
+import os
 from ctypes import c_void_p, c_char_p, c_uint32, c_uint8, c_bool
 from sys import platform
 import time
 
+TILE_SIZE = 20  # Every tile is 20x20 LEDs
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 class ContourWallCore(ctypes.Structure):
     _fields_ = [
         ("tiles_ptr", c_void_p),
@@ -15,11 +19,25 @@ class ContourWall:
     def __init__(self) -> None:
         """Constructor for the ContourWall class."""
 
-        # Load the Rust shared object
+        self._load_core()
+
+        self._allocate(1, 1)
+        self.pushed_frames: int = 0
+
+        # Delta mode: frames identical to the last pushed one are not sent at all. Skipping is per
+        # frame, the core has no per-tile update, so a frame with one changed tile is sent whole
+        self.delta: bool = True
+        self.frames_skipped: int = 0
+        self.bytes_avoided: int = 0
+
+    def _load_core(self) -> None:
+        """Load the Rust shared object and bind its functions"""
+
+        # Next to this file, so the wall also opens from other folders (display.py in modeSelection)
         if platform == "win32":
-            self.__lib = ctypes.CDLL("./contourwall_core.dll")
+            self.__lib = ctypes.CDLL(os.path.join(CORE_DIR, "contourwall_core.dll"))
         elif platform in ["darwin", "linux"]:
-            self.__lib = ctypes.CDLL("./contourwall_core.so")
+            self.__lib = ctypes.CDLL(os.path.join(CORE_DIR, "contourwall_core.so"))
         else:
             raise Exception(f"'{platform}' is not a supported operating system")
 
@@ -51,8 +69,17 @@ class ContourWall:
         self._drop = self.__lib.drop
         self._drop.argtypes = [ctypes.POINTER(ContourWallCore)]
 
-        self.pixels: np.ndarray = np.zeros((20, 20, 3), dtype=np.uint8)
-        self.pushed_frames: int = 0
+    def _allocate(self, tile_rows: int, tile_cols: int) -> None:
+        # 'pixels' is the back buffer that is drawn into, 'front' holds the frame pushed by the last swap()
+        self.pixels: np.ndarray = np.zeros((tile_rows * TILE_SIZE, tile_cols * TILE_SIZE, 3), dtype=np.uint8)
+        self.front: np.ndarray = np.zeros_like(self.pixels)
+        self.tile_rows, self.tile_cols = tile_rows, tile_cols
+
+        # Change tracking against the last pushed frame
+        self.last_pushed: np.ndarray = None
+        self._changed_channels: np.ndarray = np.zeros(self.pixels.shape, dtype=bool)
+        self.dirty_rows: np.ndarray = np.ones(self.pixels.shape[0], dtype=bool)
+        self.dirty_tiles: np.ndarray = np.ones((tile_rows, tile_cols), dtype=bool)
 
     def new(self, baudrate: int=2_000_000) -> None:
         """Create a new instance of ContourWallCore with 0 tiles"""
@@ -64,6 +91,7 @@ class ContourWall:
 
         if check_comport_existence([port1, port2, port3, port4, port5, port6]):
             self._cw_core = self._new_with_ports(port1.encode(), port2.encode(), port3.encode(), port4.encode(), port5.encode(), port6.encode(), baudrate)
+            self._allocate(2, 3)
         else:
             raise Exception(f"one of the COM ports does not exist")
 
@@ -75,22 +103,80 @@ class ContourWall:
         else:
             raise Exception(f"COM port '{port}' does not exist")
 
-    def show(self, sleep_ms:int=0, optimize:bool=True) -> None:
+    def show(self, sleep_ms:int=0, optimize:bool=True, frame:np.ndarray=None) -> None:
         """
-        Update each individual LED in the ContourWallCore object with the pixel data in 'cw.pixels'.
+        Update each individual LED in the ContourWallCore object with the pixel data in 'cw.pixels',
+        or in 'frame' when given. The buffer is handed to the core by pointer, a C-contiguous
+        (H, W, 3) uint8 array or view is not copied.
 
         Example code::
                 ``` 
                 cw.pixels[:] = [255, 0, 0]
                 cw.show() 
+
+                cw.show(frame=pixelated)
                 ```
         """
-        
-        ptr: ctypes._Pointer[c_uint8] = ctypes.cast(ctypes.c_char_p(self.pixels.tobytes()), ctypes.POINTER(ctypes.c_uint8))
-        self._update_all(ctypes.byref(self._cw_core), ptr, optimize)
-        self._show(ctypes.byref(self._cw_core))
-        self.pushed_frames += 1
-        time.sleep(sleep_ms/1000)
+
+        frame = self.pixels if frame is None else frame
+        if frame.shape != self.pixels.shape:
+            raise ValueError(f"frame shape {frame.shape} does not match the wall {self.pixels.shape}")
+        # Only copies when the frame is not contiguous uint8 already
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+
+        if self.delta and not self._track_changes(frame):
+            self.frames_skipped += 1
+            self.bytes_avoided += frame.nbytes
+        else:
+            ptr: ctypes._Pointer[c_uint8] = frame.ctypes.data_as(ctypes.POINTER(c_uint8))
+            self._update_all(ctypes.byref(self._cw_core), ptr, optimize)
+            self._show(ctypes.byref(self._cw_core))
+            self.pushed_frames += 1
+        if sleep_ms:
+            time.sleep(sleep_ms/1000)
+
+    def _track_changes(self, frame: np.ndarray) -> bool:
+        """
+        Compare 'frame' with the last pushed frame, fill 'dirty_rows' and 'dirty_tiles' and remember 'frame'.
+        Returns False when nothing changed. The core only takes whole frames, so a frame with any dirty
+        tile is sent in full; 'dirty_tiles' only tells the caller which tiles changed.
+        """
+
+        if self.last_pushed is None:
+            self.last_pushed = frame.copy()
+            self.dirty_rows[:] = True
+            self.dirty_tiles[:] = True
+            return True
+
+        np.not_equal(frame, self.last_pushed, out=self._changed_channels)
+        changed = self._changed_channels.any(axis=2)
+        changed.any(axis=1, out=self.dirty_rows)
+        changed.reshape(self.tile_rows, TILE_SIZE, self.tile_cols, TILE_SIZE).any(axis=(1, 3), out=self.dirty_tiles)
+
+        if not self.dirty_tiles.any():
+            return False
+        np.copyto(self.last_pushed, frame)
+        return True
+
+    def reset_delta(self) -> None:
+        """Forget the last pushed frame, the next show() sends the full frame"""
+
+        self.last_pushed = None
+
+    def swap(self, optimize:bool=True) -> None:
+        """
+        Push the back buffer 'cw.pixels' and swap it with the front buffer. After the swap 'cw.pixels'
+        holds the frame from two swaps ago, so draw the full frame before the next swap.
+
+        Example code::
+                ``` 
+                cw.pixels[:] = frame
+                cw.swap() 
+                ```
+        """
+
+        self.show(optimize=optimize)
+        self.pixels, self.front = self.front, self.pixels
 
     def fill_solid(self, r: int, g: int, b: int) -> None:
         """
@@ -103,6 +189,8 @@ class ContourWall:
 
         self._solid_color(ctypes.byref(self._cw_core), r, g, b)
         self.pixels[:] = r, g, b
+        if self.last_pushed is not None:
+            self.last_pushed[:] = r, g, b
 
     def drop(self) -> None:
         """Drop the ContourWallCore instance"""
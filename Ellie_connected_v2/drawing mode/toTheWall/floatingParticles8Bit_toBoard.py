@@ -3,6 +3,9 @@ import numpy as np
 import random
 import sys
 from contourwall import ContourWall
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "modeSelection"))
+from effects import quantize_colors  # vectorized quantizer shared with the modes
 
 # Define the dimensions for the pixelated image
 pixelated_width, pixelated_height = 20, 20
@@ -31,19 +34,6 @@ def enhance_contrast(image):
     final = cv2.cvtColor(limg, cv2.COLOR_LAB2BGR)
     return final
 
-# Function to quantize colors to the nearest primary RGB values with intensity
-def quantize_colors(image):
-    quantized = image.copy()
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            pixel = image[i, j]
-            r, g, b = pixel[0], pixel[1], pixel[2]
-            r = 255 if r > 127 else 0
-            g = 255 if g > 127 else 0
-            b = 255 if b > 127 else 0
-            quantized[i, j] = [r, g, b]
-    return quantized
-
 # Initialize pixel positions for floating effect
 pixel_positions = [(j, i) for i in range(pixelated_height) for j in range(pixelated_width)]
 
@@ -65,11 +55,8 @@ def apply_floating_effect(positions):
 
 # Function to send pixel data to ContourWall
 def send_to_contour_wall(cw, pixelated):
-    for i in range(pixelated_height):
-        for j in range(pixelated_width):
-            color = pixelated[i, j]
-            cw.pixels[i, j] = color
-    cw.show()
+    # The frame buffer is passed to the wall as is, no per-pixel copy
+    cw.show(frame=pixelated)
 
 if __name__ == "__main__":
     cw = ContourWall()
@@ -120,7 +107,7 @@ if __name__ == "__main__":
         pixelated = cv2.resize(frame, (pixelated_width, pixelated_height), interpolation=cv2.INTER_LINEAR)
 
         # Quantize the colors to primary RGB values
-        pixelated = quantize_colors(pixelated)
+        quantize_colors(pixelated, out=pixelated)
 
         # Apply the floating effect
         apply_floating_effect(pixel_positions)
@@ -37,11 +37,8 @@ def enhance_contrast(image):
 
 # Function to send pixel data to ContourWall
 def send_to_contour_wall(cw, pixelated):
-    for i in range(pixelated_height):
-        for j in range(pixelated_width):
-            color = pixelated[i, j]
-            cw.pixels[i, j] = color
-    cw.show()
+    # The frame buffer is passed to the wall as is, no per-pixel copy
+    cw.show(frame=pixelated)
 
 # Function to apply acceleration to positions based on motion
 def apply_acceleration(positions, velocities, acceleration):
@@ -3,6 +3,10 @@ import numpy as np
 from contourwall import ContourWall
 import mediapipe as mp
 import random
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "modeSelection"))
+from effects import quantize_colors  # vectorized quantizer shared with the modes
 
 # Define the dimensions for the pixelated image
 pixelated_width, pixelated_height = 20, 20
@@ -32,26 +36,10 @@ def enhance_contrast(image):
     final = cv2.cvtColor(limg, cv2.COLOR_LAB2BGR)
     return final
 
-# Function to quantize colors to the nearest primary RGB values with intensity
-def quantize_colors(image):
-    quantized = image.copy()
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            pixel = image[i, j]
-            r, g, b = pixel[0], pixel[1], pixel[2]
-            r = 255 if r > 127 else 0
-            g = 255 if g > 127 else 0
-            b = 255 if b > 127 else 0
-            quantized[i, j] = [r, g, b]
-    return quantized
-
 # Function to send the pixelated data to ContourWall with persistence
 def send_to_contour_wall(cw, persistent_pixels):
-    for i in range(pixelated_height):
-        for j in range(pixelated_width):
-            # Convert BGR to RGB for ContourWall
-            color = persistent_pixels[i, j][::-1]
-            cw.pixels[i, j] = color
+    # Convert BGR to RGB for ContourWall straight into the wall buffer
+    np.copyto(cw.pixels, persistent_pixels[..., ::-1], casting='unsafe')
     cw.show()
 
 # Initialize a canvas for drawing
@@ -108,7 +96,7 @@ while True:
     pixelated = cv2.resize(frame, (pixelated_width, pixelated_height), interpolation=cv2.INTER_LINEAR)
 
     # Quantize the colors to primary RGB values
-    pixelated = quantize_colors(pixelated)
+    quantize_colors(pixelated, out=pixelated)
 
     # If a hand is detected, draw a trace on the canvas
     if results.multi_hand_landmarks:
@@ -0,0 +1,93 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from virtual_contourwall import VirtualContourWall
+from wall_output import ContourWallOutput, pixel_poster
+
+
+class PixelsHandler(BaseHTTPRequestHandler):
+    # Stand-in for the Flask /pixels route that answers after 'delay' seconds
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.frames.append((self.headers["X-Frame-Shape"], body))
+            self.server.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"OK")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PixelsHandler)
+    server.daemon_threads = True
+    server.delay, server.frames, server.connections, server.lock = 0.0, [], set(), threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def wall():
+    cw = VirtualContourWall(simulate_timing=False)
+    cw.single_new_with_port("virtual")
+    return cw
+
+
+def send(output, count, interval=0.01):
+    for i in range(count):
+        output.submit(np.full((20, 20, 3), i + 1, dtype=np.uint8))
+        time.sleep(interval)
+    time.sleep(0.1)
+
+
+def test_frames_are_posted_over_one_connection(server):
+    mirror = pixel_poster(f"http://127.0.0.1:{server.server_address[1]}/pixels")
+    output = ContourWallOutput(wall(), target_fps=0, mirror=mirror)
+    output.start()
+    send(output, 10, interval=0.05)
+    output.stop()
+
+    assert mirror.posted_frames == len(server.frames) == output.sent_frames == 10
+    assert len(server.connections) == 1
+    shape, body = server.frames[-1]
+    assert shape == "20,20" and body == bytes([10]) * 1200
+
+
+def test_slow_server_does_not_hold_up_the_wall(server):
+    server.delay = 0.3
+    mirror = pixel_poster(f"http://127.0.0.1:{server.server_address[1]}/pixels")
+    output = ContourWallOutput(wall(), target_fps=0, mirror=mirror)
+    output.start()
+    start = time.perf_counter()
+    send(output, 20)
+    elapsed = time.perf_counter() - start
+    output.stop()
+
+    # Every frame reached the wall while the server was busy with the first posts
+    assert output.sent_frames == 20 and output.cw.last_pushed[0, 0, 0] == 20
+    assert elapsed < 1.0
+    assert mirror.posted_frames < 20 and mirror.dropped_frames > 0
+
+
+def test_server_that_is_down_is_skipped():
+    mirror = pixel_poster("http://127.0.0.1:9/pixels", timeout=0.2)
+    output = ContourWallOutput(wall(), target_fps=0, mirror=mirror)
+    output.start()
+    send(output, 10)
+    output.stop()
+
+    assert output.sent_frames == 10
+    assert mirror.posted_frames == 0 and mirror.errors >= 1
+    assert mirror.errors + mirror.dropped_frames <= 10
@@ -0,0 +1,185 @@
+import sys
+import time
+import numpy as np
+from contourwall import ContourWall, ContourWallCore, TILE_SIZE
+
+# Frame log file: 64 byte header followed by a ring of (timestamp, frame) records
+LOG_MAGIC = 0x434F4E544F5552  # "CONTOUR"
+LOG_HEADER_FIELDS = 8
+MAGIC, HEIGHT, WIDTH, CAPACITY, WRITTEN = range(5)
+
+
+class FrameLog:
+    """
+    Memory-mapped log of pushed frames. Keeps the last 'capacity' frames, each with the time
+    it was shown, so a run can be measured afterwards or replayed into a simulator.
+    """
+
+    def __init__(self, path: str, height: int = None, width: int = None, capacity: int = 1000) -> None:
+        self.path = path
+        if height is None:
+            # Open an existing log
+            self.header = np.memmap(path, dtype=np.int64, mode='r+', shape=(LOG_HEADER_FIELDS,))
+            if self.header[MAGIC] != LOG_MAGIC:
+                raise ValueError(f"'{path}' is not a frame log")
+            height, width, capacity = (int(v) for v in self.header[[HEIGHT, WIDTH, CAPACITY]])
+            mode = 'r+'
+        else:
+            mode = 'w+'
+
+        self.record = np.dtype([('timestamp', '<f8'), ('frame', np.uint8, (height, width, 3))])
+        size = LOG_HEADER_FIELDS * 8 + capacity * self.record.itemsize
+        if mode == 'w+':
+            with open(path, 'wb') as f:
+                f.truncate(size)
+            self.header = np.memmap(path, dtype=np.int64, mode='r+', shape=(LOG_HEADER_FIELDS,))
+            self.header[:] = 0
+            self.header[MAGIC], self.header[HEIGHT], self.header[WIDTH], self.header[CAPACITY] = LOG_MAGIC, height, width, capacity
+        self.records = np.memmap(path, dtype=self.record, mode='r+', offset=LOG_HEADER_FIELDS * 8, shape=(capacity,))
+        self.capacity = capacity
+
+    @property
+    def written(self) -> int:
+        return int(self.header[WRITTEN])
+
+    def write(self, frame: np.ndarray, timestamp: float) -> None:
+        slot = self.written % self.capacity
+        self.records[slot]['timestamp'] = timestamp
+        self.records[slot]['frame'] = frame
+        self.header[WRITTEN] += 1
+
+    def frames(self):
+        """Logged (timestamp, frame) records from oldest to newest"""
+
+        start = max(0, self.written - self.capacity)
+        for n in range(start, self.written):
+            record = self.records[n % self.capacity]
+            yield float(record['timestamp']), record['frame']
+
+    def fps(self) -> float:
+        timestamps = [timestamp for timestamp, _ in self.frames()]
+        if len(timestamps) < 2 or timestamps[-1] == timestamps[0]:
+            return 0.0
+        return (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
+
+    def replay(self, callback, realtime: bool = True) -> None:
+        """Call 'callback(frame)' for every logged frame, with the original timing when 'realtime' is set"""
+
+        previous = None
+        for timestamp, frame in self.frames():
+            if realtime and previous is not None:
+                time.sleep(max(0.0, timestamp - previous))
+            previous = timestamp
+            callback(frame)
+
+    def flush(self) -> None:
+        self.header.flush()
+        self.records.flush()
+
+
+class VirtualContourWall(ContourWall):
+    """
+    Pure-Python stand-in for ContourWall with the same API, for running modes without hardware.
+
+    Every show() costs what the serial link would: each tile gets 'tile_header_bytes' of framing
+    plus its pixels at 'bits_per_byte' bits per byte and the tiles are sent in parallel, one port
+    each. With 'simulate_timing' the call sleeps for that time. Pushed frames go to a FrameLog
+    when 'frame_log' is a path.
+
+    Example code::
+            ```
+            cw = VirtualContourWall(frame_log="frames.log")
+            cw.new_with_ports("COM1", "COM2", "COM3", "COM4", "COM5", "COM6")
+            cw.pixels[:] = [255, 0, 0]
+            cw.show()
+            print(cw.bytes_sent, cw.frame_log.fps())
+            ```
+    """
+
+    def __init__(self, frame_log: str = None, log_capacity: int = 1000, simulate_timing: bool = True,
+                 tile_header_bytes: int = 4, bits_per_byte: int = 10) -> None:
+        self.frame_log_path = frame_log
+        self.log_capacity = log_capacity
+        self.simulate_timing = simulate_timing
+        self.tile_header_bytes = tile_header_bytes
+        self.bits_per_byte = bits_per_byte
+        self.baudrate = 2_000_000
+        self.frame_log: FrameLog = None
+        self.bytes_sent: int = 0
+        self.transmit_time: float = 0.0
+        super(VirtualContourWall, self).__init__()
+
+    def _load_core(self) -> None:
+        # The "core" keeps its own copy of the frame like the Rust library does
+        self._show = self._virtual_show
+        self._update_all = self._virtual_update_all
+        self._solid_color = self._virtual_solid_color
+        self._drop = self._virtual_drop
+        self._core_frame: np.ndarray = None
+
+    def _connect(self, tile_rows: int, tile_cols: int, baudrate: int) -> None:
+        self._cw_core = ContourWallCore()
+        self.baudrate = baudrate
+        self._allocate(tile_rows, tile_cols)
+        self._core_frame = np.zeros_like(self.pixels)
+        if self.frame_log_path:
+            height, width = self.pixels.shape[:2]
+            self.frame_log = FrameLog(self.frame_log_path, height, width, self.log_capacity)
+
+    def new(self, baudrate: int = 2_000_000) -> None:
+        """Create a virtual wall with 1 tile (the real core starts with 0)"""
+
+        self._connect(1, 1, baudrate)
+
+    def new_with_ports(self, port1: str, port2: str, port3: str, port4: str, port5: str, port6: str, baudrate: int = 2_000_000) -> None:
+        """Create a virtual wall with 6 tiles, the ports are not checked"""
+
+        self._connect(2, 3, baudrate)
+
+    def single_new_with_port(self, port: str, baudrate: int = 2_000_000) -> None:
+        """Create a virtual wall with 1 tile, the port is not checked"""
+
+        self._connect(1, 1, baudrate)
+
+    def tile_transmit_time(self) -> float:
+        tile_bytes = self.tile_header_bytes + TILE_SIZE * TILE_SIZE * 3
+        return tile_bytes * self.bits_per_byte / self.baudrate
+
+    def _virtual_update_all(self, core, ptr, optimize: bool) -> None:
+        np.copyto(self._core_frame, np.ctypeslib.as_array(ptr, shape=self._core_frame.shape))
+
+    def _virtual_show(self, core) -> None:
+        tiles = self.tile_rows * self.tile_cols
+        self.bytes_sent += tiles * (self.tile_header_bytes + TILE_SIZE * TILE_SIZE * 3)
+        # Tiles are on separate ports, so a frame takes as long as one tile
+        duration = self.tile_transmit_time()
+        self.transmit_time += duration
+        if self.simulate_timing:
+            time.sleep(duration)
+        if self.frame_log is not None:
+            self.frame_log.write(self._core_frame, time.time())
+
+    def _virtual_solid_color(self, core, r: int, g: int, b: int) -> None:
+        self._core_frame[:] = r, g, b
+        self._virtual_show(core)
+
+    def _virtual_drop(self, core) -> None:
+        if self.frame_log is not None:
+            self.frame_log.flush()
+
+
+if __name__ == "__main__":
+    # Replay a frame log in a matplotlib window: python virtual_contourwall.py frames.log
+    import matplotlib.pyplot as plt
+
+    log = FrameLog(sys.argv[1])
+    print(f"{log.written} frames logged, {log.fps():.1f} FPS")
+    fig, ax = plt.subplots()
+    im = ax.imshow(np.zeros((int(log.header[HEIGHT]), int(log.header[WIDTH]), 3), dtype=np.uint8))
+
+    def draw(frame):
+        im.set_data(frame)
+        plt.pause(0.001)
+
+    log.replay(draw)
+    plt.show()
@@ -0,0 +1,233 @@
+import http.client
+import threading
+import time
+import urllib.parse
+import numpy as np
+
+
+class ContourWallOutput(threading.Thread):
+    """
+    Sends frames to the ContourWall on its own thread so capture and effects never wait for the serial port.
+
+    submit() drops the frame into a one-slot mailbox. The sender always transmits the newest frame and
+    paces the output to 'target_fps', a frame that is replaced before it was sent counts as dropped.
+    A frame the wall's delta mode found unchanged goes nowhere and counts as unchanged, not as sent.
+
+    Example code::
+            ```
+            output = ContourWallOutput(cw, target_fps=30)
+            output.start()
+            output.submit(frame)
+            print(output.stats())
+            ```
+    """
+
+    def __init__(self, cw, target_fps: float = 30, optimize: bool = True, mirror=None) -> None:
+        super(ContourWallOutput, self).__init__()
+        self.daemon = True
+        self.cw = cw
+        # Called on the sender thread with every frame after it was sent, so it must not block,
+        # e.g. pixel_poster() for the LED simulator, which only copies the frame into its own mailbox
+        self.mirror = mirror
+        self.frame_interval = 1 / target_fps if target_fps else 0
+        self.optimize = optimize
+        self.running = True
+
+        # Mailbox buffer that submit() writes into and the buffer the sender transmits from
+        self.pending: np.ndarray = np.zeros_like(cw.pixels)
+        self.sending: np.ndarray = np.zeros_like(cw.pixels)
+        self.has_frame = False
+        self.condition = threading.Condition()
+
+        self.sent_frames = 0
+        self.unchanged_frames = 0
+        self.dropped_frames = 0
+        self.transmit_ms = 0.0
+        self.fps = 0.0
+        self._window_start = time.perf_counter()
+        self._window_frames = 0
+
+    def submit(self, frame: np.ndarray) -> None:
+        """Hand over a (H, W, 3) frame, replacing one that was not sent yet"""
+
+        with self.condition:
+            if self.has_frame:
+                self.dropped_frames += 1
+            np.copyto(self.pending, frame, casting='unsafe')
+            self.has_frame = True
+            self.condition.notify()
+
+    def run(self) -> None:
+        next_frame_time = time.perf_counter()
+        while self.running:
+            with self.condition:
+                while not self.has_frame and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                self.pending, self.sending = self.sending, self.pending
+                self.has_frame = False
+
+            pushed = self.cw.pushed_frames
+            start = time.perf_counter()
+            self.cw.show(optimize=self.optimize, frame=self.sending)
+            end = time.perf_counter()
+            if self.cw.pushed_frames == pushed:
+                # Delta mode skipped it, nothing went over the link
+                self.unchanged_frames += 1
+            else:
+                self._record(start, end)
+                if self.mirror is not None:
+                    self.mirror(self.sending)
+
+            # Pace the output, if transmitting fell behind start counting from now
+            next_frame_time = max(next_frame_time + self.frame_interval, end)
+            delay = next_frame_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _record(self, start: float, end: float) -> None:
+        self.sent_frames += 1
+        self.transmit_ms = (end - start) * 1000
+        self._window_frames += 1
+        elapsed = end - self._window_start
+        if elapsed >= 1.0:
+            self.fps = self._window_frames / elapsed
+            self._window_start = end
+            self._window_frames = 0
+
+    def stats(self) -> dict:
+        return {
+            "fps": self.fps,
+            "sent_frames": self.sent_frames,
+            "unchanged_frames": self.unchanged_frames,
+            "dropped_frames": self.dropped_frames,
+            "transmit_ms": self.transmit_ms,
+        }
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.is_alive():
+            self.join()
+        if isinstance(self.mirror, PixelPoster):
+            self.mirror.stop()
+
+
+class PixelPoster(threading.Thread):
+    """
+    Mirror for ContourWallOutput that posts frames as raw bytes to the Flask server's /pixels route,
+    which pushes them to the LED simulator.
+
+    Calling the poster only copies the frame into a one-slot mailbox, the POST happens on this thread
+    over one kept-alive connection, so a slow or stopped server never holds up the serial sender.
+    A frame replaced before it was posted counts as dropped. When the server cannot be reached the
+    frames of the next 'retry_interval' seconds are dropped instead of trying every frame.
+
+    Example code::
+            ```
+            output = ContourWallOutput(cw, mirror=pixel_poster())
+            ```
+    """
+
+    def __init__(self, url: str = "http://localhost:5000/pixels", timeout: float = 0.5,
+                 retry_interval: float = 1.0) -> None:
+        super(PixelPoster, self).__init__()
+        self.daemon = True
+        parts = urllib.parse.urlsplit(url)
+        self.host, self.port, self.path = parts.hostname, parts.port or 80, parts.path or "/"
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.connection: http.client.HTTPConnection = None
+        self.retry_time = 0.0
+        self.running = True
+
+        self.pending: np.ndarray = None
+        self.posting: np.ndarray = None
+        self.has_frame = False
+        self.condition = threading.Condition()
+
+        self.posted_frames = 0
+        self.dropped_frames = 0
+        self.errors = 0
+
+    def __call__(self, frame: np.ndarray) -> None:
+        with self.condition:
+            if self.has_frame:
+                self.dropped_frames += 1
+            if self.pending is None or self.pending.shape != frame.shape:
+                self.pending = np.empty(frame.shape, dtype=np.uint8)
+            np.copyto(self.pending, frame, casting='unsafe')
+            self.has_frame = True
+            self.condition.notify()
+
+    def run(self) -> None:
+        while self.running:
+            with self.condition:
+                while not self.has_frame and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                self.pending, self.posting = self.posting, self.pending
+                self.has_frame = False
+
+            if time.perf_counter() < self.retry_time:
+                self.dropped_frames += 1
+                continue
+            reused = self.connection is not None
+            try:
+                try:
+                    self._post(self.posting)
+                except (OSError, http.client.HTTPException):
+                    if not reused:
+                        raise
+                    # The server closed the kept-alive connection, try once more on a new one
+                    self._close()
+                    self._post(self.posting)
+                self.posted_frames += 1
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                self._close()
+                self.retry_time = time.perf_counter() + self.retry_interval
+
+    def _post(self, frame: np.ndarray) -> None:
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        height, width = frame.shape[:2]
+        self.connection.request("POST", self.path, body=frame.tobytes(), headers={
+            "Content-Type": "application/octet-stream",
+            "X-Frame-Shape": f"{height},{width}",
+        })
+        response = self.connection.getresponse()
+        response.read()
+        if response.will_close:
+            self._close()
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def stats(self) -> dict:
+        return {
+            "posted_frames": self.posted_frames,
+            "dropped_frames": self.dropped_frames,
+            "errors": self.errors,
+        }
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.is_alive():
+            self.join()
+        self._close()
+
+
+def pixel_poster(url: str = "http://localhost:5000/pixels", timeout: float = 0.5) -> PixelPoster:
+    """Started PixelPoster for 'url', to pass as ContourWallOutput's mirror"""
+
+    poster = PixelPoster(url, timeout)
+    poster.start()
+    return poster
@@ -0,0 +1,45 @@
+# Micro-benchmark: per-pixel quantize_colors loop vs. the vectorized ColorQuantizer from effects.py
+# Sizes go from one 20x20 tile up to the 6-tile wall and beyond
+import timeit
+import numpy as np
+from effects import ColorQuantizer
+
+SIZES = [(20, 20), (40, 60), (80, 120)]
+LED_PALETTE = [[0, 0, 0], [255, 255, 255], [0, 0, 255], [0, 255, 0], [255, 0, 0],
+               [0, 255, 255], [255, 0, 255], [255, 255, 0]]
+
+
+# The loop that was copy-pasted into the animation and drawing scripts
+def quantize_colors_loop(image):
+    quantized = image.copy()
+    for i in range(image.shape[0]):
+        for j in range(image.shape[1]):
+            pixel = image[i, j]
+            r, g, b = pixel[0], pixel[1], pixel[2]
+            r = 255 if r > 127 else 0
+            g = 255 if g > 127 else 0
+            b = 255 if b > 127 else 0
+            quantized[i, j] = [r, g, b]
+    return quantized
+
+
+def best_time_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == "__main__":
+    one_bit = ColorQuantizer(levels=2)
+    four_levels = ColorQuantizer(levels=4)
+    palette = ColorQuantizer(palette=LED_PALETTE)
+
+    print(f"{'size':>8} {'loop us':>10} {'1-bit us':>10} {'4-level us':>11} {'palette us':>11} {'speedup':>8}")
+    for height, width in SIZES:
+        image = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+        out = np.empty_like(image)
+        assert np.array_equal(quantize_colors_loop(image), one_bit(image, out=out))
+
+        loop_us = best_time_us(lambda: quantize_colors_loop(image), 3)
+        one_bit_us = best_time_us(lambda: one_bit(image, out=out), 1000)
+        four_us = best_time_us(lambda: four_levels(image, out=out), 1000)
+        palette_us = best_time_us(lambda: palette(image, out=out), 1000)
+        print(f"{height}x{width:<5} {loop_us:10.1f} {one_bit_us:10.1f} {four_us:11.1f} {palette_us:11.1f} {loop_us / one_bit_us:7.0f}x")
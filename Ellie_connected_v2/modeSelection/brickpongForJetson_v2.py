@@ -4,13 +4,18 @@ import cv2
 import numpy as np
 import mediapipe as mp
 import math
+import sys
 import time
-from datetime import datetime
-import matplotlib.pyplot as plt
+from camera_hub import CameraReader
+from event_bus import EventPublisher, PaddleMoved
+from particle_engine import ParticleSystem, BlockGrid
+from display import make_sink
+from game_loop import InputMailbox, RateCounter, FixedTimestep
 
 class HandController:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(0)
+    def __init__(self, camera_name=None):
+        # Attach to the shared CameraHub when launched by the event handler, otherwise open the camera directly
+        self.cap = CameraReader(camera_name) if camera_name else cv2.VideoCapture(0)
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands()
         self.mp_draw = mp.solutions.drawing_utils
@@ -92,99 +97,69 @@ class Particle:
         self.ay = ay * self.damping
 
 class ParticleEmitter:
-    def __init__(self, screen_width, screen_height, main_particle):
+    def __init__(self, screen_width, screen_height, main_particle, burst=1, capacity=1000):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.main_particle = main_particle
-        self.particle = None
+        self.burst = burst
+        # All emitted particles live in one struct-of-arrays system
+        self.particles = ParticleSystem(screen_width, screen_height, capacity)
 
-    def generate_particle(self):
-        x = self.screen_width // 2
-        y = self.screen_height // 2
-        speed = random.uniform(0.5, 1.5)
-        direction = random.randint(0, 360)
-        color = (0, 255, 0)
-        lifespan = 300
-        return Particle(x, y, speed, direction, color, lifespan)
+    @property
+    def active(self):
+        return self.particles.count > 0
 
     def trigger(self):
-        if self.particle is None:
-            self.particle = self.generate_particle()
+        if not self.active:
+            self.particles.spawn(self.burst, self.screen_width // 2, self.screen_height // 2,
+                                 speed=(0.5, 1.5), color=(0, 255, 0), lifespan=300)
 
-    def update(self, blocks):
-        blocks_to_remove = []
+    def update(self, block_grid):
+        particles = self.particles
+        if not self.active:
+            return
+        particles.step()
 
-        if self.particle:
-            self.particle.move(self.screen_width, self.screen_height)
+        # Bounce off the main particle
+        close = particles.alive & ((particles.x - self.main_particle.x) ** 2 + (particles.y - self.main_particle.y) ** 2 < 1)
+        np.negative(particles.dx, out=particles.dx, where=close)
+        np.negative(particles.dy, out=particles.dy, where=close)
 
-            if self.check_collision(self.particle, self.main_particle):
-                self.particle.dx *= -1
-                self.particle.dy *= -1
-
-            for block in blocks:
-                if block.x <= self.particle.x < block.x + block.width and block.y <= self.particle.y < block.y + block.height:
-                    blocks_to_remove.append(block)
-                    self.particle.dx *= -1
-                    self.particle.dy *= -1
-                    break
-
-            if self.particle.x < 0 or self.particle.y < 0 or self.particle.x >= self.screen_width or self.particle.y >= self.screen_height or self.particle.lifespan <= 0:
-                self.particle = None
-
-        for block in blocks_to_remove:
-            if block in blocks:
-                blocks.remove(block)
-
-    def check_collision(self, particle1, particle2):
-        distance = math.sqrt((particle1.x - particle2.x)**2 + (particle1.y - particle2.y)**2)
-        return distance < 1
-
-class Block:
-    def __init__(self, x, y, width, height, color):
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-        self.color = color
+        hits = block_grid.collide(particles.x, particles.y, particles.alive)
+        particles.dx[hits] *= -1
+        particles.dy[hits] *= -1
 
 class BlockEmitter:
     def __init__(self, screen_width, screen_height, block_size, blocks_per_row):
-        self.blocks = []
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.block_size = block_size
         self.blocks_per_row = blocks_per_row
+        self.grid = BlockGrid(screen_width, screen_height, block_size, block_size)
         self.last_destroyed_time = None
 
+    @property
+    def count(self):
+        return self.grid.count
+
     def trigger(self, num_blocks, block_width, block_height):
-        for i in range(num_blocks):
-            row = i // self.blocks_per_row
-            column = i % self.blocks_per_row
-            x = column * block_width
-            y = row * block_height
-            color = (255, 255, 255)
-            block = Block(x, y, block_width, block_height, color)
-            self.blocks.append(block)
+        if (block_width, block_height) != (self.grid.block_width, self.grid.block_height):
+            self.grid = BlockGrid(self.screen_width, self.screen_height, block_width, block_height)
+        self.grid.fill(num_blocks, self.blocks_per_row, (255, 255, 255))
         self.last_destroyed_time = None
 
     def update(self, particles):
-        blocks_to_remove = []
-        for block in self.blocks[:]:
-            for particle in particles:
-                if block.x <= particle.x < block.x + block.width and block.y <= particle.y < block.y + block.height:
-                    blocks_to_remove.append(block)
-                    particle.dy *= -1
-                    particle.dx += random.uniform(-4, 10)
-                    break
-
-        for block in blocks_to_remove:
-            self.blocks.remove(block)
-
-        if not self.blocks and self.last_destroyed_time is None:
+        xs = np.array([particle.x for particle in particles], dtype=np.float32)
+        ys = np.array([particle.y for particle in particles], dtype=np.float32)
+        for i in self.grid.collide(xs, ys):
+            particles[i].dy *= -1
+            particles[i].dx += random.uniform(-4, 10)
+
+        if self.grid.count == 0 and self.last_destroyed_time is None:
             self.last_destroyed_time = time.time()
 
 class MovingBar:
-    def __init__(self, screen_width, screen_height, bar_width=6, bar_height=1):
+    def __init__(self, screen_width, screen_height, bar_width=6, bar_height=1, hand_controller=None):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.bar_width = bar_width
@@ -192,21 +167,23 @@ class MovingBar:
         self.x = screen_width // 2 - bar_width // 2
         self.y = screen_height - bar_height - 1
         self.speed = 1
-        self.hand_controller = HandController()
         self.direction = None
-        self.thread = threading.Thread(target=self.update_direction_thread)
-        self.thread.daemon = True
-        self.thread.start()
+        # Without a shared controller the bar tracks the hand on its own thread
+        if hand_controller is None:
+            self.hand_controller = HandController()
+            self.thread = threading.Thread(target=self.update_direction_thread)
+            self.thread.daemon = True
+            self.thread.start()
+        else:
+            self.hand_controller = hand_controller
         self.movement_log = []
-        self.log_file = open("movement_log.txt", "w")
+        # Paddle moves go to the event bus, the event handler watches them for inactivity
+        self.events = EventPublisher()
 
     def log_movement(self):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = f"{timestamp}, {self.x}, {self.y}\n"
-        self.movement_log.append(log_entry)
-        self.log_file.write(log_entry)
-        self.log_file.flush()
-        print(log_entry)
+        event = PaddleMoved(time.time(), self.x, self.y)
+        self.movement_log.append(event)
+        self.events.publish(event)
 
     def update_direction(self, direction):
         self.direction = direction
@@ -224,111 +201,179 @@ class MovingBar:
             self.x += self.speed
             self.log_movement()
 
-    def clear_log_file(self):
-        self.log_file.close()
-        open("movement_log.txt", "w").close()
+    def close(self):
+        self.events.close()
+
+class HandTracker(threading.Thread):
+    """
+    Runs the hand controller on its own schedule and posts every direction to an InputMailbox.
+    The controller is released by this thread when its loop ends, never while a read is in progress.
+    """
+
+    def __init__(self, hand_controller, mailbox):
+        super(HandTracker, self).__init__()
+        self.daemon = True
+        self.hand_controller = hand_controller
+        self.mailbox = mailbox
+        self.running = True
+
+    def run(self):
+        try:
+            while self.running:
+                self.mailbox.put(self.hand_controller.get_direction())
+        finally:
+            self.hand_controller.release()
+
+    def stop(self):
+        # A read that is still running after the timeout releases the controller when it returns
+        self.running = False
+        if self.is_alive():
+            self.join(timeout=1.0)
 
 class Game:
-    def __init__(self, width, height, grid_size, direction, num_particles, speed):
+    def __init__(self, width, height, grid_size, direction, num_particles, speed, camera_name=None, display=None):
         self.width = width
         self.height = height
-        self.hand_controller = HandController()
-        self.moving_bar = MovingBar(self.width, self.height)
-
+        # Display sink name (opencv, pygame, contourwall, null, matplotlib), DISPLAY when None
+        self.display = display
+        self.hand_controller = HandController(camera_name)
+        self.moving_bar = MovingBar(self.width, self.height, hand_controller=self.hand_controller)
+        # The tracker fills the mailbox at whatever rate MediaPipe manages, the game never waits for it
+        self.input = InputMailbox('none')
+        self.tracker = HandTracker(self.hand_controller, self.input)
+        self.last_input_seq = 0
+
+        # Physics runs at a fixed rate, rendering as often as the display allows up to render_rate
         self.frame_rate = 30
+        self.render_rate = 60
+        self.timestep = FixedTimestep(self.frame_rate)
+        self.sim_rate = RateCounter()
+        self.render_counter = RateCounter()
         self.last_print_time = time.time()
         self.print_interval = 1.0
 
         self.main_particle = Particle(width // 2, height // 2, speed * 0.5, direction, (255, 0, 0))
+        self.previous_position = (self.main_particle.x, self.main_particle.y)
         self.emitter = ParticleEmitter(self.width, self.height, self.main_particle)
 
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
         self.output_arrays = []
         self.destroyed_bricks = 0
         self.emitter_triggered = False
 
-    def run(self):
-        running = True
-        block_emitter = BlockEmitter(self.width, self.height, 1, 20)
-        block_emitter.trigger(40, 1, 1)
-        frame_counter = 0
-        N = 20
+    def read_input(self):
+        # Every tracker reading moves the paddle once, a reading that was already used is ignored
+        direction, seq, _ = self.input.get()
+        if seq == self.last_input_seq:
+            return
+        self.last_input_seq = seq
+        self.moving_bar.update_direction(direction)
+        self.moving_bar.update()
 
-        np.set_printoptions(threshold=np.inf, linewidth=np.inf)
-        plt.ion()
-        fig, ax = plt.subplots()
+    def step(self, block_emitter):
+        self.read_input()
+        self.previous_position = (self.main_particle.x, self.main_particle.y)
 
-        try:
-            while running:
-                direction = self.hand_controller.get_direction()
-                self.moving_bar.update_direction(direction)
-                self.moving_bar.update()
+        self.main_particle.update_acceleration(0, 0.5)
+        self.main_particle.move(self.width, self.height)
 
-                self.main_particle.update_acceleration(0, 0.5)
-                self.main_particle.move(self.width, self.height)
+        if self.moving_bar.x <= self.main_particle.x < self.moving_bar.x + self.moving_bar.bar_width and self.moving_bar.y <= self.main_particle.y < self.moving_bar.y + self.moving_bar.bar_height:
+            self.main_particle.dy *= -2
+            self.main_particle.dx += random.uniform(-4, 10)
+            self.main_particle.y = self.moving_bar.y - 1
 
-                if self.moving_bar.x <= self.main_particle.x < self.moving_bar.x + self.moving_bar.bar_width and self.moving_bar.y <= self.main_particle.y < self.moving_bar.y + self.moving_bar.bar_height:
-                    self.main_particle.dy *= -2
-                    self.main_particle.dx += random.uniform(-4, 10)
-                    self.main_particle.y = self.moving_bar.y - 1
+        destroyed_bricks_before = block_emitter.count
+        block_emitter.update([self.main_particle])
+        destroyed_bricks_after = block_emitter.count
 
-                destroyed_bricks_before = len(block_emitter.blocks)
-                block_emitter.update([self.main_particle])
-                destroyed_bricks_after = len(block_emitter.blocks)
+        self.destroyed_bricks += destroyed_bricks_before - destroyed_bricks_after
 
-                self.destroyed_bricks += destroyed_bricks_before - destroyed_bricks_after
+        self.emitter.update(block_emitter.grid)
 
-                self.emitter.update(block_emitter.blocks)
+        if self.destroyed_bricks >= 20 and not self.emitter_triggered:
+            self.emitter.trigger()
+            self.destroyed_bricks = 0
+            self.emitter_triggered = True
 
-                if self.destroyed_bricks >= 20 and not self.emitter_triggered:
-                    self.emitter.trigger()
-                    self.destroyed_bricks = 0
-                    self.emitter_triggered = True
+        if self.emitter_triggered and not self.emitter.active:
+            self.emitter_triggered = False
 
-                if self.emitter_triggered and self.emitter.particle is None:
-                    self.emitter_triggered = False
+        if block_emitter.last_destroyed_time and (time.time() - block_emitter.last_destroyed_time >= 10):
+            block_emitter.trigger(40, 1, 1)
+            print("Blocks re-emitted after 10 seconds.")
+            block_emitter.last_destroyed_time = None
 
-                if block_emitter.last_destroyed_time and (time.time() - block_emitter.last_destroyed_time >= 10):
-                    block_emitter.trigger(40, 1, 1)
-                    print("Blocks re-emitted after 10 seconds.")
-                    block_emitter.last_destroyed_time = None
+        self.sim_rate.tick()
 
-                game_array = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+    def render(self, block_emitter, alpha):
+        # One frame buffer is drawn into every time and handed to the display sink
+        game_array = self.frame
+        game_array[:] = 0
 
-                if 0 <= int(self.main_particle.y) < self.height and 0 <= int(self.main_particle.x) < self.width:
-                    game_array[int(self.main_particle.y), int(self.main_particle.x)] = self.main_particle.color
+        # Draw the ball between its last two physics positions
+        previous_x, previous_y = self.previous_position
+        x = int(previous_x + (self.main_particle.x - previous_x) * alpha)
+        y = int(previous_y + (self.main_particle.y - previous_y) * alpha)
+        if 0 <= y < self.height and 0 <= x < self.width:
+            game_array[y, x] = self.main_particle.color
 
-                if self.emitter.particle:
-                    particle = self.emitter.particle
-                    if 0 <= int(particle.y) < self.height and 0 <= int(particle.x) < self.width:
-                        game_array[int(particle.y), int(particle.x)] = particle.color
+        self.emitter.particles.render(game_array)
+        block_emitter.grid.render(game_array)
 
-                for block in block_emitter.blocks:
-                    if 0 <= block.y < self.height and 0 <= block.x < self.width:
-                        game_array[block.y, block.x] = block.color
+        for i in range(self.moving_bar.x, self.moving_bar.x + self.moving_bar.bar_width):
+            for j in range(self.moving_bar.y, self.moving_bar.y + self.moving_bar.bar_height):
+                if 0 <= j < self.height and 0 <= i < self.width:
+                    game_array[j, i] = (255, 255, 255)
 
-                for i in range(self.moving_bar.x, self.moving_bar.x + self.moving_bar.bar_width):
-                    for j in range(self.moving_bar.y, self.moving_bar.y + self.moving_bar.bar_height):
-                        if 0 <= j < self.height and 0 <= i < self.width:
-                            game_array[j, i] = (255, 255, 255)
+        self.render_counter.tick()
+        return game_array
 
-                ax.clear()
-                ax.imshow(game_array)
-                plt.draw()
-                plt.pause(0.001)
+    def print_rates(self):
+        if time.time() - self.last_print_time < self.print_interval:
+            return
+        self.last_print_time = time.time()
+        print(f"[DEBUG] simulated {self.sim_rate.hz:.1f} Hz, rendered {self.render_counter.hz:.1f} Hz, "
+              f"input {self.input.rate.hz:.1f} Hz, dropped {self.timestep.dropped_time:.2f} s")
 
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+    def run(self):
+        running = True
+        block_emitter = BlockEmitter(self.width, self.height, 1, 20)
+        block_emitter.trigger(40, 1, 1)
+        frame_counter = 0
+        N = 20
+
+        np.set_printoptions(threshold=np.inf, linewidth=np.inf)
+        sink = make_sink(self.display)
+        self.tracker.start()
+
+        try:
+            while running:
+                frame_start = time.perf_counter()
+                steps, alpha = self.timestep.advance(frame_start)
+                for _ in range(steps):
+                    self.step(block_emitter)
+
+                game_array = self.render(block_emitter, alpha)
+
+                if not sink.show(game_array):
                     running = False
 
                 frame_counter += 1
+                self.print_rates()
+
+                delay = 1.0 / self.render_rate - (time.perf_counter() - frame_start)
+                if delay > 0:
+                    time.sleep(delay)
         except KeyboardInterrupt:
             pass
         finally:
-            self.moving_bar.clear_log_file()
-            self.hand_controller.release()
-            plt.ioff()
-            plt.close()
+            self.tracker.stop()
+            self.moving_bar.close()
+            sink.close()
             cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    game = Game(20, 20, 1, 1, 1, 2)
+    # Optional shared memory name of a running CameraHub
+    camera_name = sys.argv[1] if len(sys.argv) > 1 else None
+    game = Game(20, 20, 1, 1, 1, 2, camera_name=camera_name)
     game.run()
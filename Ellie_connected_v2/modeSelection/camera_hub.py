@@ -0,0 +1,219 @@
+import cv2
+import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import sys
+import time
+
+# Header layout (int64 fields at the start of the shared memory block)
+WIDTH, HEIGHT, SLOTS, LATEST_SEQ, RUNNING = range(5)
+META_FIELDS = 5
+
+
+class FrameRing:
+    """
+    Ring buffer of camera frames in shared memory.
+
+    Every slot is stamped with the sequence number of the frame it holds, so a
+    reader can tell which frame it got and whether the slot was overwritten while
+    it was looking at it. The slot stamp is set to -1 while a frame is written.
+    """
+
+    def __init__(self, shm):
+        self.shm = shm
+        meta = np.ndarray((META_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        self.width, self.height, self.slots = int(meta[WIDTH]), int(meta[HEIGHT]), int(meta[SLOTS])
+        header_len = META_FIELDS + self.slots
+        self.header = np.ndarray((header_len,), dtype=np.int64, buffer=shm.buf)
+        self.frames = np.ndarray((self.slots, self.height, self.width, 3), dtype=np.uint8,
+                                 buffer=shm.buf, offset=header_len * 8)
+
+    @staticmethod
+    def size(width, height, slots):
+        return (META_FIELDS + slots) * 8 + slots * height * width * 3
+
+    @classmethod
+    def create(cls, width, height, slots, name=None):
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size(width, height, slots))
+        meta = np.ndarray((META_FIELDS + slots,), dtype=np.int64, buffer=shm.buf)
+        meta[:] = 0
+        meta[WIDTH], meta[HEIGHT], meta[SLOTS] = width, height, slots
+        del meta
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name, track=True):
+        # Readers attach with track=False. Before Python 3.13 every attaching process registers the segment with
+        # its resource tracker, and a process that was not started by multiprocessing (the game subprocess) has
+        # its own tracker, which unlinks the hub's segment when that process exits. Only the creator unlinks.
+        if sys.version_info >= (3, 13):
+            return cls(shared_memory.SharedMemory(name=name, track=track))
+        shm = shared_memory.SharedMemory(name=name)
+        if not track:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def latest_seq(self):
+        return int(self.header[LATEST_SEQ])
+
+    @property
+    def running(self):
+        return bool(self.header[RUNNING])
+
+    @running.setter
+    def running(self, value):
+        self.header[RUNNING] = 1 if value else 0
+
+    def write(self, frame):
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        self.header[META_FIELDS + slot] = -1
+        if frame.shape[:2] != (self.height, self.width):
+            cv2.resize(frame, (self.width, self.height), dst=self.frames[slot])
+        else:
+            np.copyto(self.frames[slot], frame)
+        self.header[META_FIELDS + slot] = seq
+        self.header[LATEST_SEQ] = seq
+        return seq
+
+    def get(self, seq):
+        # Zero-copy view of the slot holding frame 'seq'
+        return self.frames[seq % self.slots]
+
+    def is_current(self, seq):
+        # False once the writer has started reusing the slot of frame 'seq'
+        return self.header[META_FIELDS + seq % self.slots] == seq
+
+    def close(self):
+        # Views on shm.buf have to go before the buffer can be closed
+        self.header = None
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A consumer still holds a frame view, the mapping goes away with the process
+            pass
+
+    def unlink(self):
+        if sys.version_info < (3, 13):
+            # A reader started by multiprocessing shares our tracker and its unregister removed our entry as well
+            resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
+
+
+class CameraHub(mp.Process):
+    """
+    Single owner of the camera. Grabs frames in its own process and publishes
+    them into a FrameRing that any number of CameraReader instances attach to.
+    """
+
+    def __init__(self, source=0, width=640, height=480, slots=8, shm_name=None):
+        super(CameraHub, self).__init__()
+        self.daemon = True
+        self.source = source
+        self.ring = FrameRing.create(width, height, slots, name=shm_name)
+        self.shm_name = self.ring.name
+        self.stop_event = mp.Event()
+
+    def __getstate__(self):
+        # The ring holds numpy views on the shared buffer, the child re-attaches by name
+        state = self.__dict__.copy()
+        state['ring'] = None
+        return state
+
+    def run(self):
+        ring = FrameRing.attach(self.shm_name)
+        cap = cv2.VideoCapture(self.source)
+        try:
+            if not cap.isOpened():
+                print("[ERROR] Unable to open camera")
+                return
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, ring.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, ring.height)
+            ring.running = True
+
+            while not self.stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    print("[ERROR] Failed to capture frame")
+                    time.sleep(0.01)
+                    continue
+                ring.write(frame)
+        finally:
+            ring.running = False
+            cap.release()
+            ring.close()
+
+    def stop(self, timeout=2):
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+
+
+class CameraReader:
+    """
+    Reader side of the camera hub with the same read()/isOpened()/release()
+    calls as cv2.VideoCapture, so existing loops can swap it in directly.
+
+    read() returns a read-only view into shared memory, no copy is made. The
+    writer reuses the slot after 'slots' newer frames, so a consumer that keeps
+    a frame around for longer should copy it or check is_current(seq).
+    """
+
+    def __init__(self, shm_name, timeout=2.0, poll_interval=0.001):
+        self.ring = FrameRing.attach(shm_name, track=False)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.last_seq = 0
+        self.skipped_frames = 0
+
+        # Give the hub a moment to open the camera if it was started just now
+        deadline = time.time() + timeout
+        while not self.ring.running and time.time() < deadline:
+            time.sleep(0.01)
+
+    def wait_for_frame(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        while True:
+            seq = self.ring.latest_seq
+            if seq > self.last_seq:
+                return seq
+            if time.time() > deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def read_with_seq(self, timeout=None):
+        seq = self.wait_for_frame(timeout)
+        if seq is None:
+            return None, None
+        if self.last_seq:
+            self.skipped_frames += seq - self.last_seq - 1
+        self.last_seq = seq
+        frame = self.ring.get(seq)
+        frame.flags.writeable = False
+        return seq, frame
+
+    def read(self):
+        seq, frame = self.read_with_seq()
+        return seq is not None, frame
+
+    def is_current(self, seq):
+        return self.ring.is_current(seq)
+
+    def isOpened(self):
+        return self.ring is not None and self.ring.running
+
+    def release(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
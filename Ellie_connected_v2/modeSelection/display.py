@@ -0,0 +1,253 @@
+import functools
+import inspect
+import os
+import sys
+import time
+import numpy as np
+
+# Display used by the games when nothing else is asked for: opencv, pygame, contourwall, null or matplotlib
+DISPLAY = os.environ.get("ELLIE_DISPLAY", "opencv")
+
+# Wall the contourwall sink opens when it gets none: one port (1 tile), six comma separated ports (2x3 tiles)
+# or "virtual" for the VirtualContourWall without hardware
+WALL_PORTS = os.environ.get("ELLIE_WALL_PORTS", "COM4")
+WALL_BAUDRATE = int(os.environ.get("ELLIE_WALL_BAUDRATE", 2_000_000))
+WALL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "drawing mode", "toTheWall")
+
+
+class DisplaySink:
+    """
+    Where a game or effect sends its finished (H, W, 3) frame. Frames are RGB unless the sink was
+    made with bgr=True. show() returns False when the user asked to quit (window closed, 'q' pressed).
+    """
+
+    # (height, width) the sink shows frames at, None when it takes frames of any size
+    shape = None
+
+    def __init__(self, bgr=False):
+        self.bgr = bgr
+        self.frames = 0
+
+    def show(self, frame):
+        self.frames += 1
+        return True
+
+    def close(self):
+        pass
+
+
+class NullSink(DisplaySink):
+    """Headless: frames are only counted, for benchmarks and running without a screen"""
+
+
+class OpenCVSink(DisplaySink):
+    """OpenCV window, every pixel is blown up to 'scale' x 'scale' with nearest-neighbour"""
+
+    def __init__(self, window="Ellie", scale=20, bgr=False):
+        super(OpenCVSink, self).__init__(bgr)
+        import cv2
+        self.cv2 = cv2
+        self.window = window
+        self.scale = scale
+        self.buffer = None
+        cv2.namedWindow(window, cv2.WINDOW_AUTOSIZE)
+
+    def show(self, frame):
+        super(OpenCVSink, self).show(frame)
+        height, width = frame.shape[:2]
+        shape = (height * self.scale, width * self.scale, 3)
+        if self.buffer is None or self.buffer.shape != shape:
+            self.buffer = np.empty(shape, dtype=np.uint8)
+        source = frame if self.bgr else frame[..., ::-1]
+        if self.scale == 1:
+            np.copyto(self.buffer, source)
+        else:
+            self.cv2.resize(np.ascontiguousarray(source), (shape[1], shape[0]), dst=self.buffer,
+                            interpolation=self.cv2.INTER_NEAREST)
+        self.cv2.imshow(self.window, self.buffer)
+        return self.cv2.waitKey(1) & 0xFF != ord('q')
+
+    def close(self):
+        self.cv2.destroyWindow(self.window)
+
+
+class PygameSink(DisplaySink):
+    """pygame window, the frame is blitted onto a surface and scaled up to 'scale' x 'scale' per pixel"""
+
+    def __init__(self, window="Ellie", scale=20, bgr=False):
+        super(PygameSink, self).__init__(bgr)
+        import pygame
+        self.pygame = pygame
+        pygame.init()
+        pygame.display.set_caption(window)
+        self.scale = scale
+        self.screen = None
+        self.surface = None
+
+    def show(self, frame):
+        super(PygameSink, self).show(frame)
+        pygame = self.pygame
+        height, width = frame.shape[:2]
+        if self.surface is None or self.surface.get_size() != (width, height):
+            self.surface = pygame.Surface((width, height))
+            self.screen = pygame.display.set_mode((width * self.scale, height * self.scale))
+        source = frame[..., ::-1] if self.bgr else frame
+        # pygame surfaces are indexed (x, y)
+        pygame.surfarray.blit_array(self.surface, source.swapaxes(0, 1))
+        pygame.transform.scale(self.surface, self.screen.get_size(), self.screen)
+        pygame.display.flip()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                return False
+        return True
+
+    def close(self):
+        self.pygame.quit()
+
+
+class ContourWallSink(DisplaySink):
+    """
+    Sends frames to a ContourWall (or VirtualContourWall). With a ContourWallOutput as 'output' the
+    frames are handed to its sender thread instead of being pushed from the game loop. Without either
+    the sink opens the wall on 'ports' itself (WALL_PORTS and WALL_BAUDRATE by default) and drops it on close().
+    Frames of another size than the wall (a 20x20 game on a 2x3 tile wall) are scaled to fit and centred.
+    """
+
+    def __init__(self, wall=None, output=None, ports=None, baudrate=None, bgr=False):
+        super(ContourWallSink, self).__init__(bgr)
+        self.owns_wall = wall is None and output is None
+        self.wall = open_wall(ports, baudrate) if self.owns_wall else wall
+        self.output = output
+        pixels = output.cw.pixels if output is not None else self.wall.pixels
+        self.shape = pixels.shape[:2]
+        self.buffer = np.zeros_like(pixels)
+
+    def show(self, frame):
+        super(ContourWallSink, self).show(frame)
+        source = frame[..., ::-1] if self.bgr else frame
+        if source.shape[:2] != self.shape:
+            fit_frame(source, self.buffer)
+            source = self.buffer
+        if self.output is not None:
+            self.output.submit(source)
+        else:
+            np.copyto(self.wall.pixels, source, casting='unsafe')
+            self.wall.show()
+        return True
+
+    def close(self):
+        if self.owns_wall:
+            self.wall.fill_solid(0, 0, 0)
+            self.wall.drop()
+
+
+@functools.lru_cache(maxsize=16)
+def _fit_indices(height, width, out_height, out_width):
+    # Nearest-neighbour source rows and columns for the largest size that keeps the aspect ratio
+    scale = min(out_height / height, out_width / width)
+    rows = (np.arange(max(1, round(height * scale))) / scale).astype(np.intp)
+    columns = (np.arange(max(1, round(width * scale))) / scale).astype(np.intp)
+    top, left = (out_height - len(rows)) // 2, (out_width - len(columns)) // 2
+    return (slice(top, top + len(rows)), slice(left, left + len(columns))), np.ix_(rows, columns)
+
+
+def fit_frame(frame, out):
+    """Scale 'frame' into 'out' with nearest-neighbour, keeping its aspect ratio, centred on black"""
+
+    target, index = _fit_indices(*frame.shape[:2], *out.shape[:2])
+    out[:] = 0
+    out[target] = frame[index]
+    return out
+
+
+def open_wall(ports=None, baudrate=None):
+    """ContourWall on 'ports' (one or six, comma separated) or the VirtualContourWall for 'virtual'"""
+
+    ports = [port.strip() for port in (ports or WALL_PORTS).split(",")]
+    baudrate = baudrate or WALL_BAUDRATE
+    if len(ports) not in (1, 6):
+        raise ValueError(f"A ContourWall has 1 or 6 ports, got {', '.join(ports)}")
+    # contourwall.py and its core live with the drawing modes
+    wall_dir = os.path.normpath(WALL_DIR)
+    if wall_dir not in sys.path:
+        sys.path.append(wall_dir)
+    if ports[0].lower() == "virtual":
+        from virtual_contourwall import VirtualContourWall
+        wall = VirtualContourWall()
+    else:
+        from contourwall import ContourWall
+        wall = ContourWall()
+    if len(ports) == 1:
+        wall.single_new_with_port(ports[0], baudrate)
+    else:
+        wall.new_with_ports(*ports, baudrate)
+    return wall
+
+
+class MatplotlibSink(DisplaySink):
+    """The old imshow path, slow (tens of ms per frame) and only meant for debugging"""
+
+    def __init__(self, window="Ellie", bgr=False):
+        super(MatplotlibSink, self).__init__(bgr)
+        import matplotlib.pyplot as plt
+        self.plt = plt
+        plt.ion()
+        self.fig, self.ax = plt.subplots(num=window)
+        self.image = None
+
+    def show(self, frame):
+        super(MatplotlibSink, self).show(frame)
+        source = frame[..., ::-1] if self.bgr else frame
+        if self.image is None or self.image.get_array().shape != source.shape:
+            self.ax.clear()
+            self.image = self.ax.imshow(source)
+        else:
+            self.image.set_data(source)
+        self.plt.pause(0.001)
+        return self.plt.fignum_exists(self.fig.number)
+
+    def close(self):
+        self.plt.ioff()
+        self.plt.close(self.fig)
+
+
+SINKS = {
+    "null": NullSink,
+    "opencv": OpenCVSink,
+    "pygame": PygameSink,
+    "contourwall": ContourWallSink,
+    "matplotlib": MatplotlibSink,
+}
+
+
+def make_sink(name=None, **options):
+    """
+    Create the display sink called 'name' (DISPLAY when None). Options the sink does not take
+    (a window title for the null sink, a scale for the wall) are left out, so callers can pass
+    the same options whatever display is configured.
+    """
+
+    name = (name or DISPLAY).lower()
+    if name not in SINKS:
+        raise ValueError(f"Unknown display '{name}', choose from {', '.join(SINKS)}")
+    sink = SINKS[name]
+    accepted = inspect.signature(sink.__init__).parameters
+    return sink(**{key: value for key, value in options.items() if key in accepted})
+
+
+if __name__ == "__main__":
+    # Time how long each sink takes to show a 20x20 frame: python display.py [sink ...]
+    import sys
+
+    names = sys.argv[1:] or ["null", "opencv", "matplotlib"]
+    frame = np.random.randint(0, 256, (20, 20, 3), dtype=np.uint8)
+    for name in names:
+        sink = make_sink(name)
+        count = 100
+        start = time.perf_counter()
+        for _ in range(count):
+            sink.show(frame)
+        elapsed = time.perf_counter() - start
+        sink.close()
+        print(f"{name:>10}: {elapsed / count * 1000:.2f} ms per frame")
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+def level_table(levels):
+    # 256-entry lookup table mapping a channel value onto 'levels' evenly spaced values
+    if levels < 2:
+        raise ValueError("levels must be at least 2")
+    buckets = np.arange(256) * levels // 256
+    return (buckets * 255 // (levels - 1)).astype(np.uint8)
+
+
+class ColorQuantizer:
+    """
+    Vectorized replacement for the per-pixel quantize_colors loops.
+
+    levels=2 gives the original 1-bit-per-channel look (a channel becomes 255 when
+    it is above 127, otherwise 0). Higher values give that many steps per channel.
+    With a palette (a list of colors in the image's channel order) every pixel is
+    mapped onto the nearest palette color through a precomputed lookup table of
+    2**palette_bits values per channel.
+
+    The result is written into 'out' (which may be the input itself for in-place
+    use). Without 'out' an internal buffer is reused between calls, so copy the
+    result if it has to outlive the next call.
+    """
+
+    def __init__(self, levels=2, palette=None, palette_bits=5):
+        self.levels = levels
+        self.palette = None
+        self.buffers = {}
+        if palette is None:
+            self.table = level_table(levels)
+        else:
+            self.palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+            self.shift = 8 - palette_bits
+            self.table = self.build_palette_table(self.palette, palette_bits)
+
+    @staticmethod
+    def build_palette_table(palette, bits):
+        # Nearest palette color for the center of every (r, g, b) cell of the reduced color cube
+        steps = 1 << bits
+        centers = (np.arange(steps) << (8 - bits)) + (1 << (8 - bits)) // 2
+        cube = np.stack(np.meshgrid(centers, centers, centers, indexing='ij'), axis=-1).reshape(-1, 1, 3)
+        distances = ((cube - palette.astype(np.int32).reshape(1, -1, 3)) ** 2).sum(axis=2)
+        return palette[distances.argmin(axis=1)]
+
+    def buffer(self, key, shape, dtype):
+        buf = self.buffers.get(key)
+        if buf is None or buf.shape != shape:
+            buf = self.buffers[key] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def __call__(self, image, out=None):
+        if out is None:
+            out = self.buffer('out', image.shape, np.uint8)
+        if self.palette is None:
+            np.take(self.table, image, out=out, mode='clip')
+            return out
+
+        height, width = image.shape[:2]
+        shifted = self.buffer('shifted', image.shape, np.uint8)
+        index = self.buffer('index', (height, width), np.intp)
+        scratch = self.buffer('scratch', (height, width), np.intp)
+        np.right_shift(image, self.shift, out=shifted)
+        bits = 8 - self.shift
+        # Flat cube index (c0 << 2 * bits) | (c1 << bits) | c2
+        np.left_shift(shifted[..., 0], 2 * bits, out=index, dtype=np.intp)
+        np.left_shift(shifted[..., 1], bits, out=scratch, dtype=np.intp)
+        index |= scratch
+        index |= shifted[..., 2]
+        np.take(self.table, index, axis=0, out=out, mode='clip')
+        return out
+
+
+# Shared 1-bit quantizer for the scripts that used their own quantize_colors loop
+quantize_colors = ColorQuantizer(levels=2)
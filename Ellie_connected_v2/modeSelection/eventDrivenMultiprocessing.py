@@ -9,6 +9,7 @@ import mediapipe as mp_solutions
 from datetime import datetime
 import sys
 import signal
+from effects import quantize_colors
 
 class VideoAnimation(mp.Process):
     def __init__(self, person_detected_flag):
@@ -35,18 +36,6 @@ class VideoAnimation(mp.Process):
         final = cv2.cvtColor(limg, cv2.COLOR_LAB2BGR)
         return final
 
-    def quantize_colors(self, image):
-        quantized = image.copy()
-        for i in range(image.shape[0]):
-            for j in range(image.shape[1]):
-                pixel = image[i, j]
-                r, g, b = pixel[0], pixel[1], pixel[2]
-                r = 255 if r > 127 else 0
-                g = 255 if g > 127 else 0
-                b = 255 if b > 127 else 0
-                quantized[i, j] = [r, g, b]
-        return quantized
-
     def apply_floating_effect(self, positions):
         if self.motion_detected:
             for index in range(len(positions)):
@@ -103,7 +92,7 @@ class VideoAnimation(mp.Process):
                 contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
                 pixelated = cv2.resize(frame, (self.pixelated_width, self.pixelated_height), interpolation=cv2.INTER_LINEAR)
-                pixelated = self.quantize_colors(pixelated)
+                quantize_colors(pixelated, out=pixelated)
                 if self.canvas is None:
                     self.canvas = np.zeros((self.display_height, self.display_width, 3), dtype=np.uint8)
 
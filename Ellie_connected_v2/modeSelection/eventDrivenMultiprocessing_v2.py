@@ -6,13 +6,21 @@ import numpy as np
 import random
 import os
 import mediapipe as mp_solutions
-from datetime import datetime
 import sys
 import signal
+from camera_hub import CameraHub, CameraReader
+from display import make_sink
+from effects import quantize_colors
+from font_atlas import load_font
+from event_bus import EventBroker, EventPublisher, EventSubscriber, AsyncFileLogger, PaddleMoved, FingerCount, PersonPresent
+
+# Keep writing movement_log.txt / finger_count_output.txt from the bus for debugging
+LOG_EVENTS_TO_FILE = True
 
 class VideoAnimation(mp.Process):
-    def __init__(self, person_detected_flag):
+    def __init__(self, person_detected_flag, camera_name):
         super(VideoAnimation, self).__init__()
+        self.camera_name = camera_name
         self.pixelated_width, self.pixelated_height = 20, 20
         self.display_width, self.display_height = 400, 400
         self.lower_color = np.array([100, 150, 150])
@@ -21,6 +29,7 @@ class VideoAnimation(mp.Process):
         self.running = True
         self.pixel_positions = [(j, i) for i in range(self.pixelated_height) for j in range(self.pixelated_width)]
         self.fgbg = cv2.createBackgroundSubtractorMOG2()
+        self.events = EventPublisher()
         self.debug_file = "person_detection_time.txt"
 
         with open(self.debug_file, "w") as f:
@@ -35,18 +44,6 @@ class VideoAnimation(mp.Process):
         final = cv2.cvtColor(limg, cv2.COLOR_LAB2BGR)
         return final
 
-    def quantize_colors(self, image):
-        quantized = image.copy()
-        for i in range(image.shape[0]):
-            for j in range(image.shape[1]):
-                pixel = image[i, j]
-                r, g, b = pixel[0], pixel[1], pixel[2]
-                r = 255 if r > 127 else 0
-                g = 255 if g > 127 else 0
-                b = 255 if b > 127 else 0
-                quantized[i, j] = [r, g, b]
-        return quantized
-
     def apply_floating_effect(self, positions):
         if self.motion_detected:
             for index in range(len(positions)):
@@ -59,11 +56,13 @@ class VideoAnimation(mp.Process):
 
     def run(self):
         try:
-            self.cap = cv2.VideoCapture(0)  # Initialize the video capture
+            self.cap = CameraReader(self.camera_name)  # Attach to the shared camera
             if not self.cap.isOpened():
                 print("[ERROR] Unable to open camera")
                 return
 
+            # Created in the child process, window handles cannot be pickled
+            self.display = make_sink(window='Pixelated', scale=1, bgr=True)
             self.canvas = None
             self.long_exposure_frame = None
             self.motion_detected = False
@@ -94,6 +93,7 @@ class VideoAnimation(mp.Process):
 
                 if self.person_detected_time >= 30:
                     self.person_detected_flag.value = True
+                    self.events.publish(PersonPresent(time.time(), self.person_detected_time))
                     break
 
                 gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
@@ -103,7 +103,7 @@ class VideoAnimation(mp.Process):
                 contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
                 pixelated = cv2.resize(frame, (self.pixelated_width, self.pixelated_height), interpolation=cv2.INTER_LINEAR)
-                pixelated = self.quantize_colors(pixelated)
+                quantize_colors(pixelated, out=pixelated)
                 if self.canvas is None:
                     self.canvas = np.zeros((self.display_height, self.display_width, 3), dtype=np.uint8)
 
@@ -127,35 +127,26 @@ class VideoAnimation(mp.Process):
                 long_exposure_frame_8bit = cv2.convertScaleAbs(self.long_exposure_frame)
                 combined_frame = cv2.addWeighted(long_exposure_frame_8bit, 0.7, self.canvas, 0.3, 0)
 
-                cv2.imshow('Pixelated', combined_frame)
-
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                if not self.display.show(combined_frame):
                     self.running = False
                     break
 
         finally:
-            if hasattr(self, 'cap') and self.cap.isOpened():
+            if hasattr(self, 'cap'):
                 self.cap.release()
+            if hasattr(self, 'display'):
+                self.display.close()
+            self.events.close()
             cv2.destroyAllWindows()
 
 
 class CharacterLoader:
     def __init__(self):
-        self.character_index = {}
-        self.load_character_index()
+        # Glyphs come from the compiled font atlas, which is loaded once per process
+        self.font = load_font()
 
-    def load_character_index(self):
-        dir_path = os.path.dirname(os.path.abspath(__file__))
-        font_dir = os.path.join(dir_path, "font")
-        files = [f for f in os.listdir(font_dir) if f[-4:] == ".csv"]
-        for file in files:
-            file_path = os.path.join(font_dir, file)
-            data = open(file_path, "r").read()
-            data = [[[255., 255., 255.] if c == '1' else [0., 0., 0.] for c in line.split(',')] for line in data.split("\n")]
-            self.character_index[chr(int(file[5:-4]))] = (np.array(data), len(data[0]), len(data))
-
-    def get_character(self, character):
-        return self.character_index.get(character, None)
+    def get_character(self, character, color=(255, 255, 255)):
+        return self.font.get_character(character, color)
 
 
 class TextWriter:
@@ -163,30 +154,18 @@ class TextWriter:
         self.character_loader = character_loader
 
     def put_text(self, frame, text, start, color=[255, 255, 255]):
-        column_start = start[1]
-        cursor = start
-        char_count = 0
-        for c in text:
-            if c == "\n" or char_count == 50:
-                cursor = [cursor[0] + 6, column_start]
-                char_count = 0
-                if c == "\n":
-                    continue
-            letter = self.character_loader.get_character(c)
-            if letter:
-                letter_image = letter[0] * (np.array(color) / 255)
-                frame[cursor[0]:cursor[0] + letter[2], cursor[1]:cursor[1] + letter[1]] = letter_image
-                cursor[1] += letter[1] + 1
-                char_count += 1
+        return self.character_loader.font.put_text(frame, text, start, color=color)
 
 
 class TextDisplay:
     def __init__(self, text_writer):
         self.text_writer = text_writer
+        self.mat = np.zeros((60, 250, 3), dtype=np.uint8)
+        self.window_created = False
 
     def display_modes(self, selected_mode=None):
-        mat = np.zeros((60, 250, 3))
-        modes_text = "art\ngame\nchat"
+        mat = self.mat
+        mat[:] = 0
         color = [255, 255, 255]
         if selected_mode == 1:
             color = [0, 255, 0]
@@ -199,8 +178,10 @@ class TextDisplay:
         if selected_mode == 3:
             color = [0, 255, 0]
         self.text_writer.put_text(mat, "chat", [13, 0], color=color)
-        cv2.namedWindow('text', cv2.WINDOW_NORMAL)
-        cv2.resizeWindow('text', 1200, 600)
+        if not self.window_created:
+            cv2.namedWindow('text', cv2.WINDOW_NORMAL)
+            cv2.resizeWindow('text', 1200, 600)
+            self.window_created = True
         cv2.imshow("text", mat)
 
 
@@ -254,13 +235,14 @@ class FingerCounter:
 
 
 class ModeSelector(mp.Process):
-    def __init__(self, selected_mode_pipe):
+    def __init__(self, selected_mode_pipe, camera_name):
         super(ModeSelector, self).__init__()
         self.selected_mode_pipe = selected_mode_pipe
+        self.camera_name = camera_name
 
     def run(self):
         try:
-            self.cap = cv2.VideoCapture(0)  # Initialize the video capture
+            self.cap = CameraReader(self.camera_name)  # Attach to the shared camera
             if not self.cap.isOpened():
                 print("[ERROR] Unable to open camera")
                 self.selected_mode_pipe.send(None)
@@ -268,9 +250,9 @@ class ModeSelector(mp.Process):
 
             self.detector = HandDetector()
             self.counter = FingerCounter()
-            self.output_file_path = "finger_count_output.txt"
-            self.clear_file()
+            self.events = EventPublisher()
             self.start_time = None
+            display = TextDisplay(TextWriter(CharacterLoader()))
 
             selected_mode = None
             current_count = None
@@ -288,7 +270,7 @@ class ModeSelector(mp.Process):
                         self.detector.draw_landmarks(image, hand_landmarks)
 
                 finger_count = self.counter.count_fingers(results)
-                self.write_to_file(finger_count)
+                self.events.publish(FingerCount(time.time(), finger_count))
 
                 if finger_count in [1, 2, 3]:
                     if current_count == finger_count:
@@ -305,7 +287,6 @@ class ModeSelector(mp.Process):
                 cv2.putText(image, str(finger_count), (50, 450), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 0, 0), 10)
                 cv2.imshow('MediaPipe Hands', image)
 
-                display = TextDisplay(TextWriter(CharacterLoader()))
                 display.display_modes(selected_mode=finger_count if current_count == finger_count and (time.time() - self.start_time) > 3 else None)
 
                 if cv2.waitKey(5) & 0xFF == 27:
@@ -316,37 +297,33 @@ class ModeSelector(mp.Process):
             self.selected_mode_pipe.send(selected_mode)
 
         finally:
-            if hasattr(self, 'cap') and self.cap.isOpened():
+            if hasattr(self, 'cap'):
                 self.cap.release()
+            if hasattr(self, 'events'):
+                self.events.close()
             cv2.destroyAllWindows()
 
-    def clear_file(self):
-        open(self.output_file_path, 'w').close()
-
-    def write_to_file(self, finger_count):
-        with open(self.output_file_path, "a") as output_file:
-            output_file.write(f"{finger_count}\n")
-            output_file.flush()
-
 
 class EventHandler(mp.Process):
-    def __init__(self, person_detected_flag):
+    def __init__(self, person_detected_flag, camera_name):
         super(EventHandler, self).__init__()
         self.person_detected_flag = person_detected_flag
+        self.camera_name = camera_name
         self.running = True
 
     def run(self):
+        person_events = EventSubscriber(PersonPresent)
         while self.running:
+            # Blocks until VideoAnimation reports a person instead of spinning on the flag
+            person_events.get(timeout=1.0)
             if self.person_detected_flag.value:
                 self.person_detected_flag.value = False  # Reset flag
                 print("[DEBUG] Person detected for 30 seconds, switching to mode selection.")
-                
-                # Properly release camera in VideoAnimation before switching mode
-                time.sleep(2)  # Add delay to ensure resources are released
 
+                # The camera stays open in the CameraHub, no need to wait for VideoAnimation to release it
                 # Create a pipe for mode selection communication
                 parent_conn, child_conn = mp.Pipe()
-                mode_selector = ModeSelector(child_conn)
+                mode_selector = ModeSelector(child_conn, self.camera_name)
                 mode_selector.start()
                 selected_mode = parent_conn.recv()
                 mode_selector.join()
@@ -355,14 +332,18 @@ class EventHandler(mp.Process):
                     print(f"[DEBUG] Mode selected: {selected_mode}")
                     if selected_mode == 2:  # Launch game mode
                         print("[DEBUG] Launching game mode script.")
-                        self.current_process = subprocess.Popen(["python3.11", "brickpongForJetson_v2.py"])
+                        # Subscribe before launching so the first paddle move is not missed
+                        paddle_events = EventSubscriber(PaddleMoved)
+                        self.current_process = subprocess.Popen(["python3.11", "brickpongForJetson_v2.py", self.camera_name])
 
                         # Monitor game activity in the same process
-                        self.monitor_game_activity()
+                        self.monitor_game_activity(paddle_events)
+                        paddle_events.close()
 
                         # After the game process ends
                         self.reset()
                         self.running = False
+                        person_events.close()
                         return  # Exit the current instance to restart the process
 
     def reset(self):
@@ -376,38 +357,25 @@ class EventHandler(mp.Process):
             print("[DEBUG] Clearing movement_log.txt.")
             open("movement_log.txt", "w").close()
 
-    def monitor_game_activity(self):
+    def monitor_game_activity(self, paddle_events, timeout=30):
         last_activity_time = time.time()
         while True:
-            if not os.path.exists("movement_log.txt"):
-                print("[DEBUG] movement_log.txt not found, waiting...")
-                time.sleep(1)
-                continue
-
-            with open("movement_log.txt", "r") as f:
-                lines = f.readlines()
-                if lines:
-                    last_line = lines[-1]
-                    print(f"[DEBUG] Last line in movement_log.txt: {last_line.strip()}")
-                    try:
-                        last_activity_time = datetime.strptime(last_line.split(",")[0].strip(), "%Y-%m-%d %H:%M:%S").timestamp()
-                    except ValueError as e:
-                        print(f"[DEBUG] Error parsing timestamp: {e}")
-                        continue
-
-            current_time = time.time()
-            if current_time - last_activity_time > 30:
-                print("[DEBUG] No game activity detected for 30 seconds.")
+            # Wait for the next paddle move, but never past the inactivity deadline
+            remaining = timeout - (time.time() - last_activity_time)
+            if remaining <= 0:
+                print(f"[DEBUG] No game activity detected for {timeout} seconds.")
                 return
 
-            time.sleep(1)
+            event = paddle_events.get(timeout=remaining)
+            if event is not None:
+                last_activity_time = event.timestamp
 
 
-def run_main_logic():
+def run_main_logic(camera_name):
     person_detected_flag = mp.Value('b', False)
 
-    animation = VideoAnimation(person_detected_flag)
-    handler = EventHandler(person_detected_flag)
+    animation = VideoAnimation(person_detected_flag, camera_name)
+    handler = EventHandler(person_detected_flag, camera_name)
 
     animation.start()
     handler.start()
@@ -421,7 +389,23 @@ def signal_handler(sig, frame):
 
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal_handler)
-    while True:
-        run_main_logic()
-        print("[DEBUG] Restarting the main logic")
-        time.sleep(5)  # Add a small delay before restarting the script to ensure resources are released
+
+    # One capture process for all modes, every mode attaches to its shared memory ring
+    camera_hub = CameraHub(0)
+    camera_hub.start()
+
+    # Modes publish their events here instead of writing and polling text files
+    event_broker = EventBroker()
+    event_broker.start()
+    if LOG_EVENTS_TO_FILE:
+        AsyncFileLogger(event_broker, "movement_log.txt", PaddleMoved).start()
+        AsyncFileLogger(event_broker, "finger_count_output.txt", FingerCount).start()
+
+    try:
+        while True:
+            run_main_logic(camera_hub.shm_name)
+            print("[DEBUG] Restarting the main logic")
+            time.sleep(1)  # Small delay before restarting, the camera itself stays open
+    finally:
+        event_broker.close()
+        camera_hub.stop()
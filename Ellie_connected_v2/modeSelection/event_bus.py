@@ -0,0 +1,190 @@
+import multiprocessing.connection as mpc
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from sys import platform
+
+# Event types, timestamps are time.time() values
+PaddleMoved = namedtuple('PaddleMoved', ['timestamp', 'x', 'y'])
+FingerCount = namedtuple('FingerCount', ['timestamp', 'count'])
+PersonPresent = namedtuple('PersonPresent', ['timestamp', 'seconds'])
+
+if platform == "win32":
+    DEFAULT_ADDRESS = r'\\.\pipe\ellie_event_bus'
+else:
+    DEFAULT_ADDRESS = '/tmp/ellie_event_bus.sock'
+AUTHKEY = b'ellie'
+
+
+def event_name(event_type):
+    return event_type if isinstance(event_type, str) else event_type.__name__
+
+
+class EventBroker(threading.Thread):
+    """
+    Publish/subscribe broker on a local socket (Unix socket, named pipe on Windows).
+
+    Publishers and subscribers in other processes connect with EventPublisher and
+    EventSubscriber, code in the broker's own process can call publish() and
+    subscribe() directly.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS):
+        super(EventBroker, self).__init__()
+        self.daemon = True
+        self.address = address
+        if platform != "win32" and os.path.exists(address):
+            os.remove(address)  # Stale socket from a previous run
+        self.listener = mpc.Listener(address, authkey=AUTHKEY)
+        self.lock = threading.Lock()
+        self.remote_subscribers = []
+        self.local_subscribers = []
+        self.running = True
+
+    def run(self):
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except (OSError, EOFError, mpc.AuthenticationError):
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            hello = conn.recv()
+            if hello[0] == 'subscribe':
+                with self.lock:
+                    self.remote_subscribers.append((conn, set(hello[1])))
+                conn.send(('subscribed',))
+                return  # From now on the broker only writes to this connection
+            while self.running:
+                self.publish(conn.recv())
+        except (OSError, EOFError):
+            conn.close()
+
+    def publish(self, event):
+        name = type(event).__name__
+        with self.lock:
+            for events, names in self.local_subscribers:
+                if name in names:
+                    events.put_nowait(event)
+            for subscriber in self.remote_subscribers[:]:
+                conn, names = subscriber
+                if name not in names:
+                    continue
+                try:
+                    conn.send(event)
+                except (OSError, EOFError):
+                    conn.close()
+                    self.remote_subscribers.remove(subscriber)
+
+    def subscribe(self, *event_types):
+        events = queue.Queue()
+        with self.lock:
+            self.local_subscribers.append((events, {event_name(t) for t in event_types}))
+        return events
+
+    def close(self):
+        self.running = False
+        self.listener.close()
+        with self.lock:
+            for conn, _ in self.remote_subscribers:
+                conn.close()
+            self.remote_subscribers = []
+
+
+class EventPublisher:
+    """
+    Sends events to the broker. Connects lazily and drops events while no broker
+    is listening, so a mode can also run on its own without the event handler.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, retry_interval=1.0):
+        self.address = address
+        self.retry_interval = retry_interval
+        self.conn = None
+        self.next_attempt = 0
+
+    def _connect(self):
+        now = time.time()
+        if now < self.next_attempt:
+            return False
+        try:
+            self.conn = mpc.Client(self.address, authkey=AUTHKEY)
+            self.conn.send(('publish',))
+            return True
+        except (OSError, EOFError, mpc.AuthenticationError):
+            self.conn = None
+            self.next_attempt = now + self.retry_interval
+            return False
+
+    def publish(self, event):
+        if self.conn is None and not self._connect():
+            return False
+        try:
+            self.conn.send(event)
+            return True
+        except (OSError, EOFError):
+            self.conn = None
+            return False
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class EventSubscriber:
+    """Receives the given event types from the broker in another process."""
+
+    def __init__(self, *event_types, address=DEFAULT_ADDRESS):
+        self.conn = mpc.Client(address, authkey=AUTHKEY)
+        self.conn.send(('subscribe', [event_name(t) for t in event_types]))
+        self.conn.recv()  # Wait for the broker to register us, so no event is missed
+
+    def get(self, timeout=None):
+        # Returns the next event, or None when nothing arrived within the timeout
+        if self.conn.poll(timeout):
+            return self.conn.recv()
+        return None
+
+    def close(self):
+        self.conn.close()
+
+
+def format_event(event):
+    timestamp = datetime.fromtimestamp(event.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+    return ", ".join([timestamp] + [str(value) for value in event[1:]]) + "\n"
+
+
+class AsyncFileLogger(threading.Thread):
+    """
+    Optional file sink for the bus. Writes on its own thread and flushes at most
+    once per flush_interval, so publishers never touch the file.
+    """
+
+    def __init__(self, broker, path, *event_types, flush_interval=1.0):
+        super(AsyncFileLogger, self).__init__()
+        self.daemon = True
+        self.path = path
+        self.flush_interval = flush_interval
+        self.events = broker.subscribe(*event_types)
+        self.running = True
+
+    def run(self):
+        with open(self.path, "a") as log_file:
+            last_flush = time.time()
+            while self.running:
+                try:
+                    log_file.write(format_event(self.events.get(timeout=self.flush_interval)))
+                except queue.Empty:
+                    pass
+                if time.time() - last_flush >= self.flush_interval:
+                    log_file.flush()
+                    last_flush = time.time()
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,78 @@
+import threading
+import time
+
+
+class InputMailbox:
+    """
+    Latest value from an input thread (hand tracker, finger counter). put() overwrites the value,
+    get() never blocks and returns (value, seq, timestamp); seq only changes when a new value arrived,
+    so the reader can tell a fresh reading from one it already used.
+    """
+
+    def __init__(self, default=None):
+        self.lock = threading.Lock()
+        self.value = default
+        self.seq = 0
+        self.timestamp = None
+        self.rate = RateCounter()
+
+    def put(self, value):
+        with self.lock:
+            self.value = value
+            self.seq += 1
+            self.timestamp = time.perf_counter()
+        self.rate.tick()
+
+    def get(self):
+        with self.lock:
+            return self.value, self.seq, self.timestamp
+
+
+class RateCounter:
+    """Counts ticks and reports them per second over the last finished window"""
+
+    def __init__(self, window=1.0):
+        self.window = window
+        self.hz = 0.0
+        self._count = 0
+        self._start = time.perf_counter()
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self._count += 1
+        elapsed = now - self._start
+        if elapsed >= self.window:
+            self.hz = self._count / elapsed
+            self._count = 0
+            self._start = now
+
+
+class FixedTimestep:
+    """
+    Accumulator for a fixed physics step. advance() returns how many steps of 1 / step_hz seconds
+    to simulate now and the fraction (alpha) of the next step that has passed, for interpolating
+    the rendered positions. When the loop falls behind more than 'max_steps' the extra time is
+    dropped, so a slow frame does not make the game catch up in a burst.
+    """
+
+    def __init__(self, step_hz=30, max_steps=5):
+        self.dt = 1.0 / step_hz
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped_time = 0.0
+        self.last_time = None
+
+    def advance(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self.last_time is None:
+            self.last_time = now
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            self.dropped_time += (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+            self.accumulator = self.dt * steps
+        self.accumulator -= steps * self.dt
+        return steps, self.accumulator / self.dt
@@ -0,0 +1,80 @@
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from camera_hub import CameraReader, FrameRing
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+READER_SCRIPT = """
+import sys
+from camera_hub import CameraReader
+reader = CameraReader(sys.argv[1], timeout=1.0)
+seq, frame = reader.read_with_seq()
+print(seq, int(frame[0, 0, 0]))
+reader.release()
+"""
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing.create(8, 6, 4)
+    ring.running = True
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def frame(value):
+    return np.full((6, 8, 3), value, dtype=np.uint8)
+
+
+def read_in_child(name, results):
+    reader = CameraReader(name, timeout=1.0)
+    seq, image = reader.read_with_seq()
+    results.put((seq, int(image[0, 0, 0])))
+    reader.release()
+
+
+def test_write_and_read_back(ring):
+    for value in (10, 20, 30):
+        ring.write(frame(value))
+    assert ring.latest_seq == 3
+    assert ring.get(3)[0, 0, 0] == 30
+    assert ring.is_current(3)
+
+    for value in range(4):
+        ring.write(frame(value))
+    assert not ring.is_current(3)  # slot reused by frame 7
+
+
+def test_attach_from_multiprocessing_child(ring):
+    ring.write(frame(42))
+    results = mp.Queue()
+    child = mp.Process(target=read_in_child, args=(ring.name, results))
+    child.start()
+    assert results.get(timeout=5) == (1, 42)
+    child.join(5)
+    assert child.exitcode == 0
+
+    # The segment outlives the child and takes new frames
+    ring.write(frame(43))
+    assert ring.get(ring.latest_seq)[0, 0, 0] == 43
+
+
+def test_separate_interpreter_does_not_unlink(ring):
+    # The game runs as its own python process with its own resource tracker
+    for value in (1, 2):
+        ring.write(frame(value))
+        out = subprocess.run([sys.executable, "-c", READER_SCRIPT, ring.name], cwd=HERE,
+                             capture_output=True, text=True, timeout=30)
+        assert out.returncode == 0, out.stderr
+        assert out.stdout.split() == [str(value), str(value)]
+
+    reader = CameraReader(ring.name, timeout=1.0)
+    assert reader.isOpened()
+    reader.release()
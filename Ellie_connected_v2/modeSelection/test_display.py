@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from display import ContourWallSink, fit_frame, make_sink
+
+
+@pytest.fixture
+def frame():
+    return np.random.default_rng(0).integers(1, 256, (20, 20, 3), dtype=np.uint8)
+
+
+def test_fit_same_size_is_a_copy(frame):
+    out = np.zeros_like(frame)
+    assert np.array_equal(fit_frame(frame, out), frame)
+
+
+def test_fit_scales_up_and_centres(frame):
+    out = np.full((40, 60, 3), 7, dtype=np.uint8)
+    fit_frame(frame, out)
+    assert not out[:, :10].any() and not out[:, 50:].any()
+    assert np.array_equal(out[:, 10:50], frame.repeat(2, axis=0).repeat(2, axis=1))
+
+
+def test_fit_scales_down():
+    # A 250x40 text layer on one tile keeps its aspect ratio: 20 wide, 3 high
+    layer = np.full((40, 250, 3), 255, dtype=np.uint8)
+    out = np.zeros((20, 20, 3), dtype=np.uint8)
+    fit_frame(layer, out)
+    assert out.any(axis=2).sum(axis=1).tolist() == [0] * 8 + [20] * 3 + [0] * 9
+
+
+@pytest.mark.parametrize("ports, shape", [("virtual", (20, 20)), ("virtual,v,v,v,v,v", (40, 60))])
+def test_wall_sink_takes_any_frame_size(frame, ports, shape):
+    sink = make_sink("contourwall", ports=ports)
+    assert isinstance(sink, ContourWallSink) and sink.shape == shape
+    assert sink.show(frame)
+    expected = np.zeros(shape + (3,), dtype=np.uint8)
+    assert np.array_equal(sink.wall.last_pushed, fit_frame(frame, expected))
+    sink.close()
+
+
+def test_windowed_sinks_take_any_size():
+    assert make_sink("null").shape is None
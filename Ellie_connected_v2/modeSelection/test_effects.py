@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from effects import ColorQuantizer, level_table, quantize_colors
+
+
+def quantize_colors_loop(image):
+    # The per-pixel function the modes used before ColorQuantizer
+    quantized = image.copy()
+    for i in range(image.shape[0]):
+        for j in range(image.shape[1]):
+            pixel = image[i, j]
+            r, g, b = pixel[0], pixel[1], pixel[2]
+            r = 255 if r > 127 else 0
+            g = 255 if g > 127 else 0
+            b = 255 if b > 127 else 0
+            quantized[i, j] = [r, g, b]
+    return quantized
+
+
+@pytest.mark.parametrize("shape", [(20, 20, 3), (40, 60, 3), (1, 1, 3)])
+def test_matches_per_pixel_loop(shape):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, shape, dtype=np.uint8)
+    assert np.array_equal(quantize_colors(image), quantize_colors_loop(image))
+
+
+def test_every_channel_value_matches_loop():
+    image = np.repeat(np.arange(256, dtype=np.uint8), 3).reshape(16, 16, 3)
+    assert np.array_equal(quantize_colors(image), quantize_colors_loop(image))
+
+
+def test_in_place():
+    rng = np.random.default_rng(1)
+    image = rng.integers(0, 256, (20, 20, 3), dtype=np.uint8)
+    expected = quantize_colors_loop(image)
+    result = quantize_colors(image, out=image)
+    assert result is image
+    assert np.array_equal(image, expected)
+
+
+def test_levels():
+    assert list(level_table(4)[[0, 63, 64, 127, 128, 191, 192, 255]]) == [0, 0, 85, 85, 170, 170, 255, 255]
+    with pytest.raises(ValueError):
+        level_table(1)
+
+
+def test_palette_maps_onto_nearest_color():
+    palette = [(0, 0, 0), (255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 255)]
+    quantizer = ColorQuantizer(palette=palette)
+    rng = np.random.default_rng(2)
+    image = rng.integers(0, 256, (30, 30, 3), dtype=np.uint8)
+    result = quantizer(image)
+
+    colors = np.asarray(palette, dtype=np.int32)
+    assert {tuple(c) for c in result.reshape(-1, 3)} <= {tuple(c) for c in palette}
+    # The lookup works on 5-bit cells, so allow the error of half a cell per channel
+    chosen = ((result.astype(np.int32) - image) ** 2).sum(axis=2)
+    nearest = ((image[:, :, None, :].astype(np.int32) - colors) ** 2).sum(axis=3).min(axis=2)
+    assert np.all(np.sqrt(chosen) <= np.sqrt(nearest) + np.sqrt(3) * 8)
+    assert np.array_equal(quantizer(np.asarray(palette, dtype=np.uint8).reshape(1, -1, 3))[0], palette)
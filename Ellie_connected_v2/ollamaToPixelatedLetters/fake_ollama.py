@@ -0,0 +1,96 @@
+#Fake Ollama server for trying the streaming path without a model
+#It answers POST /api/generate with a canned joke as NDJSON, one word every 'delay' seconds
+#Run: python fake_ollama.py [port] [delay] and point ollama_stream.py / the listener at it
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+JOKE = "Why do programmers prefer dark mode? Because light attracts bugs."
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        words = self.server.response.split(" ")
+        tokens = [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+        if not request.get("stream", True):
+            self.send_json({"model": request.get("model"), "response": "".join(tokens), "done": True})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, token in enumerate(tokens):
+            if i == self.server.fail_after:
+                # Ollama reports a failure during generation as an "error" line and ends the stream
+                self.send_chunk({"error": "fake generation failure"})
+                self.wfile.write(b"0\r\n\r\n")
+                return
+            time.sleep(self.server.delay)
+            self.send_chunk({"model": request.get("model"), "response": token, "done": False})
+        self.send_chunk({"model": request.get("model"), "response": "", "done": True})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def send_chunk(self, data):
+        line = json.dumps(data).encode() + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """
+    Fake Ollama on 'port' (0 picks a free one), start() serves it on a background thread.
+    With 'fail_after' set the stream sends an error line after that many tokens.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=11434, delay=0.1, response=JOKE, fail_after=None):
+        super(FakeOllamaServer, self).__init__(("127.0.0.1", port), FakeOllamaHandler)
+        self.delay = delay
+        self.response = response
+        self.fail_after = fail_after
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/generate"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 11434
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    server = FakeOllamaServer(port, delay)
+    print(f"Fake Ollama on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+
+class FileTail:
+    """
+    Reads the lines appended to a file since the last call, starting from a saved byte offset
+    instead of re-reading the whole file. A file that got shorter (truncated) is read again from
+    the start, as is a new file under the same name (rotated). A partial last line is kept until
+    its newline arrives.
+    """
+
+    def __init__(self, path, from_end=True):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.partial = b""
+        if from_end and os.path.exists(path):
+            stat = os.stat(path)
+            self.offset, self.inode = stat.st_size, stat.st_ino
+
+    def read_lines(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.offset, self.inode, self.partial = 0, stat.st_ino, b""
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+        *lines, self.partial = (self.partial + data).split(b"\n")
+        return [line.decode(errors="ignore").strip() for line in lines]
+
+
+class DigitDebouncer:
+    """
+    Turns a noisy stream of finger counts into requests. A count is stable once it has been seen without
+    interruption in 'stable_frames' lines and for 'stable_time' seconds. A stable digit in 'valid' fires
+    once; it fires again only after another count became stable, so a count that drops out for a frame
+    or two does not repeat the request.
+    """
+
+    def __init__(self, stable_time=1.0, valid=range(1, 6), stable_frames=3):
+        self.stable_time = stable_time
+        self.stable_frames = stable_frames
+        self.valid = set(valid)
+        self.candidate = None
+        self.since = None
+        self.frames = 0
+        self.stable = None
+
+    def feed(self, value, now=None):
+        now = time.monotonic() if now is None else now
+        if value != self.candidate:
+            self.candidate, self.since, self.frames = value, now, 0
+        self.frames += 1
+        if value == self.stable or self.frames < self.stable_frames or now - self.since < self.stable_time:
+            return None
+        self.stable = value
+        return value if value in self.valid else None
+
+
+class LatestMailbox:
+    """
+    One-slot mailbox from a producer thread (the file watcher) to the loop that handles the requests.
+    Only the newest waiting item is kept, one that is replaced before it was taken, or is older than
+    'max_age' seconds when it is taken, counts as dropped.
+    """
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self.condition = threading.Condition()
+        self.pending = None
+        self.taken = 0
+        self.dropped = 0
+
+    def submit(self, item):
+        with self.condition:
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = (time.monotonic(), item)
+            self.condition.notify()
+
+    def take(self, timeout=None):
+        """The newest waiting item, None when nothing (fresh) arrived within 'timeout' seconds"""
+
+        with self.condition:
+            if self.pending is None:
+                self.condition.wait(timeout)
+            if self.pending is None:
+                return None
+            submitted, item = self.pending
+            self.pending = None
+        if self.max_age is not None and time.monotonic() - submitted > self.max_age:
+            self.dropped += 1
+            return None
+        self.taken += 1
+        return item
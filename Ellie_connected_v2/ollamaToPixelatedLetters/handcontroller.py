@@ -58,6 +58,8 @@ class App:
         self.detector = HandDetector()
         self.counter = FingerCounter()
         self.output_file_path = "finger_count_output.txt"
+        # The listener tails the file, so it is cut back to empty instead of growing every frame forever
+        self.max_file_size = 64 * 1024
         self.clear_file()
 
     def clear_file(self):
@@ -90,6 +92,8 @@ class App:
             cv2.destroyAllWindows()
 
     def write_to_file(self, finger_count):
+        if self.output_file.tell() >= self.max_file_size:
+            self.output_file.truncate(0)  # Append mode keeps writing from the new end
         self.output_file.write(f"{finger_count}\n")
         self.output_file.flush()  # Flush after every write
 
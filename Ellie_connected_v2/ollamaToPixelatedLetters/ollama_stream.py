@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+import requests
+
+OLLAMA_URL = "http://localhost:11434/api/generate"
+
+
+def stream_generate(prompt, model="qwen:0.5b", url=OLLAMA_URL, timeout=60):
+    """
+    Yield the response of Ollama's /api/generate token by token. The endpoint answers with one
+    JSON object per line (NDJSON) and sets "done" on the last one.
+    """
+
+    data = {"prompt": prompt, "model": model, "stream": True}
+    with requests.post(url, json=data, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"])
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+
+
+class TokenStreamer(threading.Thread):
+    """
+    Consumes a token iterator (stream_generate, chain.stream) on its own thread and hands every
+    token to 'on_token' as it arrives, e.g. Typewriter.feed. Records how long the first token and
+    the whole response took; an exception from the iterator ends up in 'error'.
+    """
+
+    def __init__(self, tokens, on_token):
+        super(TokenStreamer, self).__init__()
+        self.daemon = True
+        self.tokens = tokens
+        self.on_token = on_token
+        self.text = ""
+        self.error = None
+        self.first_token_time = None
+        self.total_time = None
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            for token in self.tokens:
+                if self.first_token_time is None:
+                    self.first_token_time = time.perf_counter() - start
+                self.text += token
+                self.on_token(token)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.total_time = time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    # Stream a prompt to the console: python ollama_stream.py "Tell me a joke" [model]
+    # Start fake_ollama.py first to try it without a model
+    import sys
+
+    prompt = sys.argv[1] if len(sys.argv) > 1 else "Tell me a short joke about Software."
+    model = sys.argv[2] if len(sys.argv) > 2 else "qwen:0.5b"
+    streamer = TokenStreamer(stream_generate(prompt, model), lambda token: print(token, end="", flush=True))
+    streamer.start()
+    streamer.join()
+    print()
+    if streamer.error:
+        print("Error:", streamer.error)
+    else:
+        print(f"first token after {streamer.first_token_time:.2f} s, full response after {streamer.total_time:.2f} s")
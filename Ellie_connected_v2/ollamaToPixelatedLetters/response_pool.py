@@ -0,0 +1,184 @@
+import collections
+import json
+import os
+import queue
+import threading
+import time
+
+
+def normalize(text):
+    # Answers that only differ in case, spacing or punctuation count as the same joke
+    return " ".join("".join(c for c in text.lower() if c.isalnum() or c.isspace()).split())
+
+
+class ResponsePool:
+    """
+    Pre-generated LLM responses per topic, so a request can be answered instantly while the next
+    response is generated in the background.
+
+    Each topic keeps up to 'pool_size' responses, at most 'max_entries' in total; when that is
+    exceeded the least recently requested topic gives up its oldest response. Responses older than
+    'ttl' seconds are dropped. A new response that matches one of the last 'recent' answers of its
+    topic (or one still in the pool) is thrown away and generated again, up to 'retries' times.
+    The pool is saved to 'path' after every change and loaded again on start.
+
+    Example code::
+            ```
+            pool = ResponsePool(chat_interface.get_response, topic_dict.values())
+            pool.start()
+            response = pool.get("Software")  # None when the pool for that topic is empty
+            ```
+    """
+
+    def __init__(self, generate, topics, pool_size=2, max_entries=10, ttl=24 * 3600, recent=20,
+                 retries=3, path="response_pool.json"):
+        self.generate = generate
+        self.topics = list(topics)
+        self.pool_size = pool_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.retries = retries
+        self.path = path
+
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        # topic -> deque of (created, text), topics ordered from least to most recently requested
+        self.pools = collections.OrderedDict((topic, collections.deque()) for topic in self.topics)
+        self.recent = {topic: collections.deque(maxlen=recent) for topic in self.topics}
+        self.requests = queue.Queue()
+        self.queued = set()
+        self.running = False
+        self.hits = 0
+        self.misses = 0
+        self.duplicates = 0
+        self.load()
+
+    def start(self):
+        """Start the background generator and fill every topic"""
+
+        self.running = True
+        threading.Thread(target=self._worker, daemon=True).start()
+        for topic in self.topics:
+            self.refill(topic)
+
+    def stop(self):
+        self.running = False
+        self.requests.put(None)
+
+    def get(self, topic):
+        """Take a response for 'topic' out of the pool (None when there is none) and refill it"""
+
+        with self.lock:
+            self.pools.move_to_end(topic)
+            self._expire(topic)
+            pool = self.pools[topic]
+            response = pool.popleft()[1] if pool else None
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.recent[topic].append(normalize(response))
+        if response is not None:
+            self.save()
+        self.refill(topic)
+        return response
+
+    def remember(self, topic, response):
+        """
+        Record a response that was generated outside the pool, so it is not served again. Only pass
+        complete responses: None or an empty one (a stream that failed) is ignored.
+        """
+
+        if not response or not response.strip():
+            return
+        with self.lock:
+            self.recent[topic].append(normalize(response))
+
+    def refill(self, topic):
+        with self.lock:
+            if topic in self.queued or len(self.pools[topic]) >= self.pool_size:
+                return
+            self.queued.add(topic)
+        self.requests.put(topic)
+
+    def _worker(self):
+        while self.running:
+            topic = self.requests.get()
+            if topic is None:
+                break
+            try:
+                self._fill(topic)
+            except Exception as e:
+                print(f"[ERROR] Generating a response for {topic} failed: {e}")
+            finally:
+                with self.lock:
+                    self.queued.discard(topic)
+
+    def _fill(self, topic):
+        # Every duplicate costs one of the retries on top of the responses the pool needs
+        for _ in range(self.pool_size + self.retries):
+            if not self.running or len(self.pools[topic]) >= self.pool_size:
+                break
+            response = self.generate(topic)
+            if not response or not response.strip():
+                continue
+            with self.lock:
+                known = set(self.recent[topic]) | {normalize(text) for _, text in self.pools[topic]}
+                if normalize(response) in known:
+                    self.duplicates += 1
+                    continue
+                self.pools[topic].append((time.time(), response))
+                self._evict(keep=topic)
+            self.save()
+
+    def _expire(self, topic):
+        pool = self.pools[topic]
+        while pool and time.time() - pool[0][0] > self.ttl:
+            pool.popleft()
+
+    def _evict(self, keep=None):
+        # Least recently requested topics are first in the OrderedDict, 'keep' goes last
+        order = [pool for topic, pool in self.pools.items() if topic != keep]
+        if keep is not None:
+            order.append(self.pools[keep])
+        while sum(len(pool) for pool in self.pools.values()) > self.max_entries:
+            next(pool for pool in order if pool).popleft()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "duplicates": self.duplicates,
+                "pooled": {topic: len(pool) for topic, pool in self.pools.items()},
+            }
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = {
+                "pools": {topic: list(pool) for topic, pool in self.pools.items()},
+                "recent": {topic: list(recent) for topic, recent in self.recent.items()},
+            }
+        # Write next to the file and swap it in, a crash never leaves half a pool behind
+        with self.save_lock:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Could not load {self.path}: {e}")
+            return
+        for topic in self.topics:
+            self.pools[topic].extend(tuple(entry) for entry in data.get("pools", {}).get(topic, [])[-self.pool_size:])
+            self.recent[topic].extend(data.get("recent", {}).get(topic, []))
+            self._expire(topic)
+        self._evict()
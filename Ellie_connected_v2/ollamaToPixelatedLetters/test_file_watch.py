@@ -0,0 +1,73 @@
+import threading
+
+from file_watch import DigitDebouncer, FileTail, LatestMailbox
+
+
+def feed(debouncer, values, start=0.0, step=0.1):
+    # Feeds one count per 'step' seconds, returns the requests that fired
+    return [fired for i, value in enumerate(values)
+            if (fired := debouncer.feed(value, now=start + i * step)) is not None]
+
+
+def test_count_fires_once_when_stable():
+    debouncer = DigitDebouncer(stable_time=1.0, stable_frames=3)
+    assert feed(debouncer, [3] * 30) == [3]
+
+
+def test_dropout_does_not_fire_again():
+    debouncer = DigitDebouncer(stable_time=1.0, stable_frames=3)
+    values = [3] * 15 + [2] + [3] * 15 + [0, 0] + [3] * 15
+    assert feed(debouncer, values) == [3]
+
+
+def test_new_stable_count_fires():
+    debouncer = DigitDebouncer(stable_time=1.0, stable_frames=3)
+    assert feed(debouncer, [3] * 15 + [4] * 15 + [3] * 15) == [3, 4, 3]
+
+
+def test_invalid_count_in_between_allows_repeat():
+    debouncer = DigitDebouncer(stable_time=1.0, stable_frames=3)
+    assert feed(debouncer, [3] * 15 + [0] * 15 + [3] * 15) == [3, 3]
+
+
+def test_stable_time_needs_enough_frames():
+    # Two lines seen far apart are not a stable count
+    debouncer = DigitDebouncer(stable_time=1.0, stable_frames=3)
+    assert feed(debouncer, [5, 5], step=2.0) == []
+
+
+def test_mailbox_keeps_newest():
+    mailbox = LatestMailbox()
+    for item in (1, 2, 3):
+        mailbox.submit(item)
+    assert mailbox.take(timeout=0) == 3
+    assert mailbox.take(timeout=0) is None
+    assert (mailbox.taken, mailbox.dropped) == (1, 2)
+
+
+def test_mailbox_wakes_up_on_submit():
+    mailbox = LatestMailbox()
+    threading.Timer(0.05, mailbox.submit, args=(4,)).start()
+    assert mailbox.take(timeout=5) == 4
+
+
+def test_mailbox_drops_old_items():
+    mailbox = LatestMailbox(max_age=0.0)
+    mailbox.submit(1)
+    threading.Event().wait(0.01)
+    assert mailbox.take(timeout=0) is None
+    assert mailbox.dropped == 1
+
+
+def test_tail_reads_appended_and_truncated(tmp_path):
+    path = tmp_path / "counts.txt"
+    path.write_text("1\n")
+    tail = FileTail(str(path))
+    with open(path, "a") as f:
+        f.write("2\n3")
+    assert tail.read_lines() == ["2"]
+    with open(path, "a") as f:
+        f.write("\n")
+    assert tail.read_lines() == ["3"]
+    path.write_text("4\n")
+    assert tail.read_lines() == ["4"]
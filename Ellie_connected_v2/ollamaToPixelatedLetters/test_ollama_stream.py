@@ -0,0 +1,57 @@
+import pytest
+import requests
+
+from fake_ollama import JOKE, FakeOllamaServer
+from ollama_stream import TokenStreamer, stream_generate
+
+
+@pytest.fixture
+def server(request):
+    server = FakeOllamaServer(port=0, delay=0.01, **getattr(request, "param", {})).start()
+    yield server
+    server.stop()
+
+
+def words(text):
+    return [word if i == 0 else " " + word for i, word in enumerate(text.split(" "))]
+
+
+def test_tokens_arrive_in_order(server):
+    assert list(stream_generate("joke", url=server.url)) == words(JOKE)
+
+
+def test_stream_ends_at_done(server):
+    tokens = stream_generate("joke", url=server.url)
+    assert "".join(tokens) == JOKE
+    # The generator finished on the "done" line and closed the response
+    assert next(tokens, None) is None
+
+
+def test_streamer_collects_text(server):
+    received = []
+    streamer = TokenStreamer(stream_generate("joke", url=server.url), received.append)
+    streamer.start()
+    streamer.join(timeout=10)
+    assert streamer.error is None
+    assert received == words(JOKE) and streamer.text == JOKE
+    assert 0 <= streamer.first_token_time <= streamer.total_time
+
+
+@pytest.mark.parametrize("server", [{"fail_after": 3}], indirect=True)
+def test_error_line_ends_the_stream(server):
+    received = []
+    streamer = TokenStreamer(stream_generate("joke", url=server.url), received.append)
+    streamer.start()
+    streamer.join(timeout=10)
+    assert received == words(JOKE)[:3]
+    assert isinstance(streamer.error, RuntimeError) and "fake generation failure" in str(streamer.error)
+
+
+def test_http_error_is_raised(server):
+    with pytest.raises(requests.HTTPError):
+        list(stream_generate("joke", url=server.url.replace("/api/generate", "/api/missing")))
+
+
+def test_non_streaming_request(server):
+    reply = requests.post(server.url, json={"prompt": "joke", "model": "m", "stream": False}, timeout=10).json()
+    assert reply == {"model": "m", "response": JOKE, "done": True}
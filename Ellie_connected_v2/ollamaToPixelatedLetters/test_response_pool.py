@@ -0,0 +1,126 @@
+import collections
+import threading
+import time
+
+from response_pool import ResponsePool
+
+
+class Jokes:
+    # Generator that numbers its jokes per topic and counts the calls
+    def __init__(self):
+        self.calls = collections.Counter()
+
+    def __call__(self, topic):
+        self.calls[topic] += 1
+        return f"{topic} joke {self.calls[topic]}"
+
+
+def settle(pool, timeout=5.0):
+    # Waits until the background generator has no topic queued or in flight
+    end = time.time() + timeout
+    while pool.queued and time.time() < end:
+        time.sleep(0.01)
+    assert not pool.queued
+
+
+def test_get_serves_pooled_jokes_in_order():
+    pool = ResponsePool(Jokes(), ["a"], pool_size=2, path=None)
+    pool.start()
+    settle(pool)
+    assert [pool.get("a"), pool.get("a")] == ["a joke 1", "a joke 2"]
+    assert pool.stats()["hits"] == 2
+    pool.stop()
+
+
+def test_least_recently_requested_topic_is_evicted():
+    pool = ResponsePool(Jokes(), ["a", "b", "c"], pool_size=2, max_entries=4, path=None)
+    pool.start()
+    settle(pool)
+    # a was filled first and never requested, so c's jokes pushed it out
+    assert pool.stats()["pooled"] == {"a": 0, "b": 2, "c": 2}
+
+    assert pool.get("a") is None
+    settle(pool)
+    # Requesting a made b the least recently requested topic
+    assert pool.stats()["pooled"] == {"a": 2, "b": 0, "c": 2}
+    assert pool.stats()["misses"] == 1
+    pool.stop()
+
+
+def test_expired_jokes_are_not_served():
+    pool = ResponsePool(Jokes(), ["a"], pool_size=1, ttl=0.05, path=None)
+    pool.start()
+    settle(pool)
+    time.sleep(0.1)
+    assert pool.get("a") is None
+    settle(pool)
+    assert pool.get("a") == "a joke 2"
+    pool.stop()
+
+
+def test_refill_in_flight_is_not_queued_again():
+    release = threading.Event()
+    jokes = Jokes()
+
+    def slow(topic):
+        release.wait(5)
+        return jokes(topic)
+
+    pool = ResponsePool(slow, ["a"], pool_size=2, path=None)
+    pool.start()
+    for _ in range(5):
+        pool.refill("a")
+    assert pool.requests.qsize() <= 1
+    release.set()
+    settle(pool)
+    assert jokes.calls["a"] == 2
+    pool.stop()
+
+
+def test_duplicates_are_generated_again():
+    pool = ResponsePool(lambda topic: "Same joke!", ["a"], pool_size=2, retries=3, path=None)
+    pool.start()
+    settle(pool)
+    assert pool.stats()["pooled"] == {"a": 1}
+    assert pool.stats()["duplicates"] == 4
+    pool.stop()
+
+
+def test_pool_is_persisted(tmp_path):
+    path = str(tmp_path / "pool.json")
+    pool = ResponsePool(Jokes(), ["a", "b"], pool_size=2, path=path)
+    pool.start()
+    settle(pool)
+    pool.stop()
+    assert pool.get("a") == "a joke 1"
+
+    restored = ResponsePool(Jokes(), ["a", "b"], pool_size=2, path=path)
+    assert restored.stats()["pooled"] == {"a": 1, "b": 2}
+    assert restored.get("a") == "a joke 2"
+    # Served jokes are remembered across restarts
+    assert list(restored.recent["a"]) == ["a joke 1", "a joke 2"]
+
+
+def test_expired_jokes_are_dropped_on_load(tmp_path):
+    path = str(tmp_path / "pool.json")
+    pool = ResponsePool(Jokes(), ["a"], pool_size=2, path=path)
+    pool.start()
+    settle(pool)
+    pool.stop()
+    time.sleep(0.1)
+    assert ResponsePool(Jokes(), ["a"], ttl=0.05, path=path).stats()["pooled"] == {"a": 0}
+
+
+def test_only_complete_responses_are_kept():
+    pool = ResponsePool(lambda topic: "", ["a"], pool_size=1, retries=1, path=None)
+    pool.remember("a", None)
+    pool.remember("a", "  ")
+    assert not pool.recent["a"]
+    pool.remember("a", "A whole joke.")
+    assert list(pool.recent["a"]) == ["a whole joke"]
+
+    # A failed generation (empty text) is never pooled
+    pool.start()
+    settle(pool)
+    assert pool.get("a") is None
+    pool.stop()
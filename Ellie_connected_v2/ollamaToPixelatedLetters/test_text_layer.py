@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from text_layer import TextLayer, Typewriter
+from display import make_sink
+
+
+@pytest.mark.parametrize("ports, shape", [("virtual", (20, 20)), ("virtual,v,v,v,v,v", (40, 60))])
+def test_layer_takes_the_wall_size(ports, shape):
+    sink = make_sink("contourwall", ports=ports)
+    layer = TextLayer.for_sink(sink)
+    assert layer.frame.shape == shape + (3,)
+
+    typewriter = Typewriter(layer, sink, interval=0.0)
+    typewriter.feed("Why do programmers prefer dark mode? Because light attracts bugs.")
+    while not typewriter.done:
+        assert typewriter.update()
+    assert sink.wall.pushed_frames > 0
+    assert np.array_equal(sink.wall.last_pushed, layer.frame)
+    sink.close()
+
+
+def test_window_layer_keeps_default_size():
+    layer = TextLayer.for_sink(make_sink("null"), line_length=50)
+    assert layer.frame.shape == (40, 250, 3) and layer.line_length == 50
+
+
+def test_narrow_layer_wraps_and_scrolls():
+    layer = TextLayer(20, 20)
+    assert layer.append("a joke that is much wider than one tile") > 0
+    assert layer.scrolled_lines > 0
+    assert layer.row + layer.font.height <= layer.height
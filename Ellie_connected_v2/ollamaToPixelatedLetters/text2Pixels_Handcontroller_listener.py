@@ -11,52 +11,23 @@
 
 
 
-import cv2 as cv
-import numpy as np
 import os
-import time
+import sys
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "modeSelection"))
+from display import make_sink  # display sinks shared with modeSelection
+from text_layer import TextLayer, Typewriter
+from ollama_stream import TokenStreamer
+from response_pool import ResponsePool
+from file_watch import FileTail, DigitDebouncer, LatestMailbox
 from langchain_community.chat_models import ChatOllama
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
-class CharacterLoader:
-    def __init__(self):
-        self.character_index = {}
-        self.load_character_index()
-
-    def load_character_index(self):
-        dir_path = os.path.dirname(os.path.abspath(__file__))
-        font_dir = os.path.join(dir_path, "font")
-        files = [f for f in os.listdir(font_dir) if f[-4:] == ".csv"]
-        for file in files:
-            file_path = os.path.join(font_dir, file)
-            data = open(file_path, "r").read()
-            data = [[[255., 255., 255.] if c == '1' else [0., 0., 0.] for c in line.split(',')] for line in data.split("\n")]
-            self.character_index[chr(int(file[5:-4]))] = (np.array(data), len(data[0]), len(data))
-
-    def get_character(self, character):
-        return self.character_index[character]
-
-class TextWriter:
-    def __init__(self, character_loader):
-        self.character_loader = character_loader
-
-    def put_text(self, frame, text, start):
-        column_start = start[1]
-        cursor = start
-        char_count = 0
-        for c in text:
-            if c == "\n" or char_count == 50:
-                cursor = [cursor[0]+6, column_start]
-                char_count = 0
-                if c == "\n":
-                    continue
-            letter = self.character_loader.get_character(c)
-            frame[cursor[0]:cursor[0]+letter[2], cursor[1]:cursor[1]+letter[1]] = letter[0]
-            cursor[1] += letter[1]+1
-            char_count += 1
+# Pre-generated jokes are kept here between restarts
+POOL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "response_pool.json")
 
 class ChatInterface:
     
@@ -69,58 +40,109 @@ class ChatInterface:
     def get_response(self, topic):
         return self.chain.invoke({"topic": topic})
 
+    def stream_response(self, topic):
+        # Token iterator, the first tokens arrive long before the whole joke is generated
+        return self.chain.stream({"topic": topic})
+
 class TextDisplay:
-    def __init__(self, text_writer):
-        self.text_writer = text_writer
+    def __init__(self, sink=None):
+        # One text frame that is typed into, shown on any display sink (window, wall, headless).
+        # Only the thread that created it may show frames: an OpenCV window belongs to one thread
+        # The layer takes the sink's size, so the wall gets frames of its own shape
+        sink = sink or make_sink(window='text', scale=5)
+        self.layer = TextLayer.for_sink(sink)
+        self.typewriter = Typewriter(self.layer, sink, interval=0.2)
+        self.closed = False
 
     def display_text(self, text):
-        for i in range(len(text) + 1):
-            mat = np.zeros((40, 250, 3))
-            self.text_writer.put_text(mat, text[:i], [1, 0])
-            cv.namedWindow('text', cv.WINDOW_NORMAL)
-            cv.resizeWindow('text', 1200, 600)
-            cv.imshow("text", mat)
-            cv.waitKey(200)
-        cv.waitKey(5000)
-        cv.destroyAllWindows()
+        self.typewriter.clear()
+        self.typewriter.feed(text)
+        self.closed = not self.typewriter.run(hold=5.0)
+
+    def idle(self):
+        # Shows the frame again so the window keeps handling its events between jokes, False once it was closed
+        self.closed = self.closed or not self.typewriter.update()
+        return not self.closed
+
+    def display_stream(self, tokens):
+        # Tokens are typed while the model is still generating. Returns the response once the
+        # stream completed, None when it failed or the display was closed halfway
+        self.typewriter.clear()
+        streamer = TokenStreamer(tokens, self.typewriter.feed)
+        streamer.start()
+        self.closed = not self.typewriter.run(hold=5.0, producer=streamer)
+        if streamer.error:
+            print("Error:", streamer.error)
+            return None
+        if streamer.is_alive():
+            return None
+        print(f"First token after {streamer.first_token_time:.2f} s, full response after {streamer.total_time:.2f} s")
+        return streamer.text
 
 class FileWatcher:
-    def __init__(self, file_path, chat_interface, display):
+    def __init__(self, file_path, chat_interface, display, pool=None, stable_time=1.0):
         self.file_path = file_path
         self.chat_interface = chat_interface
         self.display = display
         self.topic_dict = {1: "Software", 2: "Hardware", 3: "Infrastructure", 4: "Media Design", 5: "Business"}
+        # Jokes for every topic are generated ahead of time, a request is answered from the pool
+        self.pool = pool or ResponsePool(chat_interface.get_response, self.topic_dict.values(), path=POOL_FILE)
+        # Only the lines written since the last event are read, a count has to hold for stable_time
+        self.tail = FileTail(file_path)
+        self.debouncer = DigitDebouncer(stable_time, valid=self.topic_dict)
+        self.lock = threading.Lock()
+        # The watchdog thread only hands the newest request to watch(), which shows the joke on the
+        # thread that owns the display. Requests that waited too long are dropped
+        self.requests = LatestMailbox(max_age=10.0)
 
     def on_modified(self, event):
-        with open(self.file_path, 'r') as file:
-            lines = file.readlines()
-            if lines:
-                last_line = lines[-1].strip()
-                if last_line.isdigit():
-                    topic_num = int(last_line)
-                    if 1 <= topic_num <= 5:
-                        topic = self.topic_dict[topic_num]
-                        response = self.chat_interface.get_response(topic)
-                        self.display.display_text(response)
+        if os.path.abspath(event.src_path) == os.path.abspath(self.file_path):
+            self.poll()
+
+    def poll(self):
+        with self.lock:
+            for line in self.tail.read_lines():
+                if line.isdigit():
+                    topic_num = self.debouncer.feed(int(line))
+                    if topic_num is not None:
+                        self.requests.submit(topic_num)
+
+    def show_topic(self, topic_num):
+        topic = self.topic_dict[topic_num]
+        response = self.pool.get(topic)
+        if response is not None:
+            self.display.display_text(response)
+        else:
+            # Pool still empty, stream a fresh joke; only a complete one is remembered
+            response = self.display.display_stream(self.chat_interface.stream_response(topic))
+            if response is not None:
+                self.pool.remember(topic, response)
 
     def watch(self):
         event_handler = FileSystemEventHandler()
         event_handler.on_modified = self.on_modified
         observer = Observer()
-        observer.schedule(event_handler, os.path.dirname(self.file_path), recursive=False)
+        observer.schedule(event_handler, os.path.dirname(os.path.abspath(self.file_path)), recursive=False)
         observer.start()
+        self.pool.start()
         try:
-            while True:
-                time.sleep(1)
+            while not self.display.closed:
+                topic_num = self.requests.take(timeout=0.1)
+                if topic_num is not None:
+                    self.show_topic(topic_num)
+                else:
+                    self.display.idle()
+                # Also catches a count that became stable without a new modify event
+                self.poll()
         except KeyboardInterrupt:
-            observer.stop()
+            pass
+        observer.stop()
+        self.pool.stop()
         observer.join()
 
 def main():
-    loader = CharacterLoader()
-    writer = TextWriter(loader)
     chat_interface = ChatInterface("ICTjokes", True)
-    display = TextDisplay(writer)
+    display = TextDisplay()
 
     file_watcher = FileWatcher(r"C:\Users\artur\Downloads\EventDrivenArchitecture\finger_count_output.txt", chat_interface, display)
     file_watcher.watch()
@@ -10,46 +10,27 @@
 import cv2 as cv
 import numpy as np
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "modeSelection"))
+from font_atlas import load_font  # compiled pixel font shared with modeSelection
 from langchain_community.chat_models import ChatOllama
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
 class CharacterLoader:
     def __init__(self):
-        self.character_index = {}
-        self.load_character_index()
-
-    def load_character_index(self):
-        dir_path = os.path.dirname(os.path.abspath(__file__))
-        font_dir = os.path.join(dir_path, "font")
-        files = [f for f in os.listdir(font_dir) if f[-4:] == ".csv"]
-        for file in files:
-            file_path = os.path.join(font_dir, file)
-            data = open(file_path, "r").read()
-            data = [[[255., 255., 255.] if c == '1' else [0., 0., 0.] for c in line.split(',')] for line in data.split("\n")]
-            self.character_index[chr(int(file[5:-4]))] = (np.array(data), len(data[0]), len(data))
-
-    def get_character(self, character):
-        return self.character_index[character]
+        # Glyphs come from the compiled font atlas, which is loaded once per process
+        self.font = load_font()
+
+    def get_character(self, character, color=(255, 255, 255)):
+        return self.font.get_character(character, color)
 
 class TextWriter:
     def __init__(self, character_loader):
         self.character_loader = character_loader
 
-    def put_text(self, frame, text, start):
-        column_start = start[1]
-        cursor = start
-        char_count = 0
-        for c in text:
-            if c == "\n" or char_count == 50:
-                cursor = [cursor[0]+6, column_start]
-                char_count = 0
-                if c == "\n":
-                    continue
-            letter = self.character_loader.get_character(c)
-            frame[cursor[0]:cursor[0]+letter[2], cursor[1]:cursor[1]+letter[1]] = letter[0]
-            cursor[1] += letter[1]+1
-            char_count += 1
+    def put_text(self, frame, text, start, color=(255, 255, 255)):
+        return self.character_loader.font.put_text(frame, text, start, color=color)
 
 class ChatInterface:
     
@@ -68,7 +49,7 @@ class TextDisplay:
 
     def display_text(self, text):
         for i in range(len(text) + 1):
-            mat = np.zeros((40, 250, 3))
+            mat = np.zeros((40, 250, 3), dtype=np.uint8)
             self.text_writer.put_text(mat, text[:i], [1, 0])
             cv.namedWindow('text', cv.WINDOW_NORMAL)
             cv.resizeWindow('text', 1200, 600)
@@ -0,0 +1,132 @@
+import collections
+import os
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "modeSelection"))
+from font_atlas import load_font  # compiled pixel font shared with modeSelection
+
+
+class TextLayer:
+    """
+    Persistent text frame that is written one character at a time. The cursor is kept between
+    calls, so appending a character blits just that glyph. Lines wrap at '\\n', after 'line_length'
+    characters or when the glyph does not fit the width; when the text reaches the bottom the
+    frame scrolls up by one line.
+    """
+
+    def __init__(self, width=250, height=40, color=(255, 255, 255), line_length=50, line_height=6, top=1, font=None):
+        self.font = font or load_font()
+        self.width = width
+        self.height = height
+        self.color = color
+        self.line_length = line_length
+        self.line_height = line_height
+        self.top = top
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.clear()
+
+    @classmethod
+    def for_sink(cls, sink, width=250, height=40, **options):
+        """Layer the size of the frames 'sink' shows (the wall's pixels), 'width' x 'height' for a window"""
+
+        if sink.shape is not None:
+            height, width = sink.shape
+        return cls(width, height, **options)
+
+    def clear(self):
+        self.frame[:] = 0
+        self.row = self.top
+        self.column = 0
+        self.char_count = 0
+        self.scrolled_lines = 0
+
+    def newline(self):
+        self.row += self.line_height
+        self.column = 0
+        self.char_count = 0
+        if self.row + self.font.height > self.height:
+            self.scroll()
+
+    def scroll(self):
+        self.frame[:] = np.roll(self.frame, -self.line_height, axis=0)
+        self.frame[-self.line_height:] = 0
+        self.row -= self.line_height
+        self.scrolled_lines += 1
+
+    def append(self, text):
+        """Write 'text' at the cursor, returns the number of glyphs drawn"""
+
+        tinted = self.font.tint(self.color)
+        drawn = 0
+        for c in text:
+            if c == "\n":
+                self.newline()
+                continue
+            glyph = self.font.glyphs.get(c)
+            if glyph is None:
+                continue
+            offset, width, height = glyph
+            if self.char_count == self.line_length or self.column + width > self.width:
+                self.newline()
+            self.frame[self.row:self.row + height, self.column:self.column + width] = tinted[:height, offset:offset + width]
+            self.column += width + 1
+            self.char_count += 1
+            drawn += 1
+        return drawn
+
+
+class Typewriter:
+    """
+    Types queued text into a TextLayer at one character per 'interval' seconds and shows the frame
+    on a display sink. update() never waits: it writes the characters that are due and returns,
+    so the caller's loop (or a streaming thread calling feed()) sets the pace.
+    """
+
+    def __init__(self, layer, sink, interval=0.2):
+        self.layer = layer
+        self.sink = sink
+        self.interval = interval
+        self.pending = collections.deque()
+        self.next_time = 0.0
+
+    @property
+    def done(self):
+        return not self.pending
+
+    def feed(self, text):
+        # deque.extend is thread-safe, a producer thread can feed while the display thread updates
+        self.pending.extend(text)
+
+    def clear(self):
+        self.pending.clear()
+        self.layer.clear()
+
+    def update(self, now=None):
+        """Write the characters that are due and show the frame, False when the display was closed"""
+
+        now = time.perf_counter() if now is None else now
+        if self.next_time < now - self.interval:
+            # Idle for a while, do not type a burst of characters at once
+            self.next_time = now
+        while self.pending and self.next_time <= now:
+            self.layer.append(self.pending.popleft())
+            self.next_time += self.interval
+        return self.sink.show(self.layer.frame)
+
+    def run(self, hold=5.0, poll=0.01, producer=None):
+        """
+        Type everything that is queued, keep the result up for 'hold' seconds. With a 'producer'
+        thread (a TokenStreamer feeding this typewriter) typing goes on until that thread ends.
+        """
+
+        while not self.done or (producer is not None and producer.is_alive()):
+            if not self.update():
+                return False
+            time.sleep(poll)
+        end = time.perf_counter() + hold
+        while time.perf_counter() < end:
+            if not self.update():
+                return False
+            time.sleep(poll)
+        return True
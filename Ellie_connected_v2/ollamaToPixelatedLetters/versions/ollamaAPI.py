@@ -10,16 +10,21 @@ while True:
     data = {
         "prompt": prompt,
         "model": "gemma:2b",
-        "stream": False
+        "stream": True
     }
 
-    response = requests.post(url, headers=headers, data=json.dumps(data))
+    # Ollama answers with one JSON object per token (NDJSON), print them as they arrive
+    response = requests.post(url, headers=headers, data=json.dumps(data), stream=True)
 
     if response.status_code == 200:
-        response_text = response.text
-        data = json.loads(response_text)
-        actual_response = data["response"]
-        print(actual_response)
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            print(chunk.get("response", ""), end="", flush=True)
+            if chunk.get("done"):
+                break
+        print()
 
     else:
-        print("Error:", response.status_code, response.text)
\ No newline at end of file
+        print("Error:", response.status_code, response.text)
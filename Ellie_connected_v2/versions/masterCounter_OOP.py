@@ -1,5 +1,6 @@
 #This is a working prototype of the mode switching based on MobileNet user recognition
 #When a person is recognised for 10 sec (+10 sec delay), the game mode is launched
+#MobileNet only runs when the camera sees motion (or every 2 sec), otherwise the last detections are reused
 #When no activity is detected for 10 sec (no moving bar), the game mode is terminated
 #User recognition begins again and waits for a user to appear
 
@@ -12,10 +13,13 @@ import imutils
 from imutils.video import VideoStream
 from imutils.video import FPS
 import os
+import sys
 from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "flaskServerWith3DEffects", "yolov9-main"))
+from utils.motion import MotionGate  # the MOG2 gate detect.py --motion-gate uses
 
 class PersonDetector:
-    def __init__(self, prototxt, model, confidence=0.2):
+    def __init__(self, prototxt, model, confidence=0.2, max_fps=15):
         self.prototxt = prototxt
         self.model = model
         self.confidence = confidence
@@ -29,6 +33,9 @@ class PersonDetector:
         self.no_activity_event = threading.Event()
         self.running = True
         self.detection_thread = None
+        self.motion_gate = MotionGate()
+        # VideoStream.read() returns the latest frame without waiting, so the loop is paced instead of spinning
+        self.frame_interval = 1.0 / max_fps
 
     def detect_person(self):
         vs = VideoStream(src=0).start()
@@ -37,14 +44,17 @@ class PersonDetector:
 
         detection_start_time = None
         person_present = False
+        detections = None
 
         while self.running:
+            loop_start = time.time()
             frame = vs.read()
             frame = imutils.resize(frame, width=400)
             (h, w) = frame.shape[:2]
-            blob = cv2.dnn.blobFromImage(cv2.resize(frame, (300, 300)), 0.007843, (300, 300), 127.5)
-            self.net.setInput(blob)
-            detections = self.net.forward()
+            if self.motion_gate.update(frame) or detections is None:
+                blob = cv2.dnn.blobFromImage(cv2.resize(frame, (300, 300)), 0.007843, (300, 300), 127.5)
+                self.net.setInput(blob)
+                detections = self.net.forward()
 
             found_person = False
 
@@ -83,8 +93,10 @@ class PersonDetector:
                 break
 
             fps.update()
+            time.sleep(max(0.0, self.frame_interval - (time.time() - loop_start)))
 
         fps.stop()
+        print(f"[INFO] {self.motion_gate}")
         vs.stop()
         cv2.destroyAllWindows()
 
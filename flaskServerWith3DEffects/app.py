@@ -3,11 +3,17 @@
 #POST requests are sent from eventTrigArch2.py and running yolov9 on a video stream
 #It reacts when either a cell phone or a bottle were detected 
 
+import os
 import numpy as np
 from flask import request, Response
-from mss import mss
-from flask import Flask, render_template
+from flask import Flask, render_template, jsonify
 from flask_assets import Environment, Bundle
+from sse import EventBroadcaster
+from frame_bus import FrameBus, stream_frames
+from screen_capture import ScreenCaptureSource
+
+# Publish a scaled-down capture of the screen to the pixel stream (opt-in)
+CAPTURE_SCREEN = False
 
 app = Flask(__name__)
 assets = Environment(app)
@@ -17,40 +23,63 @@ assets.register('main_js', js)
 
 @app.route('/')
 def index():
-    with mss() as sct:
-        screenshot = sct.grab(sct.monitors[0])
-        img_array = np.array(screenshot)
     return render_template('index.html')
 
 received_post = False
-# Global variable to store the last event type
-last_event = None
+# Every animation change goes to all connected browsers
+broadcaster = EventBroadcaster(history=100, heartbeat=15.0)
 
 @app.route('/change_animation', methods=['POST'])
 def change_animation():
-    global last_event
     print("Received POST request to /change_animation")
     new_animation_style = request.form.get('animation_style')
-    last_event = new_animation_style
+    broadcaster.publish(new_animation_style)
     return 'OK', 200
 
 @app.route('/create_grid', methods=['POST'])
 def create_grid():
-    global last_event
     print("Received POST request to /create_grid")
-    last_event = 'createGrid'
+    broadcaster.publish('createGrid')
     return 'OK', 200
 
 @app.route('/stream')
 def stream():
-    def event_stream():
-        global last_event
-        while True:
-            if last_event:
-                yield f'data: {last_event}\n\n'
-                last_event = None
-            
-    return Response(event_stream(), mimetype='text/event-stream')
+    # Each client waits on its own queue, a reconnecting EventSource gets the events it missed
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(broadcaster.stream(last_event_id), mimetype='text/event-stream', headers=headers)
+
+# Frames for the LED simulator, published by the wall output (POST /pixels) or by sources in this process
+pixel_bus = FrameBus()
+
+@app.route('/pixels', methods=['POST'])
+def publish_pixels():
+    # Raw uint8 bytes of an (H, W, 3) frame, the size comes in the X-Frame-Shape header as "H,W"
+    try:
+        height, width = (int(v) for v in request.headers.get('X-Frame-Shape', '').split(','))
+        frame = np.frombuffer(request.get_data(), dtype=np.uint8).reshape(height, width, 3)
+    except ValueError:
+        return 'Expected raw (H, W, 3) uint8 bytes and an X-Frame-Shape: H,W header', 400
+    pixel_bus.publish(frame)
+    return 'OK', 200
+
+@app.route('/pixels', methods=['GET'])
+def get_pixels():
+    # Latest frame as JSON, for quick checks in the browser
+    _, frame = pixel_bus.latest()
+    if frame is None:
+        return 'No frame published yet', 404
+    return jsonify(frame.tolist())
+
+@app.route('/pixels/stream')
+def pixel_stream():
+    # Binary frames (full or only the changed pixels) pushed as they are published, see frame_bus.py
+    return Response(stream_frames(pixel_bus), mimetype='application/octet-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # The debug reloader runs this file twice, only capture in the process that serves requests
+    if CAPTURE_SCREEN and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Monitor 1 at 10 FPS, scaled to the 20x20 wall
+        ScreenCaptureSource(pixel_bus, region=1, fps=10, size=(20, 20)).start()
+    app.run(debug=True, threaded=True)
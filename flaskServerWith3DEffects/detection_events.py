@@ -0,0 +1,57 @@
+#Listener side of detect.py --event-sink: binds the datagram socket and hands out the NDJSON records
+#Every record is one processed frame: {"frame", "source", "time", "shape", "ms", "det": [{"cls", "name", "conf", "box"}]}
+
+import json
+import os
+import socket
+from urllib.parse import urlparse
+
+DEFAULT_EVENT_SINK = 'udp://127.0.0.1:5555' if os.name == 'nt' else 'unix:///tmp/yolo_events.sock'
+
+
+class DetectionSubscriber:
+    """
+    thresholds: {class name: minimum confidence}, only those classes are kept in a record's "det"
+    (None keeps every detection). Records for frames without matches still come through, so a
+    listener knows when an object is gone.
+    """
+
+    def __init__(self, address=DEFAULT_EVENT_SINK, thresholds=None, timeout=None):
+        parsed = urlparse(address)
+        if parsed.scheme == 'unix':
+            if os.path.exists(parsed.path):
+                os.remove(parsed.path)  # left over from a previous listener
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.bind(parsed.path)
+            self.path = parsed.path
+        elif parsed.scheme == 'udp':
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind((parsed.hostname, parsed.port))
+            self.path = None
+        else:
+            raise ValueError(f"Unsupported event sink address {address}")
+        self.sock.settimeout(timeout)
+        self.thresholds = thresholds
+
+    def receive(self):
+        """Next record, None when the timeout passed without one"""
+
+        try:
+            data = self.sock.recv(65536)
+        except socket.timeout:
+            return None
+        record = json.loads(data)
+        if self.thresholds is not None:
+            record['det'] = [d for d in record['det'] if d['conf'] >= self.thresholds.get(d['name'], float('inf'))]
+        return record
+
+    def __iter__(self):
+        while True:
+            record = self.receive()
+            if record is not None:
+                yield record
+
+    def close(self):
+        self.sock.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,7 +1,6 @@
 import cv2
 import numpy as np
 import pyee
-import tailer
 import threading
 
 # Define the dimensions for the pixelated image
@@ -41,36 +40,35 @@ ee.on('reset_pixel_size', reset_pixel_size)
 ee.on('enable_wave_effect', enable_wave_effect)
 ee.on('disable_wave_effect', disable_wave_effect)
 
-# Function to follow the file and emit events
-import requests
-
-# Function to follow the file and emit events
-def follow_file_and_emit_events():
-    with open('/Users/krasnomakov/Documents1/py/ellie/EventDrivenArchitecture/flaskServerWith3DEffects/output.txt', 'r') as f:
-        for line in tailer.follow(f):
-            if 'cell phone' in line:
+from detection_events import DetectionSubscriber
+from triggers import ClassTrigger, TriggerEngine, AsyncNotifier
+
+# Animation changes are posted from a background thread over one keep-alive connection
+notifier = AsyncNotifier()
+notifier.start()
+
+# Function to listen to detect.py --event-sink and emit events
+def listen_for_detections_and_emit_events():
+    # Only cell phones and bottles matter, each with its own confidence threshold
+    subscriber = DetectionSubscriber(thresholds={'cell phone': 0.35, 'bottle': 0.35})
+    # Effects switch on when an object is seen for a few frames and off when it is gone for a second,
+    # instead of on every frame with or without it
+    engine = TriggerEngine(ClassTrigger('cell phone'), ClassTrigger('bottle'))
+    for record in subscriber:
+        for edge, name in engine.update(record['det']):
+            print(f"[DEBUG] {name} {edge} at frame {record['frame']}")
+            if name == 'cell phone' and edge == 'enter':
                 ee.emit('change_pixel_size', new_width, new_height)
-
-                # Define the URL
-                url = "http://localhost:5000/change_animation"
-
-                # Define the data payload
-                data = {"animation_style": "divide"}
-
-                # Send a POST request
-                response = requests.post(url, data=data)
-
-                # Print the response
-                print(response.text)
-
-            elif 'bottle' in line:
+                notifier.post("http://localhost:5000/change_animation", {"animation_style": "divide"})
+            elif name == 'cell phone':
+                ee.emit('reset_pixel_size')
+            elif edge == 'enter':
                 ee.emit('enable_wave_effect')
             else:
-                ee.emit('reset_pixel_size')
                 ee.emit('disable_wave_effect')
 
 # Run the function in a separate thread
-threading.Thread(target=follow_file_and_emit_events).start()
+threading.Thread(target=listen_for_detections_and_emit_events, daemon=True).start()
 
 # Open the camera
 cap = cv2.VideoCapture(0)
@@ -0,0 +1,102 @@
+#Frame bus for the Flask server: producers publish (H, W, 3) uint8 frames, readers wait for the next one
+#Also holds the binary encoding of the /pixels/stream endpoint:
+#an 18 byte header (magic, sequence number, height, width, kind, payload size) followed by the payload
+#kind FULL: the raw frame bytes, kind DELTA: uint32 indices of the changed pixels and their colors,
+#kind KEEPALIVE: no payload
+
+import struct
+import threading
+import time
+import numpy as np
+
+MAGIC = b'PXL1'
+HEADER = struct.Struct('<4sIHHHI')
+FULL, DELTA, KEEPALIVE = 0, 1, 2
+
+
+class FrameBus:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.frame = None
+        self.seq = 0
+        self.timestamp = None
+
+    def publish(self, frame):
+        # Own copy, readers keep the previous frame around to compute deltas
+        frame = np.array(frame, dtype=np.uint8, copy=True)
+        with self.condition:
+            self.frame = frame
+            self.seq += 1
+            self.timestamp = time.time()
+            self.condition.notify_all()
+
+    def latest(self):
+        with self.condition:
+            return self.seq, self.frame
+
+    def wait(self, after_seq, timeout=None):
+        """Wait for a frame newer than 'after_seq', (seq, frame) or (after_seq, None) on timeout"""
+
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.seq > after_seq, timeout):
+                return after_seq, None
+            return self.seq, self.frame
+
+
+def encode_frame(seq, frame, previous=None):
+    """One stream message for 'frame', a delta against 'previous' when that is smaller"""
+
+    height, width = frame.shape[:2]
+    if previous is not None and previous.shape == frame.shape:
+        changed = np.flatnonzero((frame != previous).any(axis=2))
+        # 4 index bytes + 3 color bytes per changed pixel against 3 bytes per pixel for a full frame
+        if len(changed) * 7 < frame.size:
+            payload = changed.astype('<u4').tobytes() + frame.reshape(-1, 3)[changed].tobytes()
+            return HEADER.pack(MAGIC, seq, height, width, DELTA, len(payload)) + payload
+    payload = frame.tobytes()
+    return HEADER.pack(MAGIC, seq, height, width, FULL, len(payload)) + payload
+
+
+def encode_keepalive(seq):
+    return HEADER.pack(MAGIC, seq, 0, 0, KEEPALIVE, 0)
+
+
+class FrameDecoder:
+    """Rebuilds frames from stream messages, read() takes a function returning exactly n bytes"""
+
+    def __init__(self):
+        self.frame = None
+
+    def read(self, read_exact):
+        """Next (seq, frame) from the stream, frame is None for a keep-alive"""
+
+        magic, seq, height, width, kind, size = HEADER.unpack(read_exact(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Not a pixel stream")
+        payload = read_exact(size) if size else b''
+        if kind == KEEPALIVE:
+            return seq, None
+        if kind == FULL:
+            self.frame = np.frombuffer(payload, dtype=np.uint8).reshape(height, width, 3).copy()
+        else:
+            count = size // 7
+            indices = np.frombuffer(payload, dtype='<u4', count=count)
+            colors = np.frombuffer(payload, dtype=np.uint8, offset=count * 4).reshape(-1, 3)
+            self.frame.reshape(-1, 3)[indices] = colors
+        return seq, self.frame
+
+
+def stream_frames(bus, keepalive=5.0, keyframe_interval=100):
+    """Generator for a Flask Response: every new frame on 'bus' as a stream message"""
+
+    seq, previous = 0, None
+    sent = 0
+    while True:
+        seq, frame = bus.wait(seq, timeout=keepalive)
+        if frame is None:
+            yield encode_keepalive(seq)
+            continue
+        # A full frame now and then, so a corrupted delta never sticks for long
+        yield encode_frame(seq, frame, None if sent % keyframe_interval == 0 else previous)
+        previous = frame
+        sent += 1
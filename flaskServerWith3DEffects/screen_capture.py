@@ -0,0 +1,54 @@
+#Screen capture as a frame source: grabs a region of the screen at a fixed rate, scales it down
+#and publishes it to a FrameBus, so screen content can drive the pixel stream on purpose
+
+import threading
+import time
+import numpy as np
+import cv2
+
+
+class ScreenCaptureSource(threading.Thread):
+    """
+    region: mss monitor number (0 = all monitors) or a dict with left, top, width and height
+    fps: captures per second
+    size: (width, height) the capture is scaled down to, None keeps the full resolution
+    """
+
+    def __init__(self, bus, region=1, fps=10, size=(20, 20)):
+        super(ScreenCaptureSource, self).__init__()
+        self.daemon = True
+        self.bus = bus
+        self.region = region
+        self.interval = 1.0 / fps
+        self.size = size
+        self.running = True
+        self.captured_frames = 0
+        self.capture_ms = 0.0
+
+    def grab(self, sct):
+        monitor = sct.monitors[self.region] if isinstance(self.region, int) else self.region
+        # mss gives BGRA, the bus carries RGB
+        frame = cv2.cvtColor(np.asarray(sct.grab(monitor)), cv2.COLOR_BGRA2RGB)
+        if self.size is not None:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return frame
+
+    def run(self):
+        # mss handles belong to the thread that created them
+        from mss import mss
+
+        with mss() as sct:
+            next_time = time.perf_counter()
+            while self.running:
+                start = time.perf_counter()
+                self.bus.publish(self.grab(sct))
+                self.capture_ms = (time.perf_counter() - start) * 1000
+                self.captured_frames += 1
+
+                next_time = max(next_time + self.interval, time.perf_counter())
+                time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join()
@@ -1,23 +1,66 @@
+import sys
 import requests
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+import cv2
+from frame_bus import FrameDecoder
 
-def get_pixel_data():
-    response = requests.get('http://localhost:5000/pixels')
-    pixel_array = np.array(response.json())
-    return pixel_array
+# Every pixel of the array is drawn as SCALE x SCALE screen pixels
+SCALE = 20
+STREAM_URL = 'http://localhost:5000/pixels/stream'
 
-def update(i):
-    pixel_array = get_pixel_data()
-    im.set_array(pixel_array)
-    return im,
+def frames(url=STREAM_URL):
+    # Subscribe to the binary pixel stream, frames arrive as soon as they are published
+    with requests.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        decoder = FrameDecoder()
 
-if __name__ == '__main__':
-    fig, ax = plt.subplots()
-    pixel_array = get_pixel_data()
-    im = ax.imshow(pixel_array)
+        def read_exact(n):
+            data = b''
+            while len(data) < n:
+                chunk = response.raw.read(n - len(data))
+                if not chunk:
+                    raise ConnectionError("Pixel stream closed")
+                data += chunk
+            return data
+
+        while True:
+            seq, frame = decoder.read(read_exact)
+            if frame is not None:
+                yield frame
+
+def show_opencv():
+    # One display buffer, refilled with a nearest-neighbour upscale of every frame
+    display = None
+    for pixel_array in frames():
+        height, width = pixel_array.shape[:2]
+        if display is None or display.shape[:2] != (height * SCALE, width * SCALE):
+            display = np.empty((height * SCALE, width * SCALE, 3), dtype=np.uint8)
+        cv2.resize(np.ascontiguousarray(pixel_array[..., ::-1]), (width * SCALE, height * SCALE),
+                   dst=display, interpolation=cv2.INTER_NEAREST)
+        cv2.imshow('Simulation', display)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+    cv2.destroyAllWindows()
+
+def show_matplotlib():
+    # The old FuncAnimation window, kept for debugging
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
 
-    ani = FuncAnimation(fig, update, frames=range(100), interval=5, blit=True)
+    stream = frames()
 
-    plt.show()
\ No newline at end of file
+    def update(pixel_array):
+        im.set_array(pixel_array)
+        return im,
+
+    fig, ax = plt.subplots()
+    im = ax.imshow(next(stream))
+    ani = FuncAnimation(fig, update, frames=stream, interval=5, blit=True, cache_frame_data=False)
+    plt.show()
+
+if __name__ == '__main__':
+    # python3.11 simulation.py [--matplotlib]
+    if '--matplotlib' in sys.argv:
+        show_matplotlib()
+    else:
+        show_opencv()
@@ -0,0 +1,100 @@
+#Server-sent events broadcaster for the Flask server
+#Every connected browser gets its own queue, so each client sees every event
+#Events get increasing ids and the last ones are kept, a reconnecting EventSource sends
+#Last-Event-ID and gets what it missed replayed
+
+import collections
+import itertools
+import queue
+import threading
+
+
+class EventBroadcaster:
+    def __init__(self, history=100, heartbeat=15.0, client_queue_size=100, retry_ms=3000):
+        self.history = collections.deque(maxlen=history)
+        self.heartbeat = heartbeat
+        self.client_queue_size = client_queue_size
+        self.retry_ms = retry_ms
+        self.ids = itertools.count(1)
+        self.clients = set()
+        self.lock = threading.Lock()
+        self.dropped_clients = 0
+
+    def publish(self, data, event=None):
+        """Send 'data' to every connected client, returns the event id"""
+
+        with self.lock:
+            event_id = next(self.ids)
+            message = self.format(event_id, data, event)
+            self.history.append((event_id, message))
+            for client in list(self.clients):
+                try:
+                    client.put_nowait(message)
+                except queue.Full:
+                    # A client that stopped reading is cut off, its browser reconnects and replays
+                    self.clients.discard(client)
+                    self.close_client(client)
+                    self.dropped_clients += 1
+        return event_id
+
+    @staticmethod
+    def close_client(client):
+        # Never blocks, it runs under the lock: the queue is emptied so the end marker fits, the
+        # reconnecting browser gets the dropped events from the history
+        try:
+            while True:
+                client.get_nowait()
+        except queue.Empty:
+            pass
+        client.put_nowait(None)
+
+    @staticmethod
+    def format(event_id, data, event=None):
+        lines = [f"id: {event_id}"]
+        if event:
+            lines.append(f"event: {event}")
+        lines.extend(f"data: {line}" for line in str(data).split("\n"))
+        return "\n".join(lines) + "\n\n"
+
+    def subscribe(self, last_event_id=None):
+        """New client queue, holding the events after 'last_event_id' that are still in the history"""
+
+        client = queue.Queue(maxsize=self.client_queue_size + self.history.maxlen)
+        with self.lock:
+            if last_event_id is not None:
+                for event_id, message in self.history:
+                    if event_id > last_event_id:
+                        client.put_nowait(message)
+            self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    @property
+    def client_count(self):
+        with self.lock:
+            return len(self.clients)
+
+    def stream(self, last_event_id=None):
+        """Generator for a Flask Response: events as they come, a comment line as keep-alive"""
+
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+        client = self.subscribe(last_event_id)
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            while True:
+                try:
+                    message = client.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(client)
@@ -0,0 +1,124 @@
+#Load test for the /stream endpoint: opens many EventSource-like clients, posts events and
+#checks that every client receives every event, then reconnects one client with Last-Event-ID
+#Run against app.py:      python3.11 sse_load_test.py --clients 50 --events 20
+#Run without the app:     python3.11 sse_load_test.py --local (serves only the broadcaster)
+#Stalled clients:         python3.11 sse_load_test.py --local --stalled 2 --events 400 --payload 4096
+#                         (clients that connect and never read, posting has to stay fast and they get cut off)
+
+import argparse
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+
+
+class SSEClient(threading.Thread):
+    def __init__(self, url, last_event_id=None):
+        super(SSEClient, self).__init__()
+        self.daemon = True
+        self.url = url
+        self.last_event_id = last_event_id
+        self.events = []
+        self.connected = threading.Event()
+
+    def run(self):
+        headers = {'Accept': 'text/event-stream'}
+        if self.last_event_id is not None:
+            headers['Last-Event-ID'] = str(self.last_event_id)
+        with requests.get(self.url, headers=headers, stream=True, timeout=30) as response:
+            event_id = None
+            for line in response.iter_lines(decode_unicode=True):
+                self.connected.set()
+                if line.startswith('id: '):
+                    event_id = int(line[4:])
+                elif line.startswith('data: '):
+                    self.events.append((event_id, line[6:], time.perf_counter()))
+                    if line[6:] == 'stop':
+                        break
+
+
+def stalled_client(url):
+    # Connects to the stream and never reads, with a small receive buffer so the server side backs up quickly
+    parts = urlsplit(url)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect((parts.hostname, parts.port or 80))
+    sock.sendall(f"GET {parts.path} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    return sock
+
+
+def serve_local(port):
+    from flask import Flask, Response, request
+    from sse import EventBroadcaster
+
+    app = Flask(__name__)
+    broadcaster = EventBroadcaster()
+
+    @app.route('/create_grid', methods=['POST'])
+    def create_grid():
+        broadcaster.publish(request.form.get('data', 'createGrid'))
+        return 'OK', 200
+
+    @app.route('/stream')
+    def stream():
+        return Response(broadcaster.stream(request.headers.get('Last-Event-ID')), mimetype='text/event-stream')
+
+    threading.Thread(target=lambda: app.run(port=port, threaded=True), daemon=True).start()
+    time.sleep(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--local', action='store_true')
+    parser.add_argument('--stalled', type=int, default=0, help='clients that connect and never read')
+    parser.add_argument('--payload', type=int, default=0, help='bytes of padding per event')
+    args = parser.parse_args()
+
+    if args.local:
+        serve_local(5001)
+        args.url = 'http://localhost:5001'
+
+    clients = [SSEClient(args.url + '/stream') for _ in range(args.clients)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.connected.wait(timeout=10)
+    stalled = [stalled_client(args.url + '/stream') for _ in range(args.stalled)]
+
+    sent = {}
+    post_times, post_failures = [], 0
+    padding = 'x' * args.payload
+    for i in range(args.events):
+        data = 'stop' if i == args.events - 1 else f'event{i}{padding}'
+        sent[data] = time.perf_counter()
+        try:
+            requests.post(args.url + '/create_grid', data={'data': data}, timeout=5)
+        except requests.exceptions.Timeout:
+            post_failures += 1  # the broadcaster is stuck, the rest would time out as well
+            break
+        post_times.append((time.perf_counter() - sent[data]) * 1000)
+    for client in clients:
+        client.join(timeout=10)
+
+    received = [len(client.events) for client in clients]
+    latencies = sorted((at - sent[data]) * 1000 for client in clients for _, data, at in client.events if data in sent)
+    print(f"{args.clients} clients, {args.events} events: every client got every event: {min(received) == args.events}")
+    if latencies:
+        print(f"delivery latency ms: median {latencies[len(latencies) // 2]:.1f}, max {latencies[-1]:.1f}")
+    if stalled:
+        # A publish that blocks on a stalled client holds the lock for everybody, posts would time out
+        print(f"{len(stalled)} stalled clients: posts timed out: {post_failures}, slowest post {max(post_times or [0]):.1f} ms")
+        for sock in stalled:
+            sock.close()
+
+    # Reconnect with the id of the fifth event, the rest has to be replayed
+    first_ids = [event_id for event_id, _, _ in clients[0].events]
+    if len(first_ids) > 5:
+        replay = SSEClient(args.url + '/stream', last_event_id=first_ids[4])
+        replay.start()
+        replay.join(timeout=10)
+        print(f"replayed after Last-Event-ID {first_ids[4]}: {len(replay.events)} of {len(first_ids) - 5} events")
@@ -0,0 +1,65 @@
+import threading
+
+from sse import EventBroadcaster
+
+
+def publish_in_thread(broadcaster, n):
+    # Publishes n events, returns the thread so a hang shows up as a join timeout
+    thread = threading.Thread(target=lambda: [broadcaster.publish(f"event{i}") for i in range(n)], daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    return thread
+
+
+def test_every_client_gets_every_event():
+    broadcaster = EventBroadcaster(history=10, client_queue_size=10)
+    clients = [broadcaster.subscribe() for _ in range(3)]
+    for i in range(5):
+        broadcaster.publish(f"event{i}")
+    for client in clients:
+        assert [client.get_nowait() for _ in range(5)] == [broadcaster.format(i + 1, f"event{i}") for i in range(5)]
+
+
+def test_replay_after_last_event_id():
+    broadcaster = EventBroadcaster(history=10)
+    for i in range(5):
+        broadcaster.publish(f"event{i}")
+    client = broadcaster.subscribe(last_event_id=3)
+    assert [client.get_nowait() for _ in range(2)] == [broadcaster.format(4, "event3"), broadcaster.format(5, "event4")]
+
+
+def test_non_reading_client_is_dropped_without_blocking():
+    broadcaster = EventBroadcaster(history=5, client_queue_size=5)
+    stalled = broadcaster.subscribe()
+    reader = broadcaster.subscribe()
+
+    thread = publish_in_thread(broadcaster, 8)
+    assert not thread.is_alive(), "publish blocked on a full client queue"
+    assert broadcaster.dropped_clients == 0  # 10 messages fit
+
+    received = [reader.get_nowait() for _ in range(8)]
+    thread = publish_in_thread(broadcaster, 5)
+    assert not thread.is_alive(), "publish blocked on a full client queue"
+    assert broadcaster.dropped_clients == 1
+    assert broadcaster.client_count == 1
+
+    # The stalled client finds the end marker first, the reader still gets every event
+    assert stalled.get_nowait() is None
+    received += [reader.get_nowait() for _ in range(5)]
+    assert len(received) == 13
+
+    # subscribe and unsubscribe still work after the drop
+    late = broadcaster.subscribe(last_event_id=12)
+    assert late.get_nowait() == broadcaster.format(13, "event4")
+    broadcaster.unsubscribe(late)
+    assert broadcaster.client_count == 1
+
+
+def test_stream_of_dropped_client_ends():
+    broadcaster = EventBroadcaster(history=2, client_queue_size=2, heartbeat=0.1)
+    stream = broadcaster.stream()
+    assert next(stream).startswith("retry:")
+    thread = publish_in_thread(broadcaster, 6)
+    assert not thread.is_alive(), "publish blocked on a full client queue"
+    assert list(stream) == []
+    assert broadcaster.client_count == 0
@@ -0,0 +1,114 @@
+#Trigger engine for detection-driven effects: turns per-frame detections into enter/exit edges
+#with hysteresis, a minimum dwell time and a rate limit, plus a pooled background HTTP notifier
+
+import queue
+import threading
+import time
+import requests
+
+
+class ClassTrigger:
+    """
+    State of one class. It enters after 'enter_frames' frames in a row with a detection of at least
+    'enter_conf' and exits after 'exit_time' seconds without one of at least 'exit_conf' (lower, so a
+    wavering confidence does not toggle it). Once entered it stays at least 'min_dwell' seconds, and
+    it enters at most once per 'cooldown' seconds.
+    """
+
+    def __init__(self, name, enter_conf=0.5, exit_conf=0.35, enter_frames=3, exit_time=1.0, min_dwell=2.0, cooldown=3.0):
+        self.name = name
+        self.enter_conf = enter_conf
+        self.exit_conf = exit_conf
+        self.enter_frames = enter_frames
+        self.exit_time = exit_time
+        self.min_dwell = min_dwell
+        self.cooldown = cooldown
+        self.active = False
+        self.streak = 0
+        self.entered_at = None
+        self.last_seen = None
+        self.suppressed = 0
+
+    def update(self, conf, now):
+        """'conf' is the best confidence of this class in the frame (0 when absent), returns 'enter', 'exit' or None"""
+
+        if not self.active:
+            self.streak = self.streak + 1 if conf >= self.enter_conf else 0
+            if self.streak < self.enter_frames:
+                return None
+            if self.entered_at is not None and now - self.entered_at < self.cooldown:
+                self.suppressed += 1
+                return None
+            self.active, self.entered_at, self.last_seen, self.streak = True, now, now, 0
+            return 'enter'
+
+        if conf >= self.exit_conf:
+            self.last_seen = now
+        elif now - self.last_seen >= self.exit_time and now - self.entered_at >= self.min_dwell:
+            self.active = False
+            return 'exit'
+        return None
+
+
+class TriggerEngine:
+    def __init__(self, *triggers):
+        self.triggers = {trigger.name: trigger for trigger in triggers}
+
+    def update(self, detections, now=None):
+        """detections: [{"name", "conf", ...}] of one frame, returns the (edge, name) pairs it caused"""
+
+        now = time.monotonic() if now is None else now
+        best = {}
+        for detection in detections:
+            best[detection['name']] = max(best.get(detection['name'], 0.0), detection['conf'])
+        edges = []
+        for name, trigger in self.triggers.items():
+            edge = trigger.update(best.get(name, 0.0), now)
+            if edge:
+                edges.append((edge, name))
+        return edges
+
+    def active(self):
+        return {name for name, trigger in self.triggers.items() if trigger.active}
+
+
+class AsyncNotifier(threading.Thread):
+    """
+    Sends POST requests from a background thread over one keep-alive session, so the detection loop
+    never waits for the server. When 'max_pending' requests are waiting new ones are dropped.
+    """
+
+    def __init__(self, max_pending=32, timeout=2.0):
+        super(AsyncNotifier, self).__init__()
+        self.daemon = True
+        self.requests = queue.Queue(maxsize=max_pending)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def post(self, url, data=None):
+        try:
+            self.requests.put_nowait((url, data))
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                break
+            url, data = item
+            try:
+                response = self.session.post(url, data=data, timeout=self.timeout)
+                print(f"[DEBUG] POST {url}: {response.status_code} {response.text}")
+                self.sent += 1
+            except requests.RequestException as e:
+                print(f"[ERROR] POST {url} failed: {e}")
+                self.failed += 1
+
+    def stop(self):
+        self.requests.put(None)
+        self.join()
+        self.session.close()
@@ -0,0 +1,126 @@
+"""
+Benchmark the CPU deployment profiles (utils/deploy.py) of a model: FPS per profile and thread count, and with a
+labelled --data dataset the mAP change against the PyTorch model
+
+Usage:
+    $ python cpu_benchmark.py --weights gelan-c.pt --source data/images --calib data/images --threads 2 4
+    $ python cpu_benchmark.py --weights gelan-c.pt --source data/images --data data/coco.yaml  # adds mAP deltas
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import torch
+
+FILE = Path(__file__).resolve()
+ROOT = FILE.parents[0]  # YOLO root directory
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))  # add ROOT to PATH
+
+from models.common import DetectMultiBackend
+from utils.dataloaders import LoadImages
+from utils.deploy import CPU_PROFILES, profile_weights
+from utils.general import LOGGER, Profile, check_yaml, file_size, non_max_suppression, print_args
+from utils.torch_utils import smart_inference_mode
+from val import run as val_det
+
+TORCH_THREADS = torch.get_num_threads()  # PyTorch default, restored between runs
+
+
+@smart_inference_mode()
+def speed(weights, source, imgsz=640, threads=None, n=50, conf_thres=0.25, iou_thres=0.45, keep_classes=None):
+    # Returns pre-process, inference and NMS ms per image on CPU, images are read once so disk time is not measured
+    torch.set_num_threads(threads or TORCH_THREADS)
+    keep_classes = keep_classes if Path(weights).suffix == '.pt' else None  # other formats are exported pruned
+    model = DetectMultiBackend(weights, device=torch.device('cpu'), threads=threads, keep_classes=keep_classes)
+    dataset = LoadImages(source, img_size=imgsz, stride=model.stride, auto=model.pt)
+    images = [x[1] for _, x in zip(range(n), dataset)]
+    assert images, f'No images found in {source}'
+    model(torch.zeros(1, 3, *images[0].shape[1:]))  # warmup
+    dt = (Profile(), Profile(), Profile())
+    for i in range(n):
+        with dt[0]:
+            im = torch.from_numpy(images[i % len(images)]).float()[None] / 255
+        with dt[1]:
+            pred = model(im)
+        with dt[2]:
+            non_max_suppression(pred, conf_thres, iou_thres)
+    return [x.t / n * 1E3 for x in dt]
+
+
+def run(
+        weights=ROOT / 'yolo.pt',  # *.pt weights path
+        source=ROOT / 'data/images',  # images to time inference on
+        imgsz=640,  # inference size (pixels)
+        profiles=tuple(CPU_PROFILES),  # profiles to compare, the first one is the reference
+        threads=(None,),  # thread counts to try, None is the backend default
+        n=50,  # timed images per run
+        data=None,  # dataset.yaml path, adds mAP50-95 and its change against the reference
+        calib=None,  # calibration images for onnx-int8, default the --source images
+        keep_classes=None,  # prune the detection head of every profile to these class ids or names
+):
+    assert not (data and keep_classes), 'mAP needs the full head, use --data without --keep-classes'
+    y, t = [], time.time()
+    reference = {}  # threads: FPS of the first profile
+    map_reference = None
+    for profile in profiles:
+        try:
+            w = profile_weights(weights, profile, [imgsz], calib, keep_classes, source)
+        except Exception as e:
+            LOGGER.warning(f'WARNING ⚠️ Benchmark failure for {profile}: {e}')
+            continue
+        metric = None
+        if data:
+            metric = val_det(data, w, batch_size=1, imgsz=imgsz, device='cpu', half=False, plots=False)[0][3]
+            map_reference = metric if map_reference is None else map_reference
+        for n_threads in threads:
+            ms = speed(w, source, imgsz, n_threads, n, keep_classes=keep_classes)
+            fps = 1E3 / sum(ms)
+            reference.setdefault(n_threads, fps)
+            y.append([
+                profile, n_threads or 'default',
+                round(file_size(w), 1), *(round(x, 1) for x in ms),
+                round(fps, 1),
+                round(fps / reference[n_threads], 2), None if metric is None else round(metric, 4),
+                None if metric is None else round(metric - map_reference, 4)])
+
+    # Print results
+    c = ['Profile', 'Threads', 'Size (MB)', 'Pre (ms)', 'Inference (ms)', 'NMS (ms)', 'FPS', 'Speed-up', 'mAP50-95',
+         'mAP change']
+    py = pd.DataFrame(y, columns=c)
+    if not data:
+        py = py.drop(columns=['mAP50-95', 'mAP change'])
+    LOGGER.info(f'\nCPU benchmarks complete ({time.time() - t:.2f}s)')
+    LOGGER.info(str(py))
+    return py
+
+
+def parse_opt():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--weights', type=str, default=ROOT / 'yolo.pt', help='*.pt weights path')
+    parser.add_argument('--source', type=str, default=ROOT / 'data/images', help='images to time inference on')
+    parser.add_argument('--imgsz', '--img', '--img-size', type=int, default=640, help='inference size (pixels)')
+    parser.add_argument('--profiles', nargs='+', default=list(CPU_PROFILES), choices=list(CPU_PROFILES),
+                        help='profiles to compare, the first one is the reference')
+    parser.add_argument('--threads', nargs='+', type=int, default=[0], help='thread counts to try, 0 = default')
+    parser.add_argument('--n', type=int, default=50, help='timed images per run')
+    parser.add_argument('--data', type=str, default=None, help='dataset.yaml path, adds mAP deltas')
+    parser.add_argument('--calib', type=str, default=None, help='onnx-int8 calibration images, default --source')
+    parser.add_argument('--keep-classes', nargs='+', help='prune the detection head to these class ids or names')
+    opt = parser.parse_args()
+    opt.threads = [x or None for x in opt.threads]
+    opt.data = check_yaml(opt.data) if opt.data else None
+    print_args(vars(opt))
+    return opt
+
+
+def main(opt):
+    run(**vars(opt))
+
+
+if __name__ == "__main__":
+    opt = parse_opt()
+    main(opt)
@@ -2,6 +2,7 @@ import argparse
 import os
 import platform
 import sys
+import time
 from pathlib import Path
 
 import torch
@@ -14,8 +15,12 @@ ROOT = Path(os.path.relpath(ROOT, Path.cwd()))  # relative
 
 from models.common import DetectMultiBackend
 from utils.dataloaders import IMG_FORMATS, VID_FORMATS, LoadImages, LoadScreenshots, LoadStreams
+from utils.deploy import CPU_PROFILES, profile_weights
+from utils.events import DEFAULT_EVENT_SINK, DetectionEventSink
 from utils.general import (LOGGER, Profile, check_file, check_img_size, check_imshow, check_requirements, colorstr, cv2,
                            increment_path, non_max_suppression, print_args, scale_boxes, strip_optimizer, xyxy2xywh)
+from utils.motion import MotionGate
+from utils.pipeline import Pipeline
 from utils.plots import Annotator, colors, save_one_box
 from utils.torch_utils import select_device, smart_inference_mode
 
@@ -49,6 +54,14 @@ def run(
         half=False,  # use FP16 half-precision inference
         dnn=False,  # use OpenCV DNN for ONNX inference
         vid_stride=1,  # video frame-rate stride
+        event_sink=None,  # publish detections as NDJSON records, i.e. unix:///tmp/yolo_events.sock
+        pipeline=False,  # overlap loading, preprocessing, inference and NMS of consecutive frames in threads
+        cpu_profile=None,  # run on CPU with an exported backend: pt, onnx, onnx-int8 or openvino (see utils/deploy.py)
+        threads=None,  # CPU inference threads, None keeps the backend default
+        calib=None,  # calibration images for the onnx-int8 profile export, default the --source files
+        keep_classes=None,  # prune the detection head to these class ids or names, i.e. person bottle 'cell phone'
+        motion_gate=False,  # run the detector only on motion (or every motion_keepalive s), else reuse detections
+        motion_keepalive=2.0,  # seconds between detector runs on a static scene
 ):
     source = str(source)
     save_img = not nosave and not source.endswith('.txt')  # save inference images
@@ -64,8 +77,13 @@ def run(
     (save_dir / 'labels' if save_txt else save_dir).mkdir(parents=True, exist_ok=True)  # make dir
 
     # Load model
+    assert not (keep_classes and classes), '--keep-classes already limits detections, use it without --classes'
+    if cpu_profile:
+        weights, device = profile_weights(weights, cpu_profile, imgsz, calib, keep_classes, source), 'cpu'
+        keep_classes = keep_classes if cpu_profile == 'pt' else None  # exported pruned
     device = select_device(device)
-    model = DetectMultiBackend(weights, device=device, dnn=dnn, data=data, fp16=half)
+    model = DetectMultiBackend(weights, device=device, dnn=dnn, data=data, fp16=half, threads=threads,
+                               keep_classes=keep_classes)
     stride, names, pt = model.stride, model.names, model.pt
     imgsz = check_img_size(imgsz, s=stride)  # check image size
 
@@ -80,50 +98,100 @@ def run(
     else:
         dataset = LoadImages(source, img_size=imgsz, stride=stride, auto=pt, vid_stride=vid_stride)
     vid_path, vid_writer = [None] * bs, [None] * bs
+    events = DetectionEventSink(event_sink) if event_sink else None
 
     # Run inference
     model.warmup(imgsz=(1 if pt or model.triton else bs, 3, *imgsz))  # warmup
     seen, windows, dt = 0, [], (Profile(), Profile(), Profile())
-    for path, im, im0s, vid_cap, s in dataset:
-        with dt[0]:
+    gates = [MotionGate(keepalive=motion_keepalive) for _ in range(bs)] if motion_gate else None
+    last_pred = None  # detections reused while the motion gate is closed
+
+    # Stages, each item carries its own Profiles so timings stay per image when stages overlap
+    def load():
+        for path, im, im0s, vid_cap, s in dataset:
+            if webcam:  # capture time per stream, to tell how old a frame is when its result is ready
+                yield path, im, im0s, vid_cap, s, dataset.count, dataset.frame_time
+            else:
+                yield path, im, im0s, vid_cap, s, getattr(dataset, 'frame', 0), None
+
+    @smart_inference_mode()  # inference mode is per thread
+    def preprocess(item):
+        path, im, im0s, vid_cap, s, frame, captured = item
+        dts = (Profile(), Profile(), Profile())
+        with dts[0]:
+            if gates and not any([g.update(x) for g, x in zip(gates, im0s if webcam else [im0s])]):
+                return path, None, im0s, vid_cap, s, frame, captured, dts  # static scene, skip the detector
             im = torch.from_numpy(im).to(model.device)
             im = im.half() if model.fp16 else im.float()  # uint8 to fp16/32
             im /= 255  # 0 - 255 to 0.0 - 1.0
             if len(im.shape) == 3:
                 im = im[None]  # expand for batch dim
+        return path, im, im0s, vid_cap, s, frame, captured, dts
 
-        # Inference
-        with dt[1]:
-            visualize = increment_path(save_dir / Path(path).stem, mkdir=True) if visualize else False
-            pred = model(im, augment=augment, visualize=visualize)
+    @smart_inference_mode()
+    def inference(item):
+        path, im, im0s, vid_cap, s, frame, captured, dts = item
+        with dts[1]:
+            vis = increment_path(save_dir / Path(path).stem, mkdir=True) if visualize else False
+            pred = None if im is None else model(im, augment=augment, visualize=vis)
+        return path, im, im0s, vid_cap, s, frame, captured, dts, pred
 
-        # NMS
-        with dt[2]:
-            pred = non_max_suppression(pred, conf_thres, iou_thres, classes, agnostic_nms, max_det=max_det)
+    @smart_inference_mode()
+    def postprocess(item):
+        nonlocal last_pred
+        path, im, im0s, vid_cap, s, frame, captured, dts, pred = item
+        with dts[2]:
+            if pred is None:  # motion gate closed, boxes are already in image coordinates
+                pred = last_pred or [torch.zeros((0, 6), device=model.device)] * bs
+            else:
+                pred = non_max_suppression(pred, conf_thres, iou_thres, classes, agnostic_nms, max_det=max_det)
 
         # Second-stage classifier (optional)
         # pred = utils.general.apply_classifier(pred, classifier_model, im, im0s)
 
+        for i, det in enumerate(pred):  # per image
+            shape = im0s[i].shape if webcam else im0s.shape
+            if len(det) and im is not None:
+                # Rescale boxes from img_size to im0 size
+                det[:, :4] = scale_boxes(im.shape[2:], det[:, :4], shape).round()
+            if events:
+                events.publish(frame, Path(path[i] if webcam else path), det, names, shape, dts,
+                               captured=captured[i] if captured else None)
+        if im is not None:
+            last_pred = pred
+        return path, im, im0s, vid_cap, s, frame, captured, dts, pred
+
+    if pipeline:  # load, preprocess, inference and NMS overlap in threads, results come back in order
+        stages = (('pre', preprocess), ('inference', inference), ('nms', postprocess))
+        # Live streams keep only the newest frame in front of each stage, latency matters more than every frame
+        results = Pipeline(load(), stages, maxsize=1 if webcam else 2, drop=('load', 'pre') if webcam else ())
+    else:
+        results = (postprocess(inference(preprocess(item))) for item in load())
+
+    ages = []  # capture-to-result latency of stream frames (seconds)
+    for path, im, im0s, vid_cap, s, frame, captured, dts, pred in results:
+        for k in range(3):
+            dt[k].t += dts[k].dt
+        if captured:
+            ages.extend(time.time() - t for t in captured)
+
         # Process predictions
         for i, det in enumerate(pred):  # per image
             seen += 1
             if webcam:  # batch_size >= 1
-                p, im0, frame = path[i], im0s[i].copy(), dataset.count
+                p, im0 = path[i], im0s[i].copy()
                 s += f'{i}: '
             else:
-                p, im0, frame = path, im0s.copy(), getattr(dataset, 'frame', 0)
+                p, im0 = path, im0s.copy()
 
             p = Path(p)  # to Path
             save_path = str(save_dir / p.name)  # im.jpg
             txt_path = str(save_dir / 'labels' / p.stem) + ('' if dataset.mode == 'image' else f'_{frame}')  # im.txt
-            s += '%gx%g ' % im.shape[2:]  # print string
+            s += '%gx%g ' % im.shape[2:] if im is not None else 'static, '  # print string
             gn = torch.tensor(im0.shape)[[1, 0, 1, 0]]  # normalization gain whwh
             imc = im0.copy() if save_crop else im0  # for save_crop
             annotator = Annotator(im0, line_width=line_thickness, example=str(names))
             if len(det):
-                # Rescale boxes from img_size to im0 size
-                det[:, :4] = scale_boxes(im.shape[2:], det[:, :4], im0.shape).round()
-
                 # Print results
                 for c in det[:, 5].unique():
                     n = (det[:, 5] == c).sum()  # detections per class
@@ -152,7 +220,8 @@ def run(
                     cv2.namedWindow(str(p), cv2.WINDOW_NORMAL | cv2.WINDOW_KEEPRATIO)  # allow window resize (Linux)
                     cv2.resizeWindow(str(p), im0.shape[1], im0.shape[0])
                 cv2.imshow(str(p), im0)
-                cv2.waitKey(1)  # 1 millisecond
+                if cv2.waitKey(1) == ord('q') and webcam:  # q to quit
+                    dataset.close()
 
             # Save results (image with detections)
             if save_img:
@@ -174,14 +243,27 @@ def run(
                     vid_writer[i].write(im0)
 
         # Print time (inference-only)
-        LOGGER.info(f"{s}{'' if len(det) else '(no detections), '}{dt[1].dt * 1E3:.1f}ms")
+        age = f', {ages[-1] * 1E3:.0f}ms since capture' if captured else ''
+        LOGGER.info(f"{s}{'' if len(det) else '(no detections), '}{dts[1].dt * 1E3:.1f}ms{age}")
 
     # Print results
     t = tuple(x.t / seen * 1E3 for x in dt)  # speeds per image
     LOGGER.info(f'Speed: %.1fms pre-process, %.1fms inference, %.1fms NMS per image at shape {(1, 3, *imgsz)}' % t)
+    if pipeline:
+        LOGGER.info(results.summary())
+    if gates:
+        LOGGER.info('\n'.join(str(g) for g in gates))
+    if ages:
+        # Replaced in the stream buffer before the loader took them, and taken but dropped from a pipeline queue
+        dropped = f', {results.dropped()} dropped before inference' if pipeline else ''
+        LOGGER.info(f'Stream: {sum(dataset.skipped)} frames stale at source{dropped}, '
+                    'capture to result %.1fms avg, %.1fms max' % (sum(ages) / len(ages) * 1E3, max(ages) * 1E3))
     if save_txt or save_img:
         s = f"\n{len(list(save_dir.glob('labels/*.txt')))} labels saved to {save_dir / 'labels'}" if save_txt else ''
         LOGGER.info(f"Results saved to {colorstr('bold', save_dir)}{s}")
+    if events:
+        LOGGER.info(f'{events.sent} detection records sent to {events.address}, {events.dropped} dropped')
+        events.close()
     if update:
         strip_optimizer(weights[0])  # update model (to fix SourceChangeWarning)
 
@@ -215,6 +297,15 @@ def parse_opt():
     parser.add_argument('--half', action='store_true', help='use FP16 half-precision inference')
     parser.add_argument('--dnn', action='store_true', help='use OpenCV DNN for ONNX inference')
     parser.add_argument('--vid-stride', type=int, default=1, help='video frame-rate stride')
+    parser.add_argument('--event-sink', nargs='?', const=DEFAULT_EVENT_SINK, default=None,
+                        help='publish detections as NDJSON, unix:///path or udp://host:port')
+    parser.add_argument('--pipeline', action='store_true', help='overlap pre-process, inference and NMS in threads')
+    parser.add_argument('--cpu-profile', choices=list(CPU_PROFILES), help='run on CPU with an exported backend')
+    parser.add_argument('--threads', type=int, help='CPU inference threads')
+    parser.add_argument('--calib', type=str, default=None, help='onnx-int8 calibration images, default --source files')
+    parser.add_argument('--keep-classes', nargs='+', help='prune the detection head to these class ids or names')
+    parser.add_argument('--motion-gate', action='store_true', help='skip the detector while the scene is static')
+    parser.add_argument('--motion-keepalive', type=float, default=2.0, help='max seconds between detector runs')
     opt = parser.parse_args()
     opt.imgsz *= 2 if len(opt.imgsz) == 1 else 1  # expand
     print_args(vars(opt))
@@ -26,7 +26,7 @@ from models.yolo import ClassificationModel, Detect, DDetect, DualDetect, DualDD
 from utils.dataloaders import LoadImages
 from utils.general import (LOGGER, Profile, check_dataset, check_img_size, check_requirements, check_version,
                            check_yaml, colorstr, file_size, get_default_args, print_args, url2file, yaml_save)
-from utils.torch_utils import select_device, smart_inference_mode
+from utils.torch_utils import prune_classes, select_device, smart_inference_mode
 
 MACOS = platform.system() == 'Darwin'  # macOS environment
 
@@ -118,6 +118,8 @@ def export_onnx(model, im, file, opset, dynamic, simplify, prefix=colorstr('ONNX
 
     # Metadata
     d = {'stride': int(max(model.stride)), 'names': model.names}
+    if hasattr(model, 'classes'):  # pruned head, original ids of names
+        d['classes'] = model.classes
     for k, v in d.items():
         meta = model_onnx.metadata_props.add()
         meta.key, meta.value = k, str(v)
@@ -139,6 +141,54 @@ def export_onnx(model, im, file, opset, dynamic, simplify, prefix=colorstr('ONNX
     return f, model_onnx
 
 
+@try_export
+def export_onnx_int8(f_onnx, file, imgsz, stride, calib, n=200, prefix=colorstr('ONNX INT8:')):
+    # YOLO ONNX Runtime static INT8 quantization, activations calibrated on up to n images from a local folder
+    check_requirements('onnxruntime')
+    import numpy as np
+    import onnx
+    import onnxruntime
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    assert calib and Path(calib).exists(), f'calibration images {calib} not found, pass --calib <image folder>'
+    LOGGER.info(f'\n{prefix} starting calibration with onnxruntime {onnxruntime.__version__} on {calib}...')
+    f = str(file).replace('.pt', '-int8.onnx')
+    f_pre = str(file).replace('.pt', '-int8-pre.onnx')
+    quant_pre_process(str(f_onnx), f_pre)  # shape inference and graph optimization before calibration
+
+    class CalibrationImages(CalibrationDataReader):
+        # Letterboxed to the static export shape, preprocessed as in detect.py
+        def __init__(self):
+            dataset = LoadImages(calib, img_size=imgsz, stride=stride, auto=False)
+            self.images = (x[1] for _, x in zip(range(n), dataset))
+
+        def get_next(self):
+            im = next(self.images, None)
+            return None if im is None else {'images': im[None].astype(np.float32) / 255}
+
+    model_onnx = onnx.load(f_pre)
+    softmax = {x for node in model_onnx.graph.node if node.op_type == 'Softmax' for x in node.output}
+    exclude = [node.name for node in model_onnx.graph.node if node.op_type == 'Conv' and node.input[0] in softmax]  # DFL
+    quantize_static(f_pre,
+                    f,
+                    CalibrationImages(),
+                    quant_format=QuantFormat.QDQ,
+                    op_types_to_quantize=['Conv', 'MatMul'],
+                    per_channel=True,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8,
+                    nodes_to_exclude=exclude)
+    os.remove(f_pre)
+
+    # Metadata
+    model_int8 = onnx.load(f)
+    del model_int8.metadata_props[:]
+    model_int8.metadata_props.extend(onnx.load(f_onnx, load_external_data=False).metadata_props)
+    onnx.save(model_int8, f)
+    return f, None
+
+
 @try_export
 def export_openvino(file, metadata, half, prefix=colorstr('OpenVINO:')):
     # YOLO OpenVINO export
@@ -453,7 +503,9 @@ def run(
         inplace=False,  # set YOLO Detect() inplace=True
         keras=False,  # use Keras
         optimize=False,  # TorchScript: optimize for mobile
-        int8=False,  # CoreML/TF INT8 quantization
+        int8=False,  # CoreML/TF/ONNX INT8 quantization
+        calib=None,  # ONNX INT8: calibration image folder or video
+        keep_classes=None,  # prune the detection head to these class ids or names before export
         dynamic=False,  # ONNX/TF/TensorRT: dynamic axes
         simplify=False,  # ONNX: simplify model
         opset=12,  # ONNX: opset version
@@ -480,6 +532,8 @@ def run(
         assert device.type != 'cpu' or coreml, '--half only compatible with GPU export, i.e. use --device 0'
         assert not dynamic, '--half not compatible with --dynamic, i.e. use either --half or --dynamic but not both'
     model = attempt_load(weights, device=device, inplace=True, fuse=True)  # load FP32 model
+    if keep_classes:
+        prune_classes(model, keep_classes)
 
     # Checks
     imgsz *= 2 if len(imgsz) == 1 else 1  # expand
@@ -505,6 +559,8 @@ def run(
         im, model = im.half(), model.half()  # to FP16
     shape = tuple((y[0] if isinstance(y, (tuple, list)) else y).shape)  # model output shape
     metadata = {'stride': int(max(model.stride)), 'names': model.names}  # model metadata
+    if keep_classes:
+        metadata['classes'] = model.classes
     LOGGER.info(f"\n{colorstr('PyTorch:')} starting from {file} with output shape {shape} ({file_size(file):.1f} MB)")
 
     # Exports
@@ -516,6 +572,9 @@ def run(
         f[1], _ = export_engine(model, im, file, half, dynamic, simplify, workspace, verbose)
     if onnx or xml:  # OpenVINO requires ONNX
         f[2], _ = export_onnx(model, im, file, opset, dynamic, simplify)
+    if onnx and int8:  # ONNX Runtime INT8, exported next to the FP32 model as *-int8.onnx
+        assert not dynamic, '--int8 ONNX export requires a static input shape, remove --dynamic'
+        f[2], _ = export_onnx_int8(f[2], file, imgsz, gs, calib)
     if xml:  # OpenVINO
         f[3], _ = export_openvino(file, metadata, half)
     if coreml:  # CoreML
@@ -574,7 +633,9 @@ def parse_opt():
     parser.add_argument('--inplace', action='store_true', help='set YOLO Detect() inplace=True')
     parser.add_argument('--keras', action='store_true', help='TF: use Keras')
     parser.add_argument('--optimize', action='store_true', help='TorchScript: optimize for mobile')
-    parser.add_argument('--int8', action='store_true', help='CoreML/TF INT8 quantization')
+    parser.add_argument('--int8', action='store_true', help='CoreML/TF/ONNX INT8 quantization')
+    parser.add_argument('--calib', type=str, default=None, help='ONNX INT8: calibration image folder or video')
+    parser.add_argument('--keep-classes', nargs='+', help='prune the detection head to these class ids or names')
     parser.add_argument('--dynamic', action='store_true', help='ONNX/TF/TensorRT: dynamic axes')
     parser.add_argument('--simplify', action='store_true', help='ONNX: simplify model')
     parser.add_argument('--opset', type=int, default=12, help='ONNX: opset version')
@@ -28,7 +28,7 @@ from utils.general import (LOGGER, ROOT, Profile, check_requirements, check_suff
                            increment_path, is_notebook, make_divisible, non_max_suppression, scale_boxes,
                            xywh2xyxy, xyxy2xywh, yaml_load)
 from utils.plots import Annotator, colors, save_one_box
-from utils.torch_utils import copy_attr, smart_inference_mode
+from utils.torch_utils import copy_attr, prune_classes, smart_inference_mode
 
 
 def autopad(k, p=None, d=1):  # kernel, padding, dilation
@@ -654,7 +654,10 @@ class CBFuse(nn.Module):
 
 class DetectMultiBackend(nn.Module):
     # YOLO MultiBackend class for python inference on various backends
-    def __init__(self, weights='yolo.pt', device=torch.device('cpu'), dnn=False, data=None, fp16=False, fuse=True):
+    def __init__(self, weights='yolo.pt', device=torch.device('cpu'), dnn=False, data=None, fp16=False, fuse=True,
+                 threads=None, keep_classes=None):
+        # threads: CPU inference threads for PyTorch, ONNX Runtime and OpenVINO, None keeps the backend default
+        # keep_classes: class ids or names the detection head is pruned to (*.pt only, export other formats pruned)
         # Usage:
         #   PyTorch:              weights = *.pt
         #   TorchScript:                    *.torchscript
@@ -679,9 +682,15 @@ class DetectMultiBackend(nn.Module):
         cuda = torch.cuda.is_available() and device.type != 'cpu'  # use CUDA
         if not (pt or triton):
             w = attempt_download(w)  # download if not local
+        assert pt or not keep_classes, 'keep_classes needs *.pt weights, export other formats with export.py --keep-classes'
+
+        if threads and not cuda:
+            torch.set_num_threads(threads)
 
         if pt:  # PyTorch
             model = attempt_load(weights if isinstance(weights, list) else w, device=device, inplace=True, fuse=fuse)
+            if keep_classes:
+                prune_classes(model, keep_classes)
             stride = max(int(model.stride.max()), 32)  # model stride
             names = model.module.names if hasattr(model, 'module') else model.names  # get class names
             model.half() if fp16 else model.float()
@@ -705,7 +714,11 @@ class DetectMultiBackend(nn.Module):
             check_requirements(('onnx', 'onnxruntime-gpu' if cuda else 'onnxruntime'))
             import onnxruntime
             providers = ['CUDAExecutionProvider', 'CPUExecutionProvider'] if cuda else ['CPUExecutionProvider']
-            session = onnxruntime.InferenceSession(w, providers=providers)
+            options = onnxruntime.SessionOptions()
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if threads:
+                options.intra_op_num_threads = threads
+            session = onnxruntime.InferenceSession(w, sess_options=options, providers=providers)
             output_names = [x.name for x in session.get_outputs()]
             meta = session.get_modelmeta().custom_metadata_map  # metadata
             if 'stride' in meta:
@@ -723,7 +736,8 @@ class DetectMultiBackend(nn.Module):
             batch_dim = get_batch(network)
             if batch_dim.is_static:
                 batch_size = batch_dim.get_length()
-            executable_network = ie.compile_model(network, device_name="CPU")  # device_name="MYRIAD" for Intel NCS2
+            config = {'INFERENCE_NUM_THREADS': str(threads)} if threads else {}
+            executable_network = ie.compile_model(network, device_name="CPU", config=config)  # "MYRIAD" for Intel NCS2
             stride, names = self._load_metadata(Path(w).with_suffix('.yaml'))  # load metadata
         elif engine:  # TensorRT
             LOGGER.info(f'Loading {w} for TensorRT inference...')
@@ -10,7 +10,7 @@ import time
 from itertools import repeat
 from multiprocessing.pool import Pool, ThreadPool
 from pathlib import Path
-from threading import Thread
+from threading import Condition, Thread
 from urllib.parse import urlparse
 
 import numpy as np
@@ -337,6 +337,8 @@ class LoadImages:
 
 class LoadStreams:
     # YOLOv5 streamloader, i.e. `python detect.py --source 'rtsp://example.com/media.mp4'  # RTSP, RTMP, HTTP streams`
+    # Always returns the newest frame of every stream: frames the consumer was too slow for are skipped and counted,
+    # and __next__ blocks until a stream has a frame that was not returned before
     def __init__(self, sources='streams.txt', img_size=640, stride=32, auto=True, transforms=None, vid_stride=1):
         torch.backends.cudnn.benchmark = True  # faster for fixed-size inference
         self.mode = 'stream'
@@ -347,6 +349,11 @@ class LoadStreams:
         n = len(sources)
         self.sources = [clean_str(x) for x in sources]  # clean source names for later
         self.imgs, self.fps, self.frames, self.threads = [None] * n, [0] * n, [0] * n, [None] * n
+        self.seq, self.stamps = [0] * n, [0.0] * n  # number and capture time of the newest frame per stream
+        self.consumed, self.skipped = [0] * n, [0] * n  # number of the last returned frame, frames never returned
+        self.frame_seq, self.frame_time = [0] * n, [0.0] * n  # number and capture time of the returned frames
+        self.new_frame = Condition()
+        self.running = True
         for i, s in enumerate(sources):  # index, source
             # Start thread to read frames from video stream
             st = f'{i + 1}/{n}: {s}... '
@@ -368,6 +375,7 @@ class LoadStreams:
             self.fps[i] = max((fps if math.isfinite(fps) else 0) % 100, 0) or 30  # 30 FPS fallback
 
             _, self.imgs[i] = cap.read()  # guarantee first frame
+            self.seq[i], self.stamps[i] = 1, time.time()
             self.threads[i] = Thread(target=self.update, args=([i, cap, s]), daemon=True)
             LOGGER.info(f"{st} Success ({self.frames[i]} frames {w}x{h} at {self.fps[i]:.2f} FPS)")
             self.threads[i].start()
@@ -384,18 +392,23 @@ class LoadStreams:
     def update(self, i, cap, stream):
         # Read stream `i` frames in daemon thread
         n, f = 0, self.frames[i]  # frame number, frame array
-        while cap.isOpened() and n < f:
+        while self.running and cap.isOpened() and n < f:
             n += 1
             cap.grab()  # .read() = .grab() followed by .retrieve()
             if n % self.vid_stride == 0:
                 success, im = cap.retrieve()
-                if success:
-                    self.imgs[i] = im
-                else:
+                if not success:
                     LOGGER.warning('WARNING ⚠️ Video stream unresponsive, please check your IP camera connection.')
-                    self.imgs[i] = np.zeros_like(self.imgs[i])
+                    im = np.zeros_like(self.imgs[i])
                     cap.open(stream)  # re-open stream if signal was lost
-            time.sleep(0.0)  # wait time
+                with self.new_frame:
+                    self.imgs[i] = im
+                    self.seq[i] += 1
+                    self.stamps[i] = time.time()
+                    self.new_frame.notify_all()
+        cap.release()
+        with self.new_frame:
+            self.new_frame.notify_all()  # wake __next__ so it sees the stream ended
 
     def __iter__(self):
         self.count = -1
@@ -403,11 +416,21 @@ class LoadStreams:
 
     def __next__(self):
         self.count += 1
-        if not all(x.is_alive() for x in self.threads) or cv2.waitKey(1) == ord('q'):  # q to quit
-            cv2.destroyAllWindows()
-            raise StopIteration
+        with self.new_frame:
+            # Wait for a frame that was not returned yet, stop once a stream ended and its last frame was returned
+            while True:
+                if not self.running or any(not x.is_alive() and s == c
+                                           for x, s, c in zip(self.threads, self.seq, self.consumed)):
+                    raise StopIteration
+                if any(s > c for s, c in zip(self.seq, self.consumed)):
+                    break
+                self.new_frame.wait(timeout=0.1)
+            im0 = self.imgs.copy()
+            self.frame_seq, self.frame_time = self.seq.copy(), self.stamps.copy()
+        for i, (s, c) in enumerate(zip(self.frame_seq, self.consumed)):
+            self.skipped[i] += max(s - c - 1, 0)
+        self.consumed = self.frame_seq
 
-        im0 = self.imgs.copy()
         if self.transforms:
             im = np.stack([self.transforms(x) for x in im0])  # transforms
         else:
@@ -417,6 +440,12 @@ class LoadStreams:
 
         return self.sources, im, im0, None, ''
 
+    def close(self):
+        # Stop the reader threads, the next __next__ raises StopIteration
+        with self.new_frame:
+            self.running = False
+            self.new_frame.notify_all()
+
     def __len__(self):
         return len(self.sources)  # 1E12 frames = 32 streams at 30 FPS for 30 years
 
@@ -0,0 +1,81 @@
+"""
+CPU deployment profiles, i.e. `python detect.py --weights gelan-c.pt --cpu-profile onnx-int8`
+
+A profile names the backend a .pt model runs on. The exported model is stored next to the .pt file and created on
+first use (or again when it was exported for another --imgsz or --keep-classes), so the .pt file stays the single
+source.
+"""
+
+import ast
+from pathlib import Path
+
+from utils.general import LOGGER, colorstr, yaml_load
+
+CPU_PROFILES = {
+    # name: (export.py --include, --int8, exported suffix replacing .pt)
+    'pt': (None, False, '.pt'),  # eager PyTorch FP32, the reference
+    'onnx': ('onnx', False, '.onnx'),  # ONNX Runtime FP32, static shape
+    'onnx-int8': ('onnx', True, '-int8.onnx'),  # ONNX Runtime INT8 (QDQ), calibrated on --calib images
+    'openvino': ('openvino', False, '_openvino_model'),}  # OpenVINO FP32, requires openvino-dev
+
+
+def _exported_as(f):
+    # Input size (None if unknown), kept original class ids (None = all) and names of an exported model
+    if f.suffix == '.onnx':
+        import onnx
+        model = onnx.load(str(f), load_external_data=False)
+        meta = {x.key: ast.literal_eval(x.value) for x in model.metadata_props}
+        shape = [d.dim_value for d in model.graph.input[0].type.tensor_type.shape.dim[2:]]
+    else:  # OpenVINO IR, the input shape is the Parameter layer of the *.xml
+        import xml.etree.ElementTree as ET
+        meta = yaml_load(next(f.glob('*.yaml'))) if any(f.glob('*.yaml')) else {}
+        xml = next(f.glob('*.xml'), None)
+        data = ET.parse(xml).getroot().find(".//layer[@type='Parameter']/data") if xml else None
+        shape = [int(x) for x in data.get('shape').split(',')[2:]] if data is not None and data.get('shape') else None
+    return shape, meta.get('classes'), list(meta.get('names', {}).values())
+
+
+def calibration_images(calib=None, source=None):
+    # onnx-int8 calibration images: --calib, otherwise the --source images or video (with a warning)
+    if calib:
+        assert Path(calib).exists(), f'onnx-int8 calibration images {calib} not found, pass --calib <image folder>'
+        return calib
+    if source and Path(source).exists():
+        LOGGER.warning(f'WARNING ⚠️ onnx-int8: no --calib given, calibrating on the --source {source} instead')
+        return source
+    raise FileNotFoundError('onnx-int8 needs calibration images, pass --calib with a folder of representative frames '
+                            '(e.g. saved from the camera the model will run on)')
+
+
+def _same_classes(classes, names, keep_classes):
+    # keep_classes (ids or names, None = all) matches an export that kept `classes` with `names`
+    if not keep_classes or classes is None:
+        return not keep_classes and classes is None
+    return len(classes) == len(keep_classes) and all(
+        int(c) == i if str(c).isnumeric() else c == n for c, i, n in zip(keep_classes, classes, names))
+
+
+def profile_weights(weights, profile, imgsz=(640, 640), calib=None, keep_classes=None, source=None):
+    # Returns the model file of `profile` for `weights` (*.pt), exporting it first when missing or exported for another
+    # size or class subset. The pt profile returns `weights`, DetectMultiBackend prunes it on load. onnx-int8 is
+    # calibrated on `calib`, or on `source` when that is a local file or folder
+    assert profile in CPU_PROFILES, f'Unknown CPU profile {profile}, choose from {list(CPU_PROFILES)}'
+    include, int8, suffix = CPU_PROFILES[profile]
+    weights = Path(weights[0] if isinstance(weights, (list, tuple)) else weights)
+    if include is None:
+        return weights
+    assert weights.suffix == '.pt', f'--cpu-profile {profile} starts from a *.pt model, not {weights}'
+    f = Path(str(weights).replace('.pt', suffix))
+    imgsz = list(imgsz) * 2 if len(imgsz) == 1 else list(imgsz)
+    if f.exists():
+        shape, classes, names = _exported_as(f)
+        if shape == imgsz and _same_classes(classes, names, keep_classes):
+            return f
+
+    calib = calibration_images(calib, source) if int8 else calib
+    import export  # scoped, export.py imports every exporter
+    LOGGER.info(f"{colorstr('CPU profile:')} exporting {weights} for {profile} at {imgsz}...")
+    export.run(weights=weights, imgsz=imgsz, include=[include], int8=int8, calib=calib, keep_classes=keep_classes,
+               device='cpu')
+    assert f.exists(), f'CPU profile {profile}: export of {weights} failed'
+    return f
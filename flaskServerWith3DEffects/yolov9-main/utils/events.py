@@ -0,0 +1,66 @@
+import json
+import os
+import socket
+import time
+from urllib.parse import urlparse
+
+DEFAULT_EVENT_SINK = 'udp://127.0.0.1:5555' if os.name == 'nt' else 'unix:///tmp/yolo_events.sock'
+
+
+class DetectionEventSink:
+    """ Publishes one NDJSON record per processed image to a local datagram socket, so listeners get
+    structured detections instead of parsing LOGGER lines. Datagrams are fire-and-forget: without a
+    listener, or when it falls behind, records are dropped and never block inference.
+
+    Record: {"frame", "source", "time", "shape": [h, w], "ms": {"pre", "inference", "nms"},
+             "det": [{"cls", "name", "conf", "box": [x1, y1, x2, y2]}, ...], "age": ms since capture (streams only)}
+    """
+
+    def __init__(self, address=DEFAULT_EVENT_SINK):
+        """
+        Keyword arguments:
+        address: unix:///path/to.sock (Unix datagram socket) or udp://host:port
+        """
+
+        parsed = urlparse(address)
+        if parsed.scheme == 'unix':
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.target = parsed.path
+        elif parsed.scheme == 'udp':
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.target = (parsed.hostname, parsed.port)
+        else:
+            raise ValueError(f'--event-sink {address} not supported, use unix:///path or udp://host:port')
+        self.sock.setblocking(False)
+        self.address = address
+        self.sent = 0
+        self.dropped = 0
+
+    def publish(self, frame, source, det, names, shape, dt, captured=None):
+        """ det: (n, 6) tensor of x1, y1, x2, y2, conf, cls in image coordinates, dt: (pre, inference, nms) Profiles,
+        captured: time.time() the frame was grabbed (live streams), adds its age in ms to the record """
+        now = time.time()
+        record = {
+            'frame': int(frame),
+            'source': str(source),
+            'time': now,
+            'shape': [int(shape[0]), int(shape[1])],
+            'ms': {k: round(p.dt * 1E3, 2) for k, p in zip(('pre', 'inference', 'nms'), dt)},
+            'det': [{
+                'cls': int(cls),
+                'name': names[int(cls)],
+                'conf': round(float(conf), 4),
+                'box': [round(float(x), 1) for x in xyxy]} for *xyxy, conf, cls in det.tolist()]}
+        if captured is not None:
+            record['age'] = round((now - captured) * 1E3, 1)
+        self.send((json.dumps(record, separators=(',', ':')) + '\n').encode())
+
+    def send(self, data):
+        try:
+            self.sock.sendto(data, self.target)
+            self.sent += 1
+        except OSError:  # no listener bound yet, listener busy or record too large
+            self.dropped += 1
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,50 @@
+import time
+
+import cv2
+
+
+class MotionGate:
+    """ Decides per frame whether the detector has to run, i.e. `python detect.py --source 0 --motion-gate`
+
+    Every frame is shrunk to `size`, blurred and fed to a MOG2 background model, which costs well under a millisecond.
+    The detector runs while the moving fraction of the frame is at least `threshold` (and for `hold` seconds after),
+    and at least every `keepalive` seconds, so somebody who stopped moving is still seen and somebody who left
+    (MOG2 remembers the empty background, so leaving is often not motion) is noticed. Otherwise the caller reuses
+    its last detections.
+    """
+
+    def __init__(self, threshold=0.005, keepalive=2.0, hold=0.5, size=(160, 120), history=300, var_threshold=25):
+        self.threshold = threshold
+        self.keepalive = keepalive
+        self.hold = hold
+        self.size = size
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(history, var_threshold, detectShadows=False)
+        self.level = 0.0  # moving fraction of the last frame
+        self.last_motion = self.last_run = None
+        self.runs = self.skipped = 0
+
+    def motion(self, frame):
+        # Fraction of pixels that differ from the background model
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small, (5, 5), 0)
+        mask = self.subtractor.apply(gray)
+        return cv2.countNonZero(mask) / mask.size
+
+    def update(self, frame, now=None):
+        # True when the detector should run on `frame`
+        now = time.monotonic() if now is None else now
+        self.level = self.motion(frame)
+        if self.level >= self.threshold:
+            self.last_motion = now
+        run = self.last_run is None or now - self.last_run >= self.keepalive or \
+            (self.last_motion is not None and now - self.last_motion <= self.hold)
+        if run:
+            self.last_run = now
+            self.runs += 1
+        else:
+            self.skipped += 1
+        return run
+
+    def __str__(self):
+        n = max(self.runs + self.skipped, 1)
+        return f'Motion gate: detector ran on {self.runs}/{n} frames, {self.skipped / n:.0%} reused'
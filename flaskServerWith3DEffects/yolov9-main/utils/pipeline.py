@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+
+_END = object()  # end of stream marker
+
+
+class _Failure:
+    # Exception raised in a stage, re-raised in the consuming thread
+    def __init__(self, exception):
+        self.exception = exception
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.n = 0  # items processed
+        self.busy = 0.0  # seconds spent in the stage function
+        self.puts = 0  # items put on the output queue, end and failure markers not counted
+        self.depth = 0  # summed output queue depth, sampled after every counted put
+        self.max_depth = 0
+        self.dropped = 0  # outputs replaced by a newer one before the next stage took them
+
+    def __str__(self):
+        n, puts = max(self.n, 1), max(self.puts, 1)
+        dropped = f', {self.dropped} dropped' if self.dropped else ''
+        return f'{self.name} {self.busy / n * 1E3:.1f}ms (queue {self.depth / puts:.1f} avg, {self.max_depth} max{dropped})'
+
+
+class Pipeline:
+    """ Runs `source` and each function in `stages` in its own thread, connected by queues of `maxsize` items,
+    so consecutive frames overlap: while frame n is in inference, frame n+1 is preprocessed and frame n-1 is in NMS.
+    Iterating the pipeline yields the output of the last stage in source order. Throughput approaches
+    1 / slowest stage instead of 1 / sum of stages, as long as the stages release the GIL (torch and OpenCV do).
+
+    Stages named in `drop` (live sources) never wait for the next one: their full output queue gives up its oldest
+    item, so frames do not age in front of the slowest stage. Name the stages before it, dropping finished work
+    after it only wastes it.
+
+    Usage:
+        pipeline = Pipeline(dataset, (('pre', preprocess), ('inference', infer), ('nms', nms)))
+        for result in pipeline:
+            ...
+        LOGGER.info(pipeline.summary())
+    """
+
+    def __init__(self, source, stages, maxsize=2, drop=()):
+        self.stop_event = threading.Event()
+        self.stats = [StageStats('load')] + [StageStats(name) for name, _ in stages]
+        self.drop = [stats.name in drop for stats in self.stats]
+        self.queues = [queue.Queue(maxsize=maxsize) for _ in self.stats]
+        self.threads = [threading.Thread(target=self._load, args=(iter(source),), daemon=True)]
+        for k, (_, fn) in enumerate(stages):
+            self.threads.append(threading.Thread(target=self._stage, args=(k + 1, fn), daemon=True))
+        self.t0 = None
+
+    def _put(self, k, item):
+        # Blocks while the next stage is behind (or replaces the oldest item), gives up when the pipeline is closed.
+        # End and failure markers always wait, so they never displace the last frames of a finite source
+        stats = self.stats[k]
+        marker = item is _END or isinstance(item, _Failure)
+        drop = self.drop[k] and not marker
+        while not self.stop_event.is_set():
+            try:
+                if drop:
+                    self.queues[k].put_nowait(item)
+                else:
+                    self.queues[k].put(item, timeout=0.1)
+            except queue.Full:
+                if drop:
+                    try:
+                        self.queues[k].get_nowait()
+                        stats.dropped += 1
+                    except queue.Empty:
+                        pass
+                continue
+            if not marker:
+                depth = self.queues[k].qsize()
+                stats.puts += 1
+                stats.depth += depth
+                stats.max_depth = max(stats.max_depth, depth)
+            return True
+        return False
+
+    def _get(self, k):
+        while not self.stop_event.is_set():
+            try:
+                return self.queues[k].get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _load(self, source):
+        stats = self.stats[0]
+        try:
+            while True:
+                t = time.perf_counter()
+                item = next(source, _END)
+                if item is _END:
+                    break
+                stats.busy += time.perf_counter() - t
+                stats.n += 1
+                if not self._put(0, item):
+                    return
+        except Exception as e:
+            self._put(0, _Failure(e))
+            return
+        self._put(0, _END)
+
+    def _stage(self, k, fn):
+        stats = self.stats[k]
+        while True:
+            item = self._get(k - 1)
+            if item is _END or isinstance(item, _Failure):
+                self._put(k, item)
+                return
+            t = time.perf_counter()
+            try:
+                item = fn(item)
+            except Exception as e:
+                self._put(k, _Failure(e))
+                return
+            stats.busy += time.perf_counter() - t
+            stats.n += 1
+            if not self._put(k, item):
+                return
+
+    def __iter__(self):
+        self.t0 = time.perf_counter()
+        for thread in self.threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(len(self.queues) - 1)
+                if item is _END:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.exception
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+
+    def summary(self):
+        n = self.stats[-1].n
+        elapsed = time.perf_counter() - self.t0 if self.t0 else 0.0
+        fps = n / elapsed if elapsed else 0.0
+        return f'Pipeline: {n} images at {fps:.1f} FPS, ' + ', '.join(str(s) for s in self.stats)
+
+    def dropped(self):
+        return sum(s.dropped for s in self.stats)
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from utils.pipeline import Pipeline, StageStats
+
+
+def slow(seconds):
+    def stage(x):
+        time.sleep(seconds)
+        return x
+
+    return stage
+
+
+def check_counters(stats):
+    assert stats.puts <= stats.n
+    assert stats.depth <= stats.puts * stats.max_depth  # the average never exceeds the max
+    assert f'{stats.max_depth} max' in str(stats)
+
+
+def test_order_and_counters():
+    pipeline = Pipeline(range(20), (('double', lambda x: 2 * x), ('nms', slow(0.002))), maxsize=2)
+    assert list(pipeline) == [2 * x for x in range(20)]
+    for stats in pipeline.stats:
+        assert stats.n == stats.puts == 20
+        assert stats.dropped == 0
+        assert 1 <= stats.max_depth <= 2
+        check_counters(stats)
+    assert pipeline.summary().startswith('Pipeline: 20 images')
+
+
+def test_end_marker_not_counted():
+    # A single item followed by the end marker: one sampled put per stage
+    pipeline = Pipeline(range(1), (('pre', lambda x: x), ('inference', slow(0.01))), maxsize=2)
+    assert list(pipeline) == [0]
+    for stats in pipeline.stats:
+        assert (stats.n, stats.puts) == (1, 1)
+        assert stats.depth <= stats.max_depth
+        check_counters(stats)
+
+
+def test_drop_oldest():
+    pipeline = Pipeline(range(50), (('pre', lambda x: x), ('inference', slow(0.005))), maxsize=1, drop=('load', 'pre'))
+    out = list(pipeline)
+    assert out == sorted(out) and out[-1] == 49
+    assert pipeline.dropped() == 50 - len(out)
+    load, pre, inference = pipeline.stats
+    assert load.n == load.puts == 50
+    assert inference.n == len(out)
+    assert pre.n - pre.dropped == len(out)
+    for stats in pipeline.stats:
+        check_counters(stats)
+
+
+def test_failure_is_raised_and_not_counted():
+    def fail(x):
+        if x == 3:
+            raise ValueError('bad frame')
+        return x
+
+    pipeline = Pipeline(range(10), (('pre', fail), ('nms', lambda x: x)))
+    with pytest.raises(ValueError, match='bad frame'):
+        list(pipeline)
+    pre = pipeline.stats[1]
+    assert pre.n == pre.puts == 3
+    assert not any(thread.is_alive() for thread in pipeline.threads)
+
+
+def test_close_stops_threads():
+    pipeline = Pipeline(iter(int, 1), (('pre', lambda x: x),))  # source that never ends
+    for _ in pipeline:
+        break
+    assert not any(thread.is_alive() for thread in pipeline.threads)
+
+
+def test_empty_stats():
+    assert str(StageStats('load')) == 'load 0.0ms (queue 0.0 avg, 0 max)'
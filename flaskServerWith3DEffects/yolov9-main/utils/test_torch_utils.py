@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pytest
+import torch
+
+from models.yolo import DetectionModel
+from utils.torch_utils import prune_classes
+
+CFG = Path(__file__).resolve().parents[1] / 'models' / 'detect'
+NAMES = {0: 'person', 1: 'bicycle', 2: 'car', 3: 'bottle', 4: 'cell phone'}
+
+
+def model(cfg):
+    torch.manual_seed(0)
+    m = DetectionModel(CFG / cfg, nc=len(NAMES)).eval()
+    m.names = dict(NAMES)
+    return m
+
+
+def outputs(m, im):
+    # Inference output of every head, (batch, 4 + nc, anchors) each
+    y = m(im)[0]
+    return y if isinstance(y, list) else [y]
+
+
+@pytest.mark.parametrize('cfg', ['gelan-c.yaml', 'yolov9-c.yaml'])  # Detect and DualDetect heads
+@torch.no_grad()
+def test_pruned_head_matches_full_head(cfg):
+    full = model(cfg)
+    im = torch.rand(1, 3, 64, 64)
+    expected = outputs(full, im)
+
+    keep = prune_classes(full, ['cell phone', 0, 'bottle'])
+    assert keep == [4, 0, 3]
+    assert full.names == {0: 'cell phone', 1: 'person', 2: 'bottle'}
+    assert full.nc == full.model[-1].nc == 3 and full.classes == keep
+
+    for before, after in zip(expected, outputs(full, im)):
+        assert after.shape == (1, 4 + 3, before.shape[2])
+        torch.testing.assert_close(after[:, :4], before[:, :4])  # boxes unchanged
+        torch.testing.assert_close(after[:, 4:], before[:, [4 + c for c in keep]])  # kept class scores
+
+
+def test_unknown_class():
+    with pytest.raises(AssertionError, match='Unknown classes'):
+        prune_classes(model('gelan-c.yaml'), ['person', 'giraffe'])
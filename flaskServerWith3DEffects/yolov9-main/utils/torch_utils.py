@@ -241,6 +241,30 @@ def prune(model, amount=0.3):
     LOGGER.info(f'Model pruned to {sparsity(model):.3g} global sparsity')
 
 
+def prune_classes(model, classes):
+    # Keep only `classes` (ids or names) in the detection head: the last 1x1 conv of every classification branch is
+    # sliced to those channels, so the head, NMS and outputs only see them. Box regression is unchanged and names are
+    # renumbered 0..n-1 in the given order. Returns the kept original class ids, also stored as model.classes
+    names = model.names if isinstance(model.names, dict) else dict(enumerate(model.names))
+    ids = {v: k for k, v in names.items()}
+    keep = [int(c) if str(c).isnumeric() else ids.get(c) for c in classes]
+    assert all(c in names for c in keep), f'Unknown classes {[c for c, k in zip(classes, keep) if k not in names]}'
+    m = model.model[-1]  # Detect()
+    for branch in 'cv3', 'cv5', 'cv7':  # classification branches of (Dual, Triple) Detect heads
+        for seq in getattr(m, branch, ()):
+            conv = seq[-1]
+            pruned = nn.Conv2d(conv.in_channels, len(keep), 1).to(conv.weight.device, conv.weight.dtype)
+            pruned.weight.data = conv.weight.data[keep].clone()
+            pruned.bias.data = conv.bias.data[keep].clone()
+            seq[-1] = pruned
+    m.nc = model.nc = len(keep)
+    m.no = m.nc + m.reg_max * 4
+    model.names = {i: names[c] for i, c in enumerate(keep)}
+    model.classes = keep
+    LOGGER.info(f"Detection head pruned to {len(keep)}/{len(names)} classes: {', '.join(model.names.values())}")
+    return keep
+
+
 def fuse_conv_and_bn(conv, bn):
     # Fuse Conv2d() and BatchNorm2d() layers https://tehnokv.com/posts/fusing-batchnorm-and-conv/
     fusedconv = nn.Conv2d(conv.in_channels,